@@ -1,6 +1,9 @@
 import sys
 import os
 import json
+import base64
+import codecs
+import gzip
 import ctypes
 import platform
 from copy import deepcopy
@@ -8,87 +11,120 @@ import math
 import traceback
 import time  # [1]
 import functools
+import bisect
+import heapq
+import itertools
+import queue
+import threading
+import unicodedata
 import re
+import struct
 import uuid
-import subprocess
-import qdarkstyle
+import weakref
+import zlib
+import concurrent.futures
+import multiprocessing
+from collections import OrderedDict, deque
+import importlib
+import importlib.util
 from typing import Optional, List, Tuple
 
-_GLOBAL_LINE_NUMBER = 0
+from frame_encoders import encode_gif_frame, encode_png_frame
 
+# Startup timing: phases are recorded as seconds since this point; the full
+# report is printed with --profile-startup, and --startup-budget-ms=N makes
+# the app quit after startup with exit code 1 if the first frame took longer.
+# The regression guard itself is tests/test_startup.py.
+_STARTUP_STARTED = time.perf_counter()
+_STARTUP_PROFILE = "--profile-startup" in sys.argv
+_STARTUP_TIMINGS = []
 
-def _gln():
-    global _GLOBAL_LINE_NUMBER
-    _GLOBAL_LINE_NUMBER += 1  # [2]
-    return f"# [{_GLOBAL_LINE_NUMBER}]"
 
+def _mark_startup(phase):
+    """Records that a startup phase ended now."""
+    _STARTUP_TIMINGS.append((phase, time.perf_counter() - _STARTUP_STARTED))
 
-_PYAUTOGUI_AVAILABLE = False
-try:
-    import pyautogui
 
-    _PYAUTOGUI_AVAILABLE = True
-    print(
-        "PyAutoGUI module found. Magnifier hotkey control for closing will be available."
-    )
-except ImportError:
-    print(
-        "WARNING: PyAutoGUI module not found. Magnifier closing via hotkey will be DISABLED."
-    )  # [3]
-    print(
-        "To enable Magnifier closing via hotkey, please install pyautogui: pip install pyautogui"
-    )
+def _startup_budget_ms(argv):
+    for arg in argv:
+        if arg.startswith("--startup-budget-ms="):
+            return float(arg.split("=", 1)[1])
+    return None
 
-_QDARKSTYLE_AVAILABLE = False  # [4]
-try:  # [5]
-    import qdarkstyle  # [6]
 
-    _QDARKSTYLE_AVAILABLE = True  # [7]
-    print("qdarkstyle module found. Dark mode will be available.")  # [8]
-except ImportError:  # [9]
-    print("WARNING: qdarkstyle module not found. Dark mode will be DISABLED.")  # [10]
-    print(
-        "To enable Dark mode, please install qdarkstyle: pip install qdarkstyle"
-    )  # [11]
+def _script_socket_name(argv):
+    """Socket name from --script-socket[=NAME], or None if the flag is absent."""
+    for arg in argv:
+        if arg == "--script-socket":
+            return SCRIPT_SOCKET_NAME
+        if arg.startswith("--script-socket="):
+            return arg.split("=", 1)[1] or SCRIPT_SOCKET_NAME
+    return None
 
-    # Create an empty placeholder class to avoid NameError if qdarkstyle is not available # [12]
-    class qdarkstyle:  # [13]
-        @staticmethod  # [14]
-        def load_stylesheet(qt_api):  # [15]
-            print(
-                "qdarkstyle.load_stylesheet called but module not available. Returning empty stylesheet."
-            )  # [16]
-            return ""  # [17]
 
+_GLOBAL_LINE_NUMBER = 0
 
-_QT_PRINT_SUPPORT_AVAILABLE = False
 
-try:
-    from PySide6.QtPrintSupport import QPrinter, QPrintDialog
+def _gln():
+    global _GLOBAL_LINE_NUMBER
+    _GLOBAL_LINE_NUMBER += 1  # [2]
+    return f"# [{_GLOBAL_LINE_NUMBER}]"
 
-    _QT_PRINT_SUPPORT_AVAILABLE = True
-    print("QtPrintSupport found.")
-except ImportError:  # [18]
-    print(
-        "WARNING: QtPrintSupport module not found. Printing functionality will be disabled."
-    )
 
-    class QPrinter:
-        pass
+class _OptionalModule:
+    """
+    An optional dependency that is imported when its feature is first used
+    rather than at startup. When it is missing, the feature is disabled and
+    a warning with the install hint is printed once.
+    """
 
-    class QPrintDialog:
-        pass
+    def __init__(self, name, feature, package=None):
+        self.name = name
+        self.feature = feature
+        self.package = package or name
+        self._module = None
+        self._loaded = False
+
+    def installed(self):
+        """Whether the module can be imported, without importing it."""
+        if self._loaded:
+            return self._module is not None
+        try:
+            return importlib.util.find_spec(self.name) is not None
+        except (ImportError, ValueError):
+            return False
 
+    def load(self):
+        """Imports the module on first call; returns it, or None if missing."""
+        if not self._loaded:
+            self._loaded = True
+            started = time.perf_counter()
+            try:
+                self._module = importlib.import_module(self.name)
+            except ImportError:
+                print(
+                    f"WARNING: {self.name} module not found. "
+                    f"{self.feature[:1].upper()}{self.feature[1:]} will be DISABLED."
+                )
+                print(
+                    f"To enable {self.feature}, please install {self.package}: "
+                    f"pip install {self.package}"
+                )
+            else:
+                if _STARTUP_PROFILE:
+                    print(
+                        f"Imported {self.name} on first use in "
+                        f"{(time.perf_counter() - started) * 1000:.1f} ms."
+                    )
+        return self._module
 
-_PSUTIL_AVAILABLE = False
-try:
-    import psutil
 
-    _PSUTIL_AVAILABLE = True
-    print("psutil module found. Process killing will be available.")
-except ImportError:
-    print("WARNING: psutil module not found. Process killing will be DISABLED.")
-    print("To enable process killing, please install psutil: pip install psutil")
+_qdarkstyle = _OptionalModule("qdarkstyle", "dark mode")
+_qt_print_support = _OptionalModule("PySide6.QtPrintSupport", "printing", "PySide6")
+_psutil = _OptionalModule("psutil", "process killing")
+_numpy = _OptionalModule("numpy", "vectorized lasso selection")
+_pillow = _OptionalModule("PIL", "animated GIF export", "Pillow")
+_qt_network = _OptionalModule("PySide6.QtNetwork", "the scripting socket", "PySide6")
 
 from PySide6.QtWidgets import (
     QApplication,
@@ -125,6 +161,8 @@ from PySide6.QtWidgets import (
     QListWidgetItem,
     QGroupBox,
     QMainWindow,
+    QProgressDialog,
+    QMenu,
 )
 from PySide6.QtGui import (
     QPainter,
@@ -138,6 +176,7 @@ from PySide6.QtGui import (
     QCursor,
     QPixmap,
     QFontMetrics,
+    QFontMetricsF,
     QPalette,
     QKeyEvent,
     QTextDocument,
@@ -147,6 +186,10 @@ from PySide6.QtGui import (
     QRadialGradient,
     QConicalGradient,
     QCloseEvent,
+    QImage,
+    QRegion,
+    QTextLayout,
+    QTextOption,
 )
 from PySide6.QtCore import (
     Qt,
@@ -165,26 +208,376 @@ from PySide6.QtCore import (
     QSize,
     QObject,
     QThread,  # Added for LinesApp.get_id_glownego_watku
+    QFileSystemWatcher,
+    QByteArray,
+    QCoreApplication,
 )  # [22]
 
+_mark_startup("imports")
+
+# Top-level keys of a scene file that carry settings rather than shapes
+SCENE_SETTINGS_KEYS = (
+    "mpoint_data",
+    "dimension_text_defaults",
+    "dimension_preview_line_color",
+    "dimension_preview_color_explicitly_set",
+    "angle_tool_settings",
+    "hatch_fill_settings",
+    "division_point_settings",
+)
+
+# Compressed scene files, always written in compact form
+SCENE_GZIP_SUFFIX = ".json.gz"
+
+# Scene format version written by compact saves. Version 2 moves the shape
+# fields below into a shared "styles" table that shapes reference by index;
+# files without "schema_version" are version 1 and store them inline.
+SCENE_SCHEMA_VERSION = 2
+SCENE_STYLE_KEYS = (
+    "color",
+    "filled",
+    "alpha",
+    "line_thickness",
+    "line_style",
+    "line_pattern",
+    "text_properties",
+    "gradient_properties",
+    "hatch_properties",
+)
+
+# In-memory cache of parsed scene files: default size limit and how often a
+# shape dict is measured when estimating the size of a scene.
+SCENE_CACHE_DEFAULT_MB = 64
+SCENE_CACHE_SAMPLE_STRIDE = 32
+
+# Autosave journal: file name, default flush interval and the number of
+# records after which the journal is compacted into a single snapshot.
+AUTOSAVE_JOURNAL_NAME = "autosave_journal.jsonl"
+AUTOSAVE_DEFAULT_INTERVAL_MS = 3000
+AUTOSAVE_COMPACT_RECORDS = 2000
+# Longest time one autosave tick spends serializing new shapes on the GUI thread.
+AUTOSAVE_SLICE_SECONDS = 0.001
+
+# Preloaded scene slots: number of slots, how often finished preloads are
+# picked up on the GUI thread and how long to wait for a changed file to settle.
+SCENE_SLOT_COUNT = 9
+SCENE_SLOT_POLL_MS = 50
+SCENE_SLOT_RELOAD_DELAY_MS = 300
+
+# Animation scheduler: events this late are reported as they fire.
+ANIMATION_DRIFT_WARN_SECONDS = 0.05
+
+# Pre-rendered animation frames: default memory budget and how often the GUI
+# thread picks up frames finished by the render thread.
+ANIMATION_FRAME_CACHE_DEFAULT_MB = 512
+ANIMATION_FRAME_POLL_MS = 30
+
+# Offline animation export: default frame rate and size, frames in flight per
+# encoder process, and how often the GUI thread picks up export progress.
+ANIMATION_EXPORT_DEFAULT_FPS = 25
+ANIMATION_EXPORT_DEFAULT_WIDTH = 1280
+ANIMATION_EXPORT_FRAMES_PER_WORKER = 2
+ANIMATION_EXPORT_POLL_MS = 100
+
+# TEMP mode: highest frame rate of the fade-out of expiring shapes.
+TEMP_FADE_FPS = 30
+
+# Background scene loading: shapes converted per worker batch, the longest time
+# the GUI thread spends committing batches per tick, and the repaint interval.
+SCENE_LOAD_BATCH_SIZE = 256
+SCENE_LOAD_SLICE_SECONDS = 0.012
+SCENE_LOAD_REPAINT_SECONDS = 0.25
+
+# Deferred startup: work that runs after the overlay's first frame starts
+# anyway once this long has passed without one.
+STARTUP_IDLE_FALLBACK_MS = 500
+
+# Settings store: version of the settings file format and how long after
+# the last change the changed settings are written in one flush.
+SETTINGS_SCHEMA_VERSION = 1
+SETTINGS_FLUSH_DELAY_MS = 2000
+
+# Screenshots: encoder threads, how often the GUI thread picks up finished
+# writes, default PNG compression level (0-9) and JPEG quality, and for burst
+# capture how long after the last capture the held images are encoded and
+# how much raw image data may be held before that.
+SCREENSHOT_ENCODE_WORKERS = 2
+SCREENSHOT_POLL_MS = 100
+SCREENSHOT_DEFAULT_PNG_COMPRESSION = 6
+SCREENSHOT_DEFAULT_JPEG_QUALITY = 95
+SCREENSHOT_BURST_IDLE_MS = 1500
+SCREENSHOT_BURST_MAX_MB = 512
+# Time for a closing menu or rubber band to leave the screen before the grab.
+SCREENSHOT_SETTLE_MS = 150
+
+# Scripting socket: default local socket name, how often the GUI thread
+# commits parsed commands and the longest time it spends on them per tick,
+# parsed lines that may wait before reading from clients pauses, the socket
+# read buffer per client, and above how many shapes one commit repaints the
+# whole overlay instead of the shapes' area.
+SCRIPT_SOCKET_NAME = "DrawDesktopScript"
+SCRIPT_POLL_MS = 15
+SCRIPT_COMMIT_SLICE_SECONDS = 0.008
+SCRIPT_MAX_PENDING_LINES = 2000
+SCRIPT_READ_BUFFER_BYTES = 4 * 1024 * 1024
+SCRIPT_FULL_REPAINT_SHAPES = 256
+
+# Magnifier loupe: how often the cursor position is sampled, the default
+# zoom factor and loupe diameter, and the highest zoom factor.
+MAGNIFIER_POLL_MS = 16
+MAGNIFIER_DEFAULT_ZOOM = 3
+MAGNIFIER_DEFAULT_SIZE = 240
+MAGNIFIER_MAX_ZOOM = 8
+
 # Globals to hold instances of Grid and Lines apps/widgets
 grid_overlay_instance = None
 grid_settings_window_instance = None
 lines_app_instance = None
 lines_settings_dialog_instance = None
 
+
+class SettingsStore:
+    """
+    All settings of one organization/application pair, loaded once into
+    memory and written back in batches.
+
+    The values live in a schema-versioned JSON file in the user's config
+    directory, which works the same on every platform. The first time, the
+    values are migrated from the QSettings backend. Reads come from memory.
+    Changed keys mark the store dirty, and the whole file is written in a
+    single flush SETTINGS_FLUSH_DELAY_MS after the last change, or at once
+    by flush(). Values are kept as JSON types, with lists and dicts encoded
+    item by item; byte strings (window geometry) are stored base64-encoded
+    and colors as tagged hex strings, so both come back as they were set.
+    Like QSettings, the store keeps untyped values by key; the typed
+    defaults stay with the load_* methods that read them.
+    """
+
+    _stores = {}
+
+    def __init__(self, organization, application, path=None):
+        self.organization = organization
+        self.application = application
+        self.path = path or os.path.join(
+            QStandardPaths.writableLocation(
+                QStandardPaths.StandardLocation.GenericConfigLocation
+            ),
+            organization,
+            f"{application}.json",
+        )
+        self.values = {}
+        self.dirty_keys = set()
+        self.flushes = 0
+        self._flush_timer = None
+        self._load()
+
+    @classmethod
+    def get(cls, organization, application):
+        key = (organization, application)
+        store = cls._stores.get(key)
+        if store is None:
+            store = cls._stores[key] = cls(organization, application)
+        return store
+
+    @classmethod
+    def flush_all(cls):
+        for store in cls._stores.values():
+            store.flush()
+
+    @staticmethod
+    def encode(value):
+        if isinstance(value, QByteArray):
+            value = value.data()
+        if isinstance(value, (bytes, bytearray)):
+            return {"$bytes": base64.b64encode(bytes(value)).decode("ascii")}
+        if isinstance(value, QColor):
+            return {"$color": value.name(QColor.NameFormat.HexArgb)}
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, (list, tuple)):
+            return [SettingsStore.encode(item) for item in value]
+        if isinstance(value, dict):
+            return {str(k): SettingsStore.encode(v) for k, v in value.items()}
+        return str(value)
+
+    @staticmethod
+    def decode(value):
+        if isinstance(value, dict):
+            if "$bytes" in value:
+                return base64.b64decode(value["$bytes"])
+            if "$color" in value:
+                return QColor(value["$color"])
+            return {k: SettingsStore.decode(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [SettingsStore.decode(item) for item in value]
+        return value
+
+    def set(self, key, value):
+        value = self.encode(value)
+        if key in self.values and self.values[key] == value:
+            return
+        self.values[key] = value
+        self.dirty_keys.add(key)
+        self.schedule_flush()
+
+    def remove(self, key):
+        removed = [
+            k for k in self.values if not key or k == key or k.startswith(key + "/")
+        ]
+        for k in removed:
+            del self.values[k]
+            self.dirty_keys.add(k)
+        if removed:
+            self.schedule_flush()
+
+    def schedule_flush(self):
+        if not self.dirty_keys:
+            return
+        if QCoreApplication.instance() is None:
+            self.flush()
+            return
+        if self._flush_timer is None:
+            self._flush_timer = QTimer()
+            self._flush_timer.setSingleShot(True)
+            self._flush_timer.setInterval(SETTINGS_FLUSH_DELAY_MS)
+            self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+
+    def flush(self):
+        """Writes the settings file if any key changed since the last flush."""
+        if self._flush_timer is not None:
+            self._flush_timer.stop()
+        if not self.dirty_keys:
+            return
+        data = {"schema_version": SETTINGS_SCHEMA_VERSION, "values": self.values}
+        temp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1, sort_keys=True, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not write settings to {self.path}: {e}")
+            return
+        self.dirty_keys.clear()
+        self.flushes += 1
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            self._migrate_from_qsettings()
+            return
+        except (OSError, ValueError) as e:
+            backup_path = self.path + ".corrupt"
+            print(f"Settings file {self.path} is unreadable ({e}); kept as {backup_path}.")
+            try:
+                os.replace(self.path, backup_path)
+            except OSError:
+                pass
+            return
+        version = data.get("schema_version", 0) if isinstance(data, dict) else 0
+        if version > SETTINGS_SCHEMA_VERSION:
+            print(
+                f"Settings file {self.path} has schema version {version}, newer than "
+                f"{SETTINGS_SCHEMA_VERSION}; reading the keys this version knows."
+            )
+        values = data.get("values") if isinstance(data, dict) else None
+        if isinstance(values, dict):
+            self.values = values
+
+    def _migrate_from_qsettings(self):
+        legacy = QSettings(self.organization, self.application)
+        for key in legacy.allKeys():
+            self.values[key] = self.encode(legacy.value(key))
+        if self.values:
+            print(
+                f"Migrated {len(self.values)} settings of {self.application} "
+                f"from QSettings to {self.path}."
+            )
+            self.dirty_keys.update(self.values)
+            self.schedule_flush()
+
+
+class Settings:
+    """
+    A QSettings-style handle on a shared SettingsStore, with its own group
+    stack. Values stored by QSettings as strings ("true", "12") are converted
+    when a type is asked for, as QSettings does.
+    """
+
+    def __init__(self, organization, application):
+        self.store = SettingsStore.get(organization, application)
+        self._groups = []
+
+    def _key(self, key):
+        return "/".join(self._groups + [key]) if key else "/".join(self._groups)
+
+    def beginGroup(self, prefix):
+        self._groups.append(prefix.strip("/"))
+
+    def endGroup(self):
+        if self._groups:
+            self._groups.pop()
+
+    def group(self):
+        return "/".join(self._groups)
+
+    def contains(self, key):
+        return self._key(key) in self.store.values
+
+    def value(self, key, defaultValue=None, type=None):
+        value = self.store.values.get(self._key(key))
+        if value is None:
+            return defaultValue
+        value = SettingsStore.decode(value)
+        if type is None:
+            return value
+        try:
+            if type is bool:
+                if isinstance(value, str):
+                    return value.strip().lower() in ("true", "1", "yes", "on")
+                return bool(value)
+            if type is int:
+                return int(float(value))
+            if type is float:
+                return float(value)
+            if type is str:
+                if isinstance(value, QColor):
+                    return value.name(QColor.NameFormat.HexArgb)
+                return value if isinstance(value, str) else str(value)
+            return type(value)
+        except (TypeError, ValueError):
+            return defaultValue
+
+    def setValue(self, key, value):
+        self.store.set(self._key(key), value)
+
+    def remove(self, key):
+        self.store.remove(self._key(key))
+
+    def allKeys(self):
+        prefix = self.group()
+        if not prefix:
+            return list(self.store.values)
+        return [
+            k[len(prefix) + 1 :] for k in self.store.values if k.startswith(prefix + "/")
+        ]
+
+    def sync(self):
+        """Schedules the batched flush; SettingsStore.flush() writes at once."""
+        self.store.schedule_flush()
+
+    def fileName(self):
+        return self.store.path
+
+
 # --- INTEGRATED Grid_DesktopEN.py (Converted to PySide6) ---
 
 # --- Keyboard import (from Grid_DesktopEN.py) --- # [23]
-_GRID_HAS_KEYBOARD_LIB = False
-try:
-    import keyboard as grid_keyboard_module  # Use an alias to avoid conflict
-
-    _GRID_HAS_KEYBOARD_LIB = True
-except ImportError:
-    _GRID_HAS_KEYBOARD_LIB = False
-except Exception:
-    _GRID_HAS_KEYBOARD_LIB = False
+_grid_keyboard = _OptionalModule("keyboard", "grid keyboard support")
+_GRID_HAS_KEYBOARD_LIB = _grid_keyboard.installed()
 
 # --- Translation Data (from Grid_DesktopEN.py, namespaced) --- # [24]
 grid_translations = {
@@ -529,6 +922,86 @@ class GridOverlay(QWidget):
             list(set(v_lines_x_coords))
         )  # [61]
 
+    def get_nearest_grid_lines(
+        self, x: float, y: float
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Returns the Y coordinate of the visible horizontal line nearest to y and
+        the X coordinate of the visible vertical line nearest to x (None if there
+        is no such line). Uses the same coordinates as get_visible_grid_lines,
+        but computes the answer directly instead of enumerating every line.
+        """
+        if not self.visible:
+            return None, None
+
+        widget_width = self.width()
+        widget_height = self.height()
+
+        if self.grid_mode == GridOverlay.MODE_SECTIONS:
+            if self.horizontal_sections <= 0 or self.vertical_sections <= 0:
+                return None, None
+            nearest_y = self._nearest_section_line(
+                y, self.offset_y, widget_height, self.horizontal_sections
+            )
+            nearest_x = self._nearest_section_line(
+                x, self.offset_x, widget_width, self.vertical_sections
+            )
+            return nearest_y, nearest_x
+
+        if self.grid_mode == GridOverlay.MODE_CELL_SIZE:
+            if self.cell_width <= 0 or self.cell_height <= 0:
+                return None, None
+            nearest_y = self._nearest_cell_line(
+                y, self.offset_y, widget_height, self.cell_height
+            )
+            nearest_x = self._nearest_cell_line(
+                x, self.offset_x, widget_width, self.cell_width
+            )
+            return nearest_y, nearest_x
+
+        return None, None
+
+    @staticmethod
+    def _nearest_section_line(value, offset, length, sections):
+        """Nearest of the lines int(i * length / sections) + offset, i = 1..sections-1."""
+        last_index = sections - 1
+        if last_index < 1:
+            return None
+        spacing = float(length) / sections
+        if spacing <= 0:
+            return offset
+        guess = min(max(round((value - offset) / spacing), 1), last_index)
+        # int() truncation moves a line by less than a pixel, so the nearest
+        # line is within two pixels of the rounded index. With fewer pixels
+        # than sections that spans more than one index on either side.
+        reach = int(2 / spacing) + 1
+        best = None
+        for index in range(
+            max(guess - reach, 1), min(guess + reach, last_index) + 1
+        ):
+            coord = int(index * spacing) + offset
+            if best is None or (abs(value - coord), coord) < (abs(value - best), best):
+                best = coord
+        return best
+
+    @staticmethod
+    def _nearest_cell_line(value, offset, length, cell_size):
+        """Nearest of the lines int(k * cell_size + offset) lying inside [0, length]."""
+        first_index = math.floor(-offset / cell_size)
+        if int(first_index * cell_size + offset) < 0:
+            first_index += 1
+        last_index = math.ceil((length - offset) / cell_size) - 1
+        if last_index < first_index:
+            return None
+        guess = round((value - offset) / cell_size)
+        best = None
+        for index in (guess - 1, guess, guess + 1):
+            index = min(max(index, first_index), last_index)
+            coord = int(index * cell_size + offset)
+            if best is None or (abs(value - coord), coord) < (abs(value - best), best):
+                best = coord
+        return best
+
 
 class GridSettingsWindow(QMainWindow):
     # Signal to notify when visibility changes, so ControlPanel can update its checkbox
@@ -537,7 +1010,7 @@ class GridSettingsWindow(QMainWindow):
     def __init__(self, grid_overlay_widget):
         super(GridSettingsWindow, self).__init__()
         self.grid_overlay = grid_overlay_widget
-        self.settings = QSettings("GridToolIntegrated", "ConfigurableGrid")  # [62]
+        self.settings = Settings("GridToolIntegrated", "ConfigurableGrid")  # [62]
         self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
         self._loading_settings = False
         self.initUI()
@@ -1683,6 +2156,8 @@ class LinesWidzetLiniiSiatki(LinesOknoNakladki):
     def ustaw_pozycje(self, poz):
         if self._pozycja != poz:
             self._pozycja = poz  # [175]
+            if self.lines_app:
+                self.lines_app.invalidate_guide_line_cache()
             self._aktualizuj_geometrie()
             self.update()
 
@@ -2106,6 +2581,7 @@ class AplikacjaLiniiPomocniczych(QObject):
         self.nastepny_id_siatki = 0
         self.okna_nakladki = {"top": None, "left": None, "corner": None}
         self.aktywne_linie_siatki = {}
+        self._sorted_guide_lines = None
         self.przeciaganie_nowej_linii = False
         self.typ_nowej_linii = None
         self.widzet_nowej_linii = None
@@ -2549,6 +3025,7 @@ class AplikacjaLiniiPomocniczych(QObject):
                 {"type": typ_linii, "pos": pozycja_koncowa, "id": nowe_id}
             )
             self.aktywne_linie_siatki[nowe_id] = konczony_widzet
+            self.invalidate_guide_line_cache()
             self.zapisz_stan()
 
     def anuluj_przeciaganie_nowej_linii(self):
@@ -2580,6 +3057,7 @@ class AplikacjaLiniiPomocniczych(QObject):
 
         widzet = LinesWidzetLiniiSiatki(typ_linii, pozycja, id_siatki, self)
         self.aktywne_linie_siatki[id_siatki] = widzet
+        self.invalidate_guide_line_cache()
 
         if not any(d["id"] == id_siatki for d in self.dane_linii_siatki):
             print(
@@ -2623,6 +3101,7 @@ class AplikacjaLiniiPomocniczych(QObject):
 
     def usun_widzet_linii_siatki_po_id(self, id_siatki):
         widzet = self.aktywne_linie_siatki.pop(id_siatki, None)
+        self.invalidate_guide_line_cache()
         if widzet:
             widzet.zniszcz_podpowiedz()  # [265]
             widzet.hide()
@@ -2676,6 +3155,7 @@ class AplikacjaLiniiPomocniczych(QObject):
                 widzet.hide()
                 widzet.deleteLater()  # [270]
 
+        self.invalidate_guide_line_cache()
         self.dane_linii_siatki = []
         self.nastepny_id_siatki = 0
         self.zapisz_stan()
@@ -2782,6 +3262,25 @@ class AplikacjaLiniiPomocniczych(QObject):
                 active_lines.append((line_widget.typ, line_widget.pobierz_pozycje()))
         return active_lines
 
+    def invalidate_guide_line_cache(self):
+        """Drops the sorted guide line positions after a line was added, moved or removed."""
+        self._sorted_guide_lines = None
+
+    def get_sorted_guide_lines(self) -> Tuple[List[int], List[int]]:
+        """Returns sorted positions of the active horizontal and vertical guide lines."""
+        if not self.linijki_widoczne:
+            return [], []
+        if self._sorted_guide_lines is None:
+            h_positions = []
+            v_positions = []
+            for line_type, line_pos in self.get_active_guide_lines():
+                if line_type == "h":
+                    h_positions.append(line_pos)
+                elif line_type == "v":
+                    v_positions.append(line_pos)
+            self._sorted_guide_lines = (sorted(h_positions), sorted(v_positions))
+        return self._sorted_guide_lines
+
     def uruchom_lines_ui(self):
         if self.linijki_widoczne:
             self.pokaz_linijki()
@@ -2820,6 +3319,7 @@ class AplikacjaLiniiPomocniczych(QObject):
 
         for id_siatki in list(self.aktywne_linie_siatki.keys()):  # Use list()
             widget = self.aktywne_linie_siatki.pop(id_siatki, None)  # Safe removal
+            self.invalidate_guide_line_cache()
             if widget:
                 print(f"LINES: Closing gridline widget: {id_siatki}")
                 if widget.podpowiedz:  # Check if tooltip exists
@@ -2934,6 +3434,7 @@ if _IS_WINDOWS:
         VK_OEM_COMMA = 0xBC
         VK_OEM_4 = 0xDB
         VK_OEM_6 = 0xDD
+        VK_1 = 0x31
         print("WinAPI libraries loaded successfully")
     except OSError as e:  # [290]
         print(
@@ -2950,6 +3451,7 @@ if _IS_WINDOWS:
         ) = VK_LEFT = VK_RIGHT = VK_PRIOR = VK_NEXT = 0
         VK_F4 = 0  # Added for consistency, although _IS_WINDOWS will be False
         VK_OEM_COMMA = VK_OEM_4 = VK_OEM_6 = 0
+        VK_1 = 0
 else:  # [291]
     user32 = gdi32 = None
     CreateRectRgn = CombineRgn = DeleteObject = SetWindowRgn = lambda *args: None
@@ -2962,6 +3464,7 @@ else:  # [291]
     ) = VK_LEFT = VK_RIGHT = VK_PRIOR = VK_NEXT = 0
     VK_F4 = 0  # Added for consistency
     VK_OEM_COMMA = VK_OEM_4 = VK_OEM_6 = 0
+    VK_1 = 0
     print(
         "Non-Windows system detected. Window region and global hotkey functionality unavailable."
     )
@@ -2972,6 +3475,7 @@ HOTKEY_ID_EDIT = 2
 HOTKEY_ID_BOARD = 3
 HOTKEY_ID_SHIFT_PRINTSCREEN = 4
 HOTKEY_ID_TEMP = 5
+HOTKEY_ID_BURST_SCREENSHOT = 6
 
 # New IDs for Lines
 HOTKEY_ID_LINES_TOGGLE = 10
@@ -2999,6 +3503,9 @@ HOTKEY_ID_SNAP_GRID = 32
 HOTKEY_ID_SNAP_ALL = 33  # [295]
 HOTKEY_ID_SNAP_OFF = 34  # New ID for turning Snap off
 
+# Scene slot hotkeys: Ctrl+Alt+1 .. Ctrl+Alt+9 use IDs 41 .. 49
+HOTKEY_ID_SCENE_SLOT_BASE = 40
+
 
 class Shape:
     def __init__(
@@ -3804,6 +4311,50 @@ class Shape:
             ]
         }  # [548]
 
+    @staticmethod
+    def split_style(data):
+        """
+        Moves the SCENE_STYLE_KEYS fields of a serialized shape into a separate
+        style dict and returns it. The text of a text shape stays in the shape.
+        """
+        style = {key: data.pop(key) for key in SCENE_STYLE_KEYS if key in data}
+        text_props = style.get("text_properties")
+        if isinstance(text_props, dict) and "text" in text_props:
+            text_props = dict(text_props)
+            data["text_properties"] = {"text": text_props.pop("text")}
+            style["text_properties"] = text_props
+        return style
+
+    @staticmethod
+    def merge_style(data, style):
+        """Reverses split_style(), filling the style fields of a serialized shape."""
+        for key, value in style.items():
+            own_value = data.get(key)
+            if isinstance(own_value, dict) and isinstance(value, dict):
+                data[key] = {**value, **own_value}
+            elif key not in data:
+                data[key] = value
+        return data
+
+    _shared_colors = {}
+
+    @staticmethod
+    def _shared_color(color_name):
+        """
+        Returns one QColor per distinct color string, so shapes loaded from a
+        scene share their color objects instead of each holding a copy. Shape
+        colors are replaced rather than modified in place, so sharing is safe.
+        """
+        color = Shape._shared_colors.get(color_name)
+        if color is None:
+            color = QColor(color_name)
+            if not color.isValid():
+                return color
+            if len(Shape._shared_colors) >= 4096:
+                Shape._shared_colors.clear()
+            Shape._shared_colors[color_name] = color
+        return color
+
     @staticmethod  # [549]
     def from_dict(data):  # [550]
         """Deserializes a dictionary to a Shape object."""  # [551]
@@ -3813,7 +4364,7 @@ class Shape:
         default_color = QColor(255, 0, 0, 255)  # [555]
         c = default_color  # [556]
         if cs:  # [557]
-            temp_c = QColor(cs)  # [558]
+            temp_c = Shape._shared_color(cs)  # [558]
             if temp_c.isValid():  # [559]
                 c = temp_c  # [560]
             else:  # [561]
@@ -3844,9 +4395,11 @@ class Shape:
         pattern = data.get("line_pattern", None)  # [579]
 
         rt = data.get("rotation", 0)  # [580]
-        tp = (
-            deepcopy(data.get("text_properties", None)) if st == "text" else None
-        )  # [581]
+        # Shape() deep-copies the style dicts, which may be shared style table
+        # entries; shallow copies keep the edits below off the shared dicts.
+        tp = data.get("text_properties", None) if st == "text" else None  # [581]
+        if isinstance(tp, dict):
+            tp = dict(tp)
         if st == "text" and tp:  # [582]
             tp.setdefault("curve_angle", 0)  # [583]
             tp.setdefault("is_angle_display", False)  # [584]
@@ -3859,7 +4412,7 @@ class Shape:
         gp_data = data.get("gradient_properties")  # [587]
         gp = None  # [588]
         if gp_data and isinstance(gp_data, dict):  # [589]
-            gp = deepcopy(gp_data)  # [590]
+            gp = dict(gp_data)  # [590]
             if "color_stops" in gp and isinstance(gp["color_stops"], list):  # [591]
                 stops = []  # [592]
                 valid_stops = True  # [593]
@@ -3895,7 +4448,7 @@ class Shape:
         hp_data = data.get("hatch_properties")  # [614]
         hp = None  # [615]
         if hp_data and isinstance(hp_data, dict):  # [616]
-            hp = deepcopy(hp_data)  # [617]
+            hp = dict(hp_data)  # [617]
             if "color" in hp and isinstance(hp["color"], str):  # [618]
                 hatch_color = QColor(hp["color"])  # [619]
                 if hatch_color.isValid():  # [620]
@@ -4047,131 +4600,1249 @@ class Shape:
             return None  # [696]
 
 
-class DesktopOverlayRgn(QWidget):  # [697]
-    drawing_mode_changed = Signal(bool)  # [698]
-    edit_mode_changed = Signal(bool)  # [699]
-    board_mode_changed = Signal(bool)  # [700]
-    temp_mode_changed = Signal(bool)  # [701]
-    color_changed = Signal(QColor)  # [702]
-    board_pen_color_changed = Signal(QColor)  # [703]
-    edit_pen_color_changed = Signal(QColor)  # [704]
-    board_background_color_changed = Signal(QColor)  # [705]
-    temp_color_changed = Signal(QColor)  # [706]
-    defaults_changed = Signal()  # [707]
-    shapes_visibility_changed = Signal(bool)  # [708]
-    dimension_preview_color_changed = Signal(QColor)  # [709]
-    angle_tool_config_changed = Signal(dict)  # [710]
-    show_center_point_changed = Signal(bool)  # [711]
-    line_point_arrow_style_changed = Signal(str)  # [712]
-    divide_enabled_changed = Signal(bool)  # [713]
-    number_of_divisions_changed = Signal(int)  # [714]
-    division_point_color_changed = Signal(QColor)  # [715]
-    division_point_size_changed = Signal(float)  # [716]
-    # Snapping signals # [717]
-    snap_mode_changed = Signal(str)  # Emits "lines", "grid", "all", or "none" # [718]
-    snap_sensitivity_changed = Signal(int)  # [719]
-    # Snapping feedback attributes # [720]
-    snapped_point_preview: Optional[QPointF] = None  # For point snapping # [721]
-    snapped_line_preview: Optional[Tuple[str, int]] = (
-        None  # For line snapping ('h' or 'v', coord) # [722]
-    )
+class ShapeSelection(list):
+    """
+    Ordered list of selected shapes with constant-time membership.
 
-    def _register_global_hotkey(self):  # [723]
-        """Registers global hotkeys using WinAPI."""  # [724]
-        if not _IS_WINDOWS or not VK_OEM_5:  # [725]
+    Behaves like the plain list previously stored in selected_shapes (order is
+    kept, so selected_shapes[0] still means "first selected"), but `in` is
+    answered from an identity count table instead of a list scan. Every
+    mutation reports (removed, added) shapes to the optional on_change
+    callback so the overlay can repaint only the affected areas.
+    """
+
+    def __init__(self, items=(), on_change=None):
+        super().__init__()
+        self._counts = {}
+        self.on_change = None
+        self.replace(items)
+        self.on_change = on_change
+
+    def __contains__(self, item):
+        return id(item) in self._counts
+
+    def __deepcopy__(self, memo):
+        # Undo/redo snapshots store plain lists; never copy the callback.
+        return deepcopy(list(self), memo)
+
+    def __copy__(self):
+        return list(self)
+
+    def __reduce_ex__(self, protocol):
+        return (list, (list(self),))
+
+    def _track(self, items):
+        for item in items:
+            key = id(item)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def _untrack(self, items):
+        for item in items:
+            key = id(item)
+            remaining = self._counts.get(key, 0) - 1
+            if remaining > 0:
+                self._counts[key] = remaining
+            else:
+                self._counts.pop(key, None)
+
+    def _notify(self, removed, added):
+        if self.on_change and (removed or added):
+            self.on_change(removed, added)
+
+    def replace(self, items):
+        """Replaces the whole selection, notifying only about the difference."""
+        new_items = list(items) if items is not None else []
+        old_items = list(self)
+        super().clear()
+        self._counts = {}
+        super().extend(new_items)
+        self._track(new_items)
+        old_ids = {id(s) for s in old_items}
+        removed = [s for s in old_items if id(s) not in self._counts]
+        added = [s for s in new_items if id(s) not in old_ids]
+        self._notify(removed, added)
+
+    def append(self, item):
+        super().append(item)
+        self._track((item,))
+        self._notify([], [item])
+
+    def extend(self, items):
+        items = list(items)
+        super().extend(items)
+        self._track(items)
+        self._notify([], items)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def insert(self, index, item):
+        super().insert(index, item)
+        self._track((item,))
+        self._notify([], [item])
+
+    def remove(self, item):
+        if id(item) not in self._counts:
+            raise ValueError("ShapeSelection.remove(x): x not in selection")
+        for i, existing in enumerate(self):
+            if existing is item:
+                super().__delitem__(i)
+                break
+        self._untrack((item,))
+        self._notify([item], [])
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._untrack((item,))
+        self._notify([item], [])
+        return item
+
+    def clear(self):
+        removed = list(self)
+        super().clear()
+        self._counts = {}
+        self._notify(removed, [])
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            old_items = self[index]
+            new_items = value
+        else:
+            old_items = [self[index]]
+            new_items = [value]
+        super().__setitem__(index, value)
+        self._untrack(old_items)
+        self._track(new_items)
+        self._notify(old_items, new_items)
+
+    def __delitem__(self, index):
+        old = self[index]
+        super().__delitem__(index)
+        old_items = old if isinstance(index, slice) else [old]
+        self._untrack(old_items)
+        self._notify(old_items, [])
+
+
+class SceneStreamReader:
+    """
+    Incremental reader for scene files.
+
+    iter_shape_dicts() walks the "shapes" array one element at a time, so only
+    the shape dict being decoded (plus one read chunk) is held in memory
+    instead of the whole document tree. The other top-level keys listed in
+    SCENE_SETTINGS_KEYS are collected into settings whether they come before
+    or after "shapes"; they are complete once the iterator is exhausted. Old
+    files that are a bare list of shapes are read the same way.
+
+    Version 2 files keep the shape styles in a "styles" table. Shapes are
+    yielded with their style merged back in, so callers always see version 1
+    shape dicts. Saved files put the table first; if a file has it after
+    "shapes", the shapes that need it are held back until it has been read.
+    """
+
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.settings = {}
+        self.format_error = None
+        self.schema_version = 1
+        self.styles = None
+        self.file_size = os.path.getsize(filename)
+        self.bytes_read = 0
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._raw_file = None
+        self._file = None
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._unresolved_shapes = None
+
+    def iter_shape_dicts(self):
+        """Yields the elements of the scene's shape list in file order."""
+        with open(self.filename, "rb") as raw_file:
+            # Compressed scenes are recognised by the gzip magic number, so
+            # the file extension does not matter.
+            is_gzip = raw_file.read(2) == b"\x1f\x8b"
+            raw_file.seek(0)
+            self._raw_file = raw_file
+            self._file = gzip.GzipFile(fileobj=raw_file) if is_gzip else raw_file
+            try:
+                yield from self._read_document()
+            finally:
+                if is_gzip:
+                    self._file.close()
+                self._file = None
+                self._raw_file = None
+
+    def _read_document(self):
+        first = self._peek()
+        if first == "[":
+            print("Loading old scene format (list of shapes).")
+            yield from self._read_shape_array()
+        elif first == "{":
+            self._pos += 1
+            if self._peek() == "}":
+                self._pos += 1
+            else:
+                while True:
+                    key = self._read_value()
+                    if not isinstance(key, str):
+                        raise self._error("Expecting property name")
+                    self._expect(":")
+                    if key == "shapes":
+                        if self._peek() != "[":
+                            self.format_error = "'shapes' key in loaded data is not a list"
+                            return
+                        yield from self._read_shape_array()
+                    else:
+                        value = self._read_value()
+                        if key in SCENE_SETTINGS_KEYS:
+                            self.settings[key] = value
+                        elif key == "styles":
+                            self._set_styles(value)
+                        elif key == "schema_version":
+                            self._set_schema_version(value)
+                    separator = self._peek()
+                    self._pos += 1
+                    if separator == "}":
+                        break
+                    if separator != ",":
+                        raise self._error("Expecting ',' delimiter")
+        else:
+            self._read_value()
+            self.format_error = "Loaded data is not a list or dictionary"
+            return
+
+        if self._peek() != "":
+            raise self._error("Extra data")
+
+        if self._unresolved_shapes:
+            if self.styles is None:
+                print(
+                    f"Warning: Scene file {self.filename} references shape styles but has no 'styles' table. Using default styles."
+                )
+                self.styles = []
+            for shape_data in self._unresolved_shapes:
+                yield self._resolve_style(shape_data)
+        self._unresolved_shapes = None
+
+    def _set_schema_version(self, value):
+        if isinstance(value, int):
+            self.schema_version = value
+        if self.schema_version > SCENE_SCHEMA_VERSION:
             print(
-                "Skipping global hotkey registration (Not Windows or VK_OEM_5 undefined)"
-            )  # [726]
-            return False  # [727]
-        if not self.hwnd:  # [728]
-            self.hwnd = self.winId()  # [729]
-        if not self.hwnd:  # [730]
-            print("Cannot register global hotkey (HWND not available yet)")  # [731]
-            QTimer.singleShot(200, self._register_global_hotkey)  # [732]
-            return False  # [733]
+                f"Warning: Scene file {self.filename} uses format version {value}, newer than {SCENE_SCHEMA_VERSION}. Loading what can be read."
+            )
 
-        registered_count = 0  # [734]
-        failed_keys = []  # [735]
+    def _set_styles(self, value):
+        if not isinstance(value, list):
+            print("Warning: 'styles' in scene file is not a list. Ignoring it.")
+            value = []
+        self.styles = [style if isinstance(style, dict) else {} for style in value]
+
+    def _resolve_style(self, shape_data):
+        """Merges the referenced style table entry into a shape dict."""
+        if not isinstance(shape_data, dict) or "style" not in shape_data:
+            return shape_data
+        index = shape_data.pop("style")
+        if isinstance(index, int) and 0 <= index < len(self.styles):
+            return Shape.merge_style(shape_data, self.styles[index])
+        print(f"Warning: Invalid style index {index} in scene file. Using defaults.")
+        return shape_data
+
+    def _read_shape_array(self):
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            shape_data = self._read_value()
+            if self._unresolved_shapes is not None:
+                # Later shapes wait too, so the drawing order is kept.
+                self._unresolved_shapes.append(shape_data)
+            elif self.styles is not None:
+                yield self._resolve_style(shape_data)
+            elif isinstance(shape_data, dict) and "style" in shape_data:
+                self._unresolved_shapes = [shape_data]
+            else:
+                yield shape_data
+            separator = self._peek()
+            self._pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise self._error("Expecting ',' delimiter")
 
-        hotkeys_to_register = [  # [736]
-            {
-                "id": HOTKEY_ID_DRAW,
-                "vk": VK_OEM_5,
-                "mod": MOD_CONTROL,
-                "name": "Ctrl+\\",
-            },  # [737]
-            {
-                "id": HOTKEY_ID_EDIT,
-                "vk": VK_OEM_5,
-                "mod": MOD_CONTROL | MOD_ALT,
-                "name": "Ctrl+Alt+\\",
-            },  # [738]
-            {
-                "id": HOTKEY_ID_BOARD,
-                "vk": VK_OEM_5,
-                "mod": MOD_ALT,
-                "name": "Alt+\\",
-            },  # [739]
-            {
-                "id": HOTKEY_ID_SHIFT_PRINTSCREEN,
-                "vk": VK_SNAPSHOT,
-                "mod": MOD_SHIFT,
-                "name": "Shift+PrintScreen",
-            },  # [740]
-            {
-                "id": HOTKEY_ID_TEMP,
-                "vk": VK_OEM_5,
-                "mod": MOD_ALT | MOD_SHIFT,
-                "name": "Alt+Shift+\\",
-            },  # [741]
-            # Lines hotkeys # [742]
-            {
-                "id": HOTKEY_ID_LINES_TOGGLE,
-                "vk": VK_HOME,
-                "mod": MOD_ALT | MOD_SHIFT,
-                "name": "Alt+Shift+Home (Lines Toggle)",
-            },  # [743]
-            {
-                "id": HOTKEY_ID_LINES_POS,
-                "vk": VK_PRIOR,
-                "mod": MOD_ALT | MOD_SHIFT,
-                "name": "Alt+Shift+PageUp (Lines Pos)",
-            },  # [744]
-            {
-                "id": HOTKEY_ID_LINES_CLEAR,
-                "vk": VK_F9,
-                "mod": MOD_CONTROL | MOD_ALT,
-                "name": "Ctrl+Alt+F9 (Lines Clear)",
-            },  # [745]
-            {
-                "id": HOTKEY_ID_LINES_INC_THICK,
-                "vk": VK_PRIOR,
-                "mod": MOD_CONTROL | MOD_ALT,
-                "name": "Ctrl+Alt+PageUp (Lines Inc Thick)",
-            },  # [746]
-            {
-                "id": HOTKEY_ID_LINES_DEC_THICK,
-                "vk": VK_NEXT,
-                "mod": MOD_CONTROL | MOD_ALT,
-                "name": "Ctrl+Alt+PageDown (Lines Dec Thick)",
-            },  # [747]
-            # Grid hotkeys # [748]
-            {
-                "id": HOTKEY_ID_GRID_TOGGLE,
-                "vk": VK_F10,
-                "mod": MOD_CONTROL | MOD_ALT,
-                "name": "Ctrl+Alt+F10 (Grid Toggle)",
-            },  # [749]
-            {
-                "id": HOTKEY_ID_GRID_INC_COLS,
-                "vk": VK_UP,
-                "mod": MOD_CONTROL | MOD_ALT,
-                "name": "Ctrl+Alt+Up (Grid Inc Cols)",
-            },  # [750]
-            {
-                "id": HOTKEY_ID_GRID_DEC_COLS,
-                "vk": VK_DOWN,
-                "mod": MOD_CONTROL | MOD_ALT,
+    def _read_value(self):
+        """Decodes the next complete JSON value, reading more of the file as needed."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # In valid JSON a value is followed by whitespace or a delimiter; if
+            # it is not, a number may have been cut off by the end of the chunk.
+            if (
+                end == len(self._buffer) or self._buffer[end] not in " \t\n\r,]}:"
+            ) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _peek(self):
+        """Skips whitespace and returns the next character ('' at the end of the file)."""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            length = len(buffer)
+            while pos < length and buffer[pos] in " \t\n\r":
+                pos += 1
+            self._pos = pos
+            if pos < length:
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise self._error(f"Expecting '{char}'")
+        self._pos += 1
+
+    def _fill(self):
+        """Appends the next chunk to the buffer. Returns False at the end of the file."""
+        if self._eof:
+            return False
+        chunk = self._file.read(self.CHUNK_SIZE)
+        self.bytes_read = self._raw_file.tell()
+        if not chunk:
+            self._eof = True
+            tail = self._text_decoder.decode(b"", final=True)
+            self._buffer = self._buffer[self._pos :] + tail
+            self._pos = 0
+            return bool(tail)
+        # Drop the consumed text so the buffer stays about one chunk long.
+        self._buffer = self._buffer[self._pos :] + self._text_decoder.decode(chunk)
+        self._pos = 0
+        return True
+
+    def _error(self, message):
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+
+class CachedSceneReader:
+    """
+    Serves a scene from a SceneCache entry through the same interface as
+    SceneStreamReader. bytes_read and file_size count shapes, so progress
+    reporting works unchanged.
+    """
+
+    def __init__(self, filename, entry):
+        self.filename = filename
+        self.settings = deepcopy(entry["settings"])
+        self.format_error = None
+        self.file_size = len(entry["shapes"])
+        self.bytes_read = 0
+        self._shapes = entry["shapes"]
+
+    def iter_shape_dicts(self):
+        for index, shape_data in enumerate(self._shapes, 1):
+            self.bytes_read = index
+            yield shape_data
+
+
+class _RecordingSceneReader(SceneStreamReader):
+    """SceneStreamReader that hands the shapes it reads to a SceneCache."""
+
+    def __init__(self, filename, cache, path, stamp):
+        super().__init__(filename)
+        self._cache = cache
+        self._path = path
+        self._stamp = stamp
+
+    def iter_shape_dicts(self):
+        shapes = []
+        sampled_bytes = 0
+        samples = 0
+        limit = self._cache.max_entry_bytes()
+        for index, shape_data in enumerate(super().iter_shape_dicts()):
+            if shapes is not None:
+                shapes.append(shape_data)
+                if index % SCENE_CACHE_SAMPLE_STRIDE == 0:
+                    sampled_bytes += SceneCache.estimate_size(shape_data)
+                    samples += 1
+                # Stop collecting as soon as the scene is clearly too big to
+                # cache, so large files are still streamed in constant memory.
+                if sampled_bytes * len(shapes) > limit * samples:
+                    shapes = None
+            yield shape_data
+        if shapes is not None and not self.format_error:
+            size = sampled_bytes * len(shapes) // max(1, samples)
+            self._cache.put(self._path, self._stamp, shapes, self.settings, size)
+
+
+class SceneCache:
+    """
+    LRU cache of parsed scene files, keyed by absolute path and checked
+    against the file's modification time and size on every lookup.
+
+    Entries hold the shape dicts and settings of a scene; Shape objects are
+    still built per load because loaded shapes are edited independently.
+    Entry sizes are estimated from a sample of their shape dicts, and the
+    least recently used entries are evicted when the total exceeds
+    max_bytes. Scenes larger than half of max_bytes are not cached. Lookups
+    may come from the background loader, so the cache is locked.
+    """
+
+    def __init__(self, max_bytes=SCENE_CACHE_DEFAULT_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_size(value):
+        """Approximate memory used by a decoded JSON value, in bytes."""
+        if value is None or isinstance(value, bool):
+            return 0
+        if isinstance(value, int) and -5 <= value <= 256:
+            return 0  # Small ints are shared by the interpreter
+        size = sys.getsizeof(value)
+        if isinstance(value, dict):
+            for key, item in value.items():
+                size += sys.getsizeof(key) + SceneCache.estimate_size(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                size += SceneCache.estimate_size(item)
+        return size
+
+    @staticmethod
+    def _file_stamp(path):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def max_entry_bytes(self):
+        return self.max_bytes // 2
+
+    def open(self, filename):
+        """
+        Returns a reader for filename: a CachedSceneReader if the file is
+        cached and unchanged, otherwise a stream reader that adds the scene
+        to the cache once it has been read to the end.
+        """
+        path = os.path.abspath(filename)
+        stamp = self._file_stamp(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry["stamp"] == stamp:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return CachedSceneReader(filename, entry)
+            if entry is not None:
+                self._remove(path)
+            self.misses += 1
+        if self.max_bytes <= 0:
+            return SceneStreamReader(filename)
+        return _RecordingSceneReader(filename, self, path, stamp)
+
+    def put(self, path, stamp, shapes, settings, size):
+        if size > self.max_entry_bytes():
+            return
+        with self._lock:
+            if path in self._entries:
+                self._remove(path)
+            self._entries[path] = {
+                "stamp": stamp,
+                "shapes": shapes,
+                "settings": deepcopy(settings),
+                "size": size,
+            }
+            self.current_bytes += size
+            self._evict()
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max(0, max_bytes)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, path):
+        entry = self._entries.pop(path)
+        self.current_bytes -= entry["size"]
+
+    def _evict(self):
+        while self._entries and self.current_bytes > self.max_bytes:
+            path = next(iter(self._entries))
+            self._remove(path)
+            self.evictions += 1
+            print(f"Scene cache: evicted {path}")
+
+
+class SceneJournal:
+    """
+    Append-only autosave journal of scene changes, one JSON record per line.
+
+    The first record is a snapshot of the scene; it is followed by "add",
+    "remove", "modify" and "order" records that refer to shapes by journal
+    id. Records are written and fsynced by a background thread, which also
+    keeps its own copy of the scene as shape dicts. That lets it drop
+    "modify" records that change nothing and compact the journal into a new
+    snapshot without involving the GUI thread. A torn last line left by a
+    crash is ignored by read().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._queue = queue.Queue()
+        self._thread = None
+        self._file = None
+        self._shapes = {}
+        self._records_since_snapshot = 0
+
+    def start(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name="SceneJournal", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, records):
+        """Queues a list of records for writing. Cheap enough for the GUI thread."""
+        if records and self._thread is not None:
+            self._queue.put(records)
+
+    def stop(self, discard=True):
+        """Writes the queued records and stops the writer; discard removes the journal."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+        if discard:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def read(path):
+        """Replays a journal file and returns the scene's shape dicts in order."""
+        shapes = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(
+                        f"Autosave journal {path}: stopping at unreadable line {line_number}."
+                    )
+                    break
+                SceneJournal._apply(record, shapes)
+        return [shape_data for shape_data in shapes.values() if shape_data]
+
+    @staticmethod
+    def _apply(record, shapes):
+        """
+        Applies one record to shapes, a dict of shape dicts by journal id kept
+        in scene order. Returns False if the record changes nothing.
+        """
+        op = record.get("op")
+        if op == "snapshot":
+            shapes.clear()
+            shapes.update((jid, shape_data) for jid, shape_data in record["shapes"])
+        elif op == "add":
+            shapes[record["id"]] = record["shape"]
+        elif op == "remove":
+            return shapes.pop(record["id"], False) is not False
+        elif op == "modify":
+            if record["id"] not in shapes or shapes[record["id"]] == record["shape"]:
+                return False
+            shapes[record["id"]] = record["shape"]
+        elif op == "order":
+            reordered = {jid: shapes[jid] for jid in record["ids"] if jid in shapes}
+            shapes.clear()
+            shapes.update(reordered)
+        return True
+
+    def _run(self):
+        try:
+            self._write_snapshot()
+            while True:
+                records = self._queue.get()
+                if records is None:
+                    break
+                lines = []
+                for record in records:
+                    if self._apply(record, self._shapes):
+                        lines.append(json.dumps(record, separators=(",", ":")))
+                if not lines:
+                    continue
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._records_since_snapshot += len(lines)
+                # Compacting costs as much as writing every shape once, so wait
+                # until the records outnumber the shapes to keep it amortised.
+                if self._records_since_snapshot > max(
+                    AUTOSAVE_COMPACT_RECORDS, len(self._shapes)
+                ):
+                    self._write_snapshot()
+        except Exception as e:
+            print(f"Autosave journal stopped after an error: {e}")
+            traceback.print_exc()
+        finally:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _write_snapshot(self):
+        """Rewrites the journal as a single snapshot record, atomically."""
+        if self._file:
+            self._file.close()
+            self._file = None
+        snapshot = {
+            "op": "snapshot",
+            "shapes": [[jid, shape_data] for jid, shape_data in self._shapes.items()],
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(snapshot, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._records_since_snapshot = 0
+        self._file = open(self.path, "a", encoding="utf-8")
+
+
+class SceneSlots:
+    """
+    Scene files preloaded into numbered slots for instant switching.
+
+    A worker thread reads each assigned file (through the SceneCache) and
+    builds a ready list of Shape objects from it. take() hands that list
+    over without copying and queues a fresh copy from the kept shape dicts,
+    so switching back to a slot is instant too. Results are collected on
+    the GUI thread by poll(); a generation counter per slot drops results
+    for files that were reassigned or reloaded in the meantime.
+    """
+
+    def __init__(self, count, scene_cache, build_shapes):
+        self.count = count
+        self._scene_cache = scene_cache
+        self._build_shapes = build_shapes
+        self._slots = [self._empty_slot() for _ in range(count)]
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = None
+
+    @staticmethod
+    def _empty_slot():
+        return {
+            "path": None,
+            "generation": 0,
+            "shape_dicts": None,
+            "settings": {},
+            "ready": None,
+            "error": None,
+        }
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="SceneSlots", daemon=True
+            )
+            self._thread.start()
+
+    def path(self, index):
+        return self._slots[index]["path"]
+
+    def status(self, index):
+        """Returns "empty", "loading", "ready" or "error"."""
+        slot = self._slots[index]
+        if not slot["path"]:
+            return "empty"
+        if slot["error"]:
+            return "error"
+        return "ready" if slot["ready"] is not None else "loading"
+
+    def assign(self, index, path):
+        """Puts a file into a slot (None empties it) and preloads it."""
+        slot = self._slots[index]
+        slot.update(self._empty_slot(), generation=slot["generation"] + 1)
+        slot["path"] = path
+        if path:
+            self.reload(index)
+
+    def reload(self, index):
+        """Reads the slot's file again, e.g. after it changed on disk."""
+        slot = self._slots[index]
+        if not slot["path"]:
+            return
+        slot["generation"] += 1
+        slot["ready"] = None
+        slot["error"] = None
+        self._ensure_thread()
+        self._jobs.put(("load", index, slot["generation"], slot["path"], None))
+
+    def take(self, index):
+        """
+        Returns (shapes, settings) for a slot and hands the shape list over to
+        the caller, or None if the slot has not been read yet. Builds the
+        shapes on the spot when a switch comes before the next copy is ready.
+        """
+        slot = self._slots[index]
+        if slot["shape_dicts"] is None:
+            return None
+        shapes = slot["ready"]
+        if shapes is None:
+            shapes = self._build_shapes(slot["shape_dicts"], slot["path"])
+        slot["ready"] = None
+        self._ensure_thread()
+        self._jobs.put(
+            ("copy", index, slot["generation"], slot["path"], slot["shape_dicts"])
+        )
+        return shapes, deepcopy(slot["settings"])
+
+    def poll(self):
+        """Stores finished worker results; returns the indices that changed."""
+        changed = []
+        while True:
+            try:
+                index, generation, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            slot = self._slots[index]
+            if generation != slot["generation"]:
+                continue
+            slot.update(result)
+            changed.append(index)
+        return changed
+
+    def busy(self):
+        return not self._jobs.empty() or not self._results.empty()
+
+    def _run(self):
+        while True:
+            kind, index, generation, path, shape_dicts = self._jobs.get()
+            try:
+                if kind == "load":
+                    reader = self._scene_cache.open(path)
+                    shape_dicts = list(reader.iter_shape_dicts())
+                    if reader.format_error:
+                        raise ValueError(reader.format_error)
+                    result = {
+                        "shape_dicts": shape_dicts,
+                        "settings": reader.settings,
+                        "ready": self._build_shapes(shape_dicts, path),
+                        "error": None,
+                    }
+                else:
+                    result = {"ready": self._build_shapes(shape_dicts, path)}
+            except Exception as e:
+                print(f"Scene slot {index + 1}: could not read {path}: {e}")
+                result = {"shape_dicts": None, "ready": None, "error": str(e)}
+            self._results.put((index, generation, result))
+
+
+class ScreenshotWriter:
+    """
+    Encodes and writes screenshots on a small thread pool.
+
+    save() hands a QImage to the pool, which encodes it into a ".part" file
+    next to the target and renames it into place, so the GUI thread only pays
+    for the grab. For burst capture hold() keeps raw images in memory and
+    release_held() queues them for encoding later. Finished writes are
+    collected on the GUI thread by poll().
+    """
+
+    def __init__(self, workers=SCREENSHOT_ENCODE_WORKERS):
+        self._workers = workers
+        self._pool = None
+        self._results = queue.Queue()
+        self._pending = 0
+        self._held = []
+        self._held_bytes = 0
+
+    @staticmethod
+    def png_quality(compression_level):
+        """Maps a zlib compression level (0-9) to the quality Qt's PNG writer takes."""
+        compression_level = max(0, min(9, compression_level))
+        return 100 - (compression_level * 91 + 8) // 9
+
+    def save(self, image, path, file_format, quality=-1):
+        """Queues an image for encoding; cheap enough for the GUI thread."""
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._workers, thread_name_prefix="ScreenshotWriter"
+            )
+        self._pending += 1
+        self._pool.submit(self._write, image, path, file_format, quality)
+
+    def hold(self, image, path, file_format, quality=-1):
+        """Keeps a raw capture in memory; returns the bytes held so far."""
+        self._held.append((image, path, file_format, quality))
+        self._held_bytes += image.sizeInBytes()
+        return self._held_bytes
+
+    def held_count(self):
+        return len(self._held)
+
+    def release_held(self):
+        """Queues the held captures for encoding, oldest first."""
+        held, self._held = self._held, []
+        self._held_bytes = 0
+        for image, path, file_format, quality in held:
+            self.save(image, path, file_format, quality)
+        return len(held)
+
+    def busy(self):
+        return self._pending > 0 or bool(self._held)
+
+    def poll(self):
+        """Returns (path, error) for each finished write; error is None on success."""
+        finished = []
+        while True:
+            try:
+                finished.append(self._results.get_nowait())
+            except queue.Empty:
+                break
+        self._pending -= len(finished)
+        return finished
+
+    def shutdown(self):
+        """Writes the held and queued captures and waits for the pool to finish."""
+        self.release_held()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _write(self, image, path, file_format, quality):
+        temp_path = path + ".part"
+        error = None
+        try:
+            if not image.save(temp_path, file_format, quality):
+                raise OSError(f"could not encode the image as {file_format.upper()}")
+            os.replace(temp_path, path)
+        except Exception as e:
+            error = str(e)
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        self._results.put((path, error))
+
+
+class MagnifierLoupe(QWidget):
+    """
+    Round magnifier that follows the cursor, drawn from cached layers.
+
+    When it is started, the desktop behind the overlay is grabbed once, and
+    a composite layer of that grab with the overlay's committed shapes is
+    built lazily: the overlay reports every area it repaints through
+    scene_changed(), and only the changed part inside the magnified area is
+    painted again before the loupe draws. A mouse move therefore costs one
+    scaled blit of a small source rectangle. The desktop grab is retaken
+    when the overlay changes mode, since that changes its background.
+    Latency is measured from noticing a cursor move to the end of the
+    loupe's paint and reported when the loupe stops.
+    """
+
+    def __init__(self, overlay):
+        super().__init__(
+            None,
+            Qt.WindowType.FramelessWindowHint
+            | Qt.WindowType.WindowStaysOnTopHint
+            | Qt.WindowType.Tool
+            | Qt.WindowType.WindowTransparentForInput
+            | Qt.WindowType.WindowDoesNotAcceptFocus,
+        )
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating)
+        self.overlay = overlay
+        self.zoom = MAGNIFIER_DEFAULT_ZOOM
+        self.smooth = True
+        self.setFixedSize(MAGNIFIER_DEFAULT_SIZE, MAGNIFIER_DEFAULT_SIZE)
+        self._desktop = None
+        self._composite = None
+        self._origin = QPoint()
+        self._dirty = QRegion()
+        self._source = QRectF()
+        self._cursor = None
+        self._move_started = None
+        self._frames = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._timer = QTimer(self)
+        self._timer.setInterval(MAGNIFIER_POLL_MS)
+        self._timer.timeout.connect(self._poll_cursor)
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(SCREENSHOT_SETTLE_MS)
+        self._refresh_timer.timeout.connect(self._refresh_hidden)
+        for signal in (
+            overlay.drawing_mode_changed,
+            overlay.board_mode_changed,
+            overlay.edit_mode_changed,
+            overlay.temp_mode_changed,
+        ):
+            signal.connect(self._schedule_desktop_refresh)
+
+    def set_zoom(self, zoom):
+        self.zoom = max(1, min(MAGNIFIER_MAX_ZOOM, zoom))
+        if self.isVisible():
+            self._cursor = None
+
+    def set_smoothing(self, smooth):
+        self.smooth = bool(smooth)
+        self.update()
+
+    def set_diameter(self, size):
+        self.setFixedSize(size, size)
+        if self.isVisible():
+            self._cursor = None
+
+    def start(self):
+        """Grabs the desktop, shows the loupe and starts following the cursor."""
+        self._frames = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self.refresh_desktop()
+        self._cursor = None
+        self._poll_cursor()
+        self.show()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._refresh_timer.stop()
+        self.hide()
+        self._desktop = None
+        self._composite = None
+        self._dirty = QRegion()
+        stats = self.latency_stats()
+        if stats:
+            print(
+                f"Magnifier: {stats['frames']} frames, latency "
+                f"mean {stats['mean_ms']:.2f} ms, max {stats['max_ms']:.2f} ms."
+            )
+
+    def latency_stats(self):
+        """Frames drawn since start() and their move-to-paint latency in ms."""
+        if not self._frames:
+            return None
+        return {
+            "frames": self._frames,
+            "mean_ms": self._latency_total / self._frames * 1000,
+            "max_ms": self._latency_max * 1000,
+        }
+
+    def refresh_desktop(self):
+        """Grabs the desktop behind the overlay again; the loupe must be hidden."""
+        overlay = self.overlay
+        self._origin = overlay.mapToGlobal(QPoint(0, 0))
+        area = QRect(self._origin, overlay.size())
+        desktop = overlay.grab_desktop_image(area)
+        if desktop is None:
+            desktop = QImage(
+                max(1, overlay.width()),
+                max(1, overlay.height()),
+                QImage.Format.Format_ARGB32_Premultiplied,
+            )
+            desktop.fill(Qt.GlobalColor.black)
+        self._desktop = desktop
+        self._composite = QImage(desktop)
+        self._dirty = QRegion(overlay.rect())
+
+    def _schedule_desktop_refresh(self):
+        if self.isVisible():
+            self._refresh_timer.start()
+
+    def _refresh_hidden(self):
+        # The grab would contain the loupe itself, so it is hidden until
+        # the window system has taken it off the screen.
+        if self.isVisible():
+            self.hide()
+            self._refresh_timer.start()
+            return
+        if not self._timer.isActive():
+            return
+        self.refresh_desktop()
+        self._cursor = None
+        self._poll_cursor()
+        self.show()
+
+    def scene_changed(self, rect):
+        """Called by the overlay for every area it repaints."""
+        if self._composite is not None:
+            self._dirty = self._dirty.united(rect)
+
+    def _poll_cursor(self):
+        pos = QCursor.pos()
+        if pos != self._cursor:
+            self.follow(pos)
+        elif self._dirty.intersects(self._source.toAlignedRect()):
+            self._move_started = time.perf_counter()
+            self.update()
+
+    def follow(self, global_pos):
+        """Centers the loupe on global_pos and magnifies the area under it."""
+        if self._composite is None:
+            return
+        self._move_started = time.perf_counter()
+        self._cursor = QPoint(global_pos)
+        span = self.width() / self.zoom
+        local = QPointF(global_pos - self._origin)
+        self._source = QRectF(local.x() - span / 2, local.y() - span / 2, span, span)
+        self.move(global_pos - QPoint(self.width() // 2, self.height() // 2))
+        self.update()
+
+    def _render_dirty(self, area):
+        """Repaints the changed part of the composite layer inside area."""
+        dirty = self._dirty.intersected(area)
+        if dirty.isEmpty():
+            return
+        self._dirty = self._dirty.subtracted(dirty)
+        rect = dirty.boundingRect()
+        dpr = self._desktop.devicePixelRatio()
+        painter = QPainter(self._composite)
+        try:
+            painter.setCompositionMode(
+                QPainter.CompositionMode.CompositionMode_Source
+            )
+            painter.drawImage(
+                QRectF(rect),
+                self._desktop,
+                QRectF(
+                    rect.x() * dpr,
+                    rect.y() * dpr,
+                    rect.width() * dpr,
+                    rect.height() * dpr,
+                ),
+            )
+            painter.setCompositionMode(
+                QPainter.CompositionMode.CompositionMode_SourceOver
+            )
+            if self.overlay.shapes_visible:
+                painter.translate(QPointF(rect.topLeft()))
+                self.overlay.paint_scene(painter, rect)
+        finally:
+            painter.end()
+
+    def paintEvent(self, event):
+        if self._composite is None:
+            return
+        source = self._source
+        self._render_dirty(source.toAlignedRect())
+        dpr = self._composite.devicePixelRatio()
+        bounds = QRectF(self.rect()).adjusted(1, 1, -1, -1)
+        lens = QPainterPath()
+        lens.addEllipse(bounds)
+        painter = QPainter(self)
+        try:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setRenderHint(
+                QPainter.RenderHint.SmoothPixmapTransform, self.smooth
+            )
+            painter.setClipPath(lens)
+            painter.fillRect(self.rect(), Qt.GlobalColor.black)
+            painter.drawImage(
+                QRectF(self.rect()),
+                self._composite,
+                QRectF(
+                    source.x() * dpr,
+                    source.y() * dpr,
+                    source.width() * dpr,
+                    source.height() * dpr,
+                ),
+            )
+            painter.setClipping(False)
+            center = bounds.center()
+            painter.setPen(QPen(QColor(255, 255, 255, 160), 1))
+            painter.drawLine(
+                QPointF(center.x() - 8, center.y()), QPointF(center.x() + 8, center.y())
+            )
+            painter.drawLine(
+                QPointF(center.x(), center.y() - 8), QPointF(center.x(), center.y() + 8)
+            )
+            painter.setPen(QPen(QColor(40, 40, 40, 220), 2))
+            painter.drawEllipse(bounds)
+        finally:
+            painter.end()
+        if self._move_started is not None:
+            latency = time.perf_counter() - self._move_started
+            self._move_started = None
+            self._frames += 1
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+
+
+class DesktopOverlayRgn(QWidget):  # [697]
+    drawing_mode_changed = Signal(bool)  # [698]
+    edit_mode_changed = Signal(bool)  # [699]
+    board_mode_changed = Signal(bool)  # [700]
+    temp_mode_changed = Signal(bool)  # [701]
+    color_changed = Signal(QColor)  # [702]
+    board_pen_color_changed = Signal(QColor)  # [703]
+    edit_pen_color_changed = Signal(QColor)  # [704]
+    board_background_color_changed = Signal(QColor)  # [705]
+    temp_color_changed = Signal(QColor)  # [706]
+    defaults_changed = Signal()  # [707]
+    shapes_visibility_changed = Signal(bool)  # [708]
+    dimension_preview_color_changed = Signal(QColor)  # [709]
+    angle_tool_config_changed = Signal(dict)  # [710]
+    show_center_point_changed = Signal(bool)  # [711]
+    line_point_arrow_style_changed = Signal(str)  # [712]
+    divide_enabled_changed = Signal(bool)  # [713]
+    number_of_divisions_changed = Signal(int)  # [714]
+    division_point_color_changed = Signal(QColor)  # [715]
+    division_point_size_changed = Signal(float)  # [716]
+    scene_slot_changed = Signal(int)
+    first_frame_painted = Signal()
+    screenshot_saved = Signal(str, str)  # path, error ("" on success)
+
+    SCREENSHOT_MODES = [
+        ("region", "Region..."),
+        ("screen", "Current Screen"),
+        ("all", "All Screens"),
+        ("selection", "Selected Shapes"),
+    ]
+    # Snapping signals # [717]
+    snap_mode_changed = Signal(str)  # Emits "lines", "grid", "all", or "none" # [718]
+    snap_sensitivity_changed = Signal(int)  # [719]
+    # Snapping feedback attributes # [720]
+    snapped_point_preview: Optional[QPointF] = None  # For point snapping # [721]
+    snapped_line_preview: Optional[Tuple[str, int]] = (
+        None  # For line snapping ('h' or 'v', coord) # [722]
+    )
+
+    def _register_global_hotkey(self):  # [723]
+        """Registers global hotkeys using WinAPI."""  # [724]
+        if not _IS_WINDOWS or not VK_OEM_5:  # [725]
+            print(
+                "Skipping global hotkey registration (Not Windows or VK_OEM_5 undefined)"
+            )  # [726]
+            return False  # [727]
+        if not self.hwnd:  # [728]
+            self.hwnd = self.winId()  # [729]
+        if not self.hwnd:  # [730]
+            print("Cannot register global hotkey (HWND not available yet)")  # [731]
+            QTimer.singleShot(200, self._register_global_hotkey)  # [732]
+            return False  # [733]
+
+        registered_count = 0  # [734]
+        failed_keys = []  # [735]
+
+        hotkeys_to_register = [  # [736]
+            {
+                "id": HOTKEY_ID_DRAW,
+                "vk": VK_OEM_5,
+                "mod": MOD_CONTROL,
+                "name": "Ctrl+\\",
+            },  # [737]
+            {
+                "id": HOTKEY_ID_EDIT,
+                "vk": VK_OEM_5,
+                "mod": MOD_CONTROL | MOD_ALT,
+                "name": "Ctrl+Alt+\\",
+            },  # [738]
+            {
+                "id": HOTKEY_ID_BOARD,
+                "vk": VK_OEM_5,
+                "mod": MOD_ALT,
+                "name": "Alt+\\",
+            },  # [739]
+            {
+                "id": HOTKEY_ID_SHIFT_PRINTSCREEN,
+                "vk": VK_SNAPSHOT,
+                "mod": MOD_SHIFT,
+                "name": "Shift+PrintScreen",
+            },  # [740]
+            {
+                "id": HOTKEY_ID_BURST_SCREENSHOT,
+                "vk": VK_SNAPSHOT,
+                "mod": MOD_CONTROL | MOD_SHIFT,
+                "name": "Ctrl+Shift+PrintScreen (Burst Screenshot)",
+            },
+            {
+                "id": HOTKEY_ID_TEMP,
+                "vk": VK_OEM_5,
+                "mod": MOD_ALT | MOD_SHIFT,
+                "name": "Alt+Shift+\\",
+            },  # [741]
+            # Lines hotkeys # [742]
+            {
+                "id": HOTKEY_ID_LINES_TOGGLE,
+                "vk": VK_HOME,
+                "mod": MOD_ALT | MOD_SHIFT,
+                "name": "Alt+Shift+Home (Lines Toggle)",
+            },  # [743]
+            {
+                "id": HOTKEY_ID_LINES_POS,
+                "vk": VK_PRIOR,
+                "mod": MOD_ALT | MOD_SHIFT,
+                "name": "Alt+Shift+PageUp (Lines Pos)",
+            },  # [744]
+            {
+                "id": HOTKEY_ID_LINES_CLEAR,
+                "vk": VK_F9,
+                "mod": MOD_CONTROL | MOD_ALT,
+                "name": "Ctrl+Alt+F9 (Lines Clear)",
+            },  # [745]
+            {
+                "id": HOTKEY_ID_LINES_INC_THICK,
+                "vk": VK_PRIOR,
+                "mod": MOD_CONTROL | MOD_ALT,
+                "name": "Ctrl+Alt+PageUp (Lines Inc Thick)",
+            },  # [746]
+            {
+                "id": HOTKEY_ID_LINES_DEC_THICK,
+                "vk": VK_NEXT,
+                "mod": MOD_CONTROL | MOD_ALT,
+                "name": "Ctrl+Alt+PageDown (Lines Dec Thick)",
+            },  # [747]
+            # Grid hotkeys # [748]
+            {
+                "id": HOTKEY_ID_GRID_TOGGLE,
+                "vk": VK_F10,
+                "mod": MOD_CONTROL | MOD_ALT,
+                "name": "Ctrl+Alt+F10 (Grid Toggle)",
+            },  # [749]
+            {
+                "id": HOTKEY_ID_GRID_INC_COLS,
+                "vk": VK_UP,
+                "mod": MOD_CONTROL | MOD_ALT,
+                "name": "Ctrl+Alt+Up (Grid Inc Cols)",
+            },  # [750]
+            {
+                "id": HOTKEY_ID_GRID_DEC_COLS,
+                "vk": VK_DOWN,
+                "mod": MOD_CONTROL | MOD_ALT,
                 "name": "Ctrl+Alt+Down (Grid Dec Cols)",
             },  # [751]
             {
@@ -4248,6 +5919,15 @@ class DesktopOverlayRgn(QWidget):  # [697]
                 "name": "Alt+Shift+F4 (Snap Off)",
             },  # New hotkey # [764]
         ]  # [765]
+        for slot_index in range(SCENE_SLOT_COUNT):
+            hotkeys_to_register.append(
+                {
+                    "id": HOTKEY_ID_SCENE_SLOT_BASE + slot_index + 1,
+                    "vk": VK_1 + slot_index,
+                    "mod": MOD_CONTROL | MOD_ALT,
+                    "name": f"Ctrl+Alt+{slot_index + 1} (Scene Slot {slot_index + 1})",
+                }
+            )
 
         for hotkey in hotkeys_to_register:  # [766]
             hotkey_id = hotkey["id"]  # [767]
@@ -4292,6 +5972,7 @@ class DesktopOverlayRgn(QWidget):  # [697]
                 HOTKEY_ID_EDIT,
                 HOTKEY_ID_BOARD,
                 HOTKEY_ID_SHIFT_PRINTSCREEN,
+                HOTKEY_ID_BURST_SCREENSHOT,
                 HOTKEY_ID_TEMP,  # [789]
                 HOTKEY_ID_LINES_TOGGLE,
                 HOTKEY_ID_LINES_POS,
@@ -4314,6 +5995,10 @@ class DesktopOverlayRgn(QWidget):  # [697]
                 HOTKEY_ID_SNAP_ALL,  # [794]
                 HOTKEY_ID_SNAP_OFF,  # Added new ID # [795]
             ]  # [796]
+            hotkey_ids_to_unregister.extend(
+                HOTKEY_ID_SCENE_SLOT_BASE + slot_index + 1
+                for slot_index in range(SCENE_SLOT_COUNT)
+            )
             for hotkey_id in hotkey_ids_to_unregister:  # [797]
                 if not UnregisterHotKey(self.hwnd, hotkey_id):  # [798]
                     err = ctypes.GetLastError()  # [799]
@@ -4350,7 +6035,7 @@ class DesktopOverlayRgn(QWidget):  # [697]
         self.pressed_keys = set()  # [827]
         self.control_panel = None  # [828]
         self.last_esc_press_time = 0  # [829]
-        self.settings = QSettings("MyCompany", "DesktopOverlayRGN")  # [830]
+        self.settings = Settings("MyCompany", "DesktopOverlayRGN")  # [830]
         self.shapes_visible = True  # [831]
         self.mpoint_label_visible = True  # [832]
         self.mpoint_marker_visible = True  # [833]
@@ -4379,8 +6064,14 @@ class DesktopOverlayRgn(QWidget):  # [697]
         self.angle_offsets = {}  # [849]
         self.resizing = False  # [850]
         self.dragging = False  # [851]
-        self.selected_shapes = []  # [852]
+        self._selection = ShapeSelection(
+            on_change=self._on_selection_changed
+        )  # [852]
         self.clipboard_shapes = []  # [853]
+        self._scene_load_job = None
+        self._scene_load_timer = QTimer(self)
+        self._scene_load_timer.setInterval(15)
+        self._scene_load_timer.timeout.connect(self._process_scene_load_queue)
         self.is_lasso_selecting = False  # [854]
         self.input_mode = None  # [855]
         self.current_snap_angle = None  # [856]
@@ -4414,11 +6105,13 @@ class DesktopOverlayRgn(QWidget):  # [697]
         self.current_hatch_style = []  # [876]
         self.current_hatch_color = QColor(128, 128, 128)  # [877]
         self.current_hatch_thickness = 1  # [878]
+        self._hatch_tile_cache = {}
         self.show_center_point = False  # [879]
         self.center_point_contrast_color = QColor(255, 255, 0, 200)  # [880]
         self.current_line_point_arrow_style = None  # [881]
         self.divide_enabled = False  # [882]
         self.number_of_divisions = 2  # [883]
+        self._division_points_cache = {}
         self.division_point_color = QColor(Qt.GlobalColor.yellow)  # [884]
         self.division_point_size = 5.0  # [885]
         self.current_pen_color = QColor(255, 0, 0)  # [886]
@@ -4450,6 +6143,15 @@ class DesktopOverlayRgn(QWidget):  # [697]
         self.show_indicators_in_board_mode = True  # [905]
         self.current_pen_color_temp = QColor(0, 0, 255)  # [906]
         self.temp_mode_shape_duration = 3.0  # [907]
+        self.temp_mode_fade_duration = 0.0
+        self._temp_expiry_heap = []
+        self._temp_expiry_counter = itertools.count()
+        self._temp_fading = {}
+        self._temp_fade_opacity = {}
+        self._temp_expiry_timer = QTimer(self)
+        self._temp_expiry_timer.setSingleShot(True)
+        self._temp_expiry_timer.timeout.connect(self._process_temp_expiry)
+        self._text_layouts = weakref.WeakKeyDictionary()
         self.show_indicators_in_temp_mode = True  # [908]
         self.color_shortcuts = {  # [909]
             Qt.Key.Key_0: QColor("black"),
@@ -4493,17 +6195,76 @@ class DesktopOverlayRgn(QWidget):  # [697]
         self.snap_sensitivity = 5  # Default snapping sensitivity in pixels # [931]
         self.snapped_point_preview = None  # [932]
         self.snapped_line_preview = None  # [933]
-
+        self.scene_save_compact = False
+        self.scene_coordinate_precision = 2
+        self.scene_cache = SceneCache()
+        self.autosave_enabled = True
+        self.autosave_interval_ms = AUTOSAVE_DEFAULT_INTERVAL_MS
+        self._autosave_journal = None
+        self._autosave_timer = QTimer(self)
+        self._autosave_timer.timeout.connect(self._autosave_tick)
+        self._autosave_ids = {}
+        self._autosave_order = []
+        self._autosave_next_id = 0
+        self._autosave_pending = deque()
+        self._autosave_touched = {}
+        self._autosave_watching = False
+        self._autosave_dirty = True
+        self.scene_slots = SceneSlots(
+            SCENE_SLOT_COUNT, self.scene_cache, self._shapes_from_scene_data
+        )
+        self.animation_frame_cache = AnimationFrameCache(self.render_scene_image)
+        self.animation_frames = []
+        self._first_frame_painted = False
+        self._scene_slot_timer = QTimer(self)
+        self._scene_slot_timer.setInterval(SCENE_SLOT_POLL_MS)
+        self._scene_slot_timer.timeout.connect(self._poll_scene_slots)
+        self._scene_slot_watcher = QFileSystemWatcher(self)
+        self._scene_slot_watcher.fileChanged.connect(self._on_scene_slot_file_changed)
+        self._scene_slot_changed_paths = set()
+        self._scene_slot_reload_timer = QTimer(self)
+        self._scene_slot_reload_timer.setSingleShot(True)
+        self._scene_slot_reload_timer.setInterval(SCENE_SLOT_RELOAD_DELAY_MS)
+        self._scene_slot_reload_timer.timeout.connect(self._reload_changed_scene_slots)
+        self.screenshot_png_compression = SCREENSHOT_DEFAULT_PNG_COMPRESSION
+        self.screenshot_jpeg_quality = SCREENSHOT_DEFAULT_JPEG_QUALITY
+        self.screenshot_burst_format = "png"
+        self.screenshot_capture_mode = "screen"
+        self._capture_background_only = False
+        self._region_capture = None
+        self.magnifier = None
+        self.screenshot_writer = ScreenshotWriter()
+        self._views_to_clear = set()
+        self.screenshot_saved.connect(self._clear_saved_view)
+        self._screenshot_poll_timer = QTimer(self)
+        self._screenshot_poll_timer.setInterval(SCREENSHOT_POLL_MS)
+        self._screenshot_poll_timer.timeout.connect(self._poll_screenshot_writer)
+        self._screenshot_burst_timer = QTimer(self)
+        self._screenshot_burst_timer.setSingleShot(True)
+        self._screenshot_burst_timer.setInterval(SCREENSHOT_BURST_IDLE_MS)
+        self._screenshot_burst_timer.timeout.connect(self.flush_burst_screenshots)
+
+        _mark_startup("overlay widget")
         self.setup_window_properties()  # [934]
-        self.load_board_settings()  # [935]
-        self.load_mpoint_label_style()  # [936]
-        self.load_dimension_text_defaults()  # [937]
-        self.load_dimension_preview_line_color()  # [938]
-        self.load_angle_tool_settings()  # [939]
-        self.load_hatch_fill_settings()  # [940]
-        self.load_division_point_settings()  # [941]
-        self.load_snap_settings()  # [942]
+        _mark_startup("overlay setup_window_properties")
+        for load_settings in (
+            self.load_board_settings,  # [935]
+            self.load_mpoint_label_style,  # [936]
+            self.load_dimension_text_defaults,  # [937]
+            self.load_dimension_preview_line_color,  # [938]
+            self.load_angle_tool_settings,  # [939]
+            self.load_hatch_fill_settings,  # [940]
+            self.load_division_point_settings,  # [941]
+            self.load_snap_settings,  # [942]
+            self.load_scene_file_settings,
+            self.load_autosave_settings,
+            self.load_scene_slot_settings,
+            self.load_screenshot_settings,
+        ):
+            load_settings()
+            _mark_startup(f"overlay {load_settings.__name__}")
         QTimer.singleShot(150, self._get_hwnd)  # [943]
+        QTimer.singleShot(0, self.offer_autosave_recovery)
         print("Overlay RGN initialized...")  # [944]
 
     def setup_window_properties(self):  # [945]
@@ -4799,6 +6560,11 @@ class DesktopOverlayRgn(QWidget):  # [697]
 
     def paintEvent(self, event):  # [1146]
         """Handles painting the overlay, including shapes, background, and indicators."""  # [1147]
+        if not self._first_frame_painted:
+            self._first_frame_painted = True
+            QTimer.singleShot(0, self.first_frame_painted.emit)
+        if self.magnifier is not None:
+            self.magnifier.scene_changed(event.rect())
         try:  # [1148]
             painter = QPainter(self)  # [1149]
             painter.setRenderHint(QPainter.RenderHint.Antialiasing)  # [1150]
@@ -4852,6 +6618,9 @@ class DesktopOverlayRgn(QWidget):  # [697]
                 else:  # [1183]
                     painter.fillRect(self.rect(), Qt.GlobalColor.transparent)  # [1184]
 
+            if self._capture_background_only:
+                return
+
             if self.drawing_mode:  # [1185]
                 show_any_indicator = False  # [1186]
                 mode_name = ""  # [1187]
@@ -5110,9 +6879,16 @@ class DesktopOverlayRgn(QWidget):  # [697]
                         painter.drawText(mode_pos, mode_name)  # [1329]
                         painter.restore()  # [1330]
 
+            for _, frame in self.animation_frames:
+                painter.drawPixmap(0, 0, frame)
+
+            fade_opacity = self._temp_fade_opacity
             for shape in self.shapes:  # [1331]
                 if shape and shape.geometry:  # [1332]
                     is_selected = shape in self.selected_shapes  # [1333]
+                    opacity = fade_opacity.get(shape) if fade_opacity else None
+                    if opacity is not None:
+                        painter.setOpacity(opacity)
                     self.draw_shape(
                         painter,
                         shape,
@@ -5120,6 +6896,8 @@ class DesktopOverlayRgn(QWidget):  # [697]
                         is_preview=False,
                         show_angle_offset=self.show_angle_offset,
                     )  # [1334]
+                    if opacity is not None:
+                        painter.setOpacity(1.0)
 
             if self.drawing_mode and self.current_drawing_shape:  # [1335]
                 self.draw_shape(
@@ -5438,6 +7216,13 @@ class DesktopOverlayRgn(QWidget):  # [697]
                     painter.drawLine(coord, 0, coord, self.height())  # [1507]
                 painter.restore()  # [1508]
 
+            if self._region_capture and self._region_capture["start"] is not None:
+                painter.save()
+                painter.setPen(QPen(QColor(0, 170, 255), 1, Qt.PenStyle.DashLine))
+                painter.setBrush(QColor(0, 170, 255, 40))
+                painter.drawRect(self._region_capture_rect())
+                painter.restore()
+
         except Exception as e:  # [1509]
             print(f"Error in paintEvent: {e}")  # [1510]
             traceback.print_exc()  # [1511]
@@ -5972,15 +7757,12 @@ class DesktopOverlayRgn(QWidget):  # [697]
                 if text:  # [1785]
                     painter.save()  # [1786]
                     try:  # [1787]
-                        font = QFont(
-                            props.get("font", "Arial"), props.get("size", 12)
-                        )  # [1788]
-                        font.setBold(props.get("bold", False))  # [1789]
-                        font.setItalic(props.get("italic", False))  # [1790]
-                        font.setUnderline(props.get("underline", False))  # [1791]
-                        font.setStrikeOut(props.get("strikeout", False))  # [1792]
-                        painter.setFont(font)  # [1793]
-                        metrics = QFontMetrics(font)  # [1794]
+                        straight_text = abs(curve_angle) < 1e-6
+                        if straight_text:
+                            font, text_layout = self._text_layout(
+                                shape, props, painter, geo.width()
+                            )
+                            painter.setFont(font)  # [1793]
 
                         text_color_str = props.get("color", "#000000")  # [1795]
                         text_color = QColor(text_color_str)  # [1796]
@@ -6017,96 +7799,16 @@ class DesktopOverlayRgn(QWidget):  # [697]
                         painter.setPen(text_pen)  # [1817]
                         painter.setBrush(Qt.BrushStyle.NoBrush)  # [1818]
 
-                        if abs(curve_angle) < 1e-6:  # [1819]
-                            flags = Qt.TextFlag.TextWordWrap  # [1820]
-                            align_str = props.get("alignment", "left")  # [1821]
-                            align_map = {
-                                "left": Qt.AlignmentFlag.AlignLeft,
-                                "center": Qt.AlignmentFlag.AlignCenter,
-                                "right": Qt.AlignmentFlag.AlignRight,
-                                "justify": Qt.AlignmentFlag.AlignJustify,
-                            }  # [1822]
-                            flags |= align_map.get(
-                                align_str, Qt.AlignmentFlag.AlignLeft
-                            )  # [1823]
-                            flags |= Qt.AlignmentFlag.AlignVCenter  # [1824]
-                            painter.drawText(geo, flags, text)  # [1825]
+                        if straight_text:  # [1819]
+                            self._draw_text_layout(
+                                painter, props, text_layout, geo
+                            )  # [1825]
 
                         else:  # [1826]
-                            char_widths = [
-                                metrics.horizontalAdvance(char) for char in text
-                            ]  # [1827]
-                            total_text_width = sum(char_widths)  # [1828]
-                            if total_text_width < 1e-6:  # [1829]
-                                painter.restore()
-                                return  # [1830]
-
-                            angle_range_rad = math.radians(abs(curve_angle))  # [1831]
-                            if angle_range_rad < 1e-6:
-                                angle_range_rad = 1e-6  # [1832]
-                            radius = total_text_width / angle_range_rad  # [1833]
-
-                            widget_center = geo.center()  # [1834]
-                            font_height = metrics.height()  # [1835]
-                            vertical_offset = font_height * 0.5  # [1836]
-
-                            if curve_angle > 0:  # [1837]
-                                center_arc_math_angle = math.pi / 2.0  # [1838]
-                                start_arc_math_angle = (
-                                    center_arc_math_angle + angle_range_rad / 2.0
-                                )  # [1839]
-                                angle_sign = -1.0  # [1840]
-                                arc_center_y = (
-                                    widget_center.y() + radius - vertical_offset
-                                )  # [1841]
-                            else:  # [1842]
-                                center_arc_math_angle = -math.pi / 2.0  # [1843]
-                                start_arc_math_angle = (
-                                    center_arc_math_angle - angle_range_rad / 2.0
-                                )  # [1844]
-                                angle_sign = +1.0  # [1845]
-                                arc_center_y = (
-                                    widget_center.y() - radius + vertical_offset
-                                )  # [1846]
-
-                            arc_center = QPointF(
-                                widget_center.x(), arc_center_y
-                            )  # [1847]
-
-                            cumulative_width = 0.0  # [1848]
-                            for char, char_width in zip(text, char_widths):  # [1849]
-                                if char_width <= 0:
-                                    continue  # [1850]
-                                half_char_width = char_width / 2.0  # [1851]
-
-                                center_char_angle_offset_rad = (
-                                    cumulative_width + half_char_width
-                                ) / radius  # [1852]
-                                center_char_math_angle_rad = (
-                                    start_arc_math_angle
-                                    + angle_sign * center_char_angle_offset_rad
-                                )  # [1853]
-
-                                char_x = arc_center.x() + radius * math.cos(
-                                    center_char_math_angle_rad
-                                )  # [1854]
-                                char_y = arc_center.y() - radius * math.sin(
-                                    center_char_math_angle_rad
-                                )  # [1855]
-
-                                qt_rotation_deg = 90.0 - math.degrees(
-                                    center_char_math_angle_rad
-                                )  # [1856]
-                                if curve_angle < 0:  # [1857]
-                                    qt_rotation_deg += 180.0  # [1858]
-
-                                painter.save()  # [1859]
-                                painter.translate(char_x, char_y)  # [1860]
-                                painter.rotate(qt_rotation_deg)  # [1861]
-                                painter.drawText(-half_char_width, 0.0, char)  # [1862]
-                                painter.restore()  # [1863]
-
-                                cumulative_width += char_width  # [1864]
+                            curved_layout = self._curved_text_layout(shape, props)
+                            if curved_layout is not None:  # [1829]
+                                painter.translate(geo.center())  # [1834]
+                                painter.fillPath(curved_layout[0], text_color)  # [1862]
                     except Exception as e:  # [1865]
                         print(f"Error drawing text content: {e}")  # [1866]
                         traceback.print_exc()  # [1867]
@@ -6152,127 +7854,15 @@ class DesktopOverlayRgn(QWidget):  # [697]
                         text = props.get("text", "")  # [1888]
                         if text:  # [1889]
                             try:  # [1890]
-                                font = QFont(
-                                    props.get("font", "Arial"), props.get("size", 12)
-                                )  # [1891]
-                                font.setBold(props.get("bold", False))
-                                font.setItalic(props.get("italic", False))  # [1892]
-                                font.setUnderline(props.get("underline", False))
-                                font.setStrikeOut(
-                                    props.get("strikeout", False)
-                                )  # [1893]
-                                metrics = QFontMetrics(font)  # [1894]
-
-                                char_widths = [
-                                    metrics.horizontalAdvance(char) for char in text
-                                ]  # [1895]
-                                total_text_width = sum(char_widths)  # [1896]
-
-                                if total_text_width < 1e-6:  # [1897]
+                                curved_layout = self._curved_text_layout(
+                                    shape, props
+                                )
+                                if curved_layout is None:  # [1897]
                                     bounding_rect = QRectF(geo)  # [1898]
                                 else:  # [1899]
-                                    angle_rad = math.radians(curve_angle)  # [1900]
-                                    if abs(angle_rad) < 1e-6:
-                                        angle_rad = 1e-6  # [1901]
-                                    radius = total_text_width / abs(angle_rad)  # [1902]
-
-                                    widget_center = geo.center()  # [1903]
-                                    font_height = metrics.height()  # [1904]
-                                    vertical_offset = font_height * 0.5  # [1905]
-
-                                    if curve_angle > 0:  # [1906]
-                                        center_arc_math_angle = math.pi / 2.0  # [1907]
-                                        start_arc_math_angle = (
-                                            center_arc_math_angle + abs(angle_rad) / 2.0
-                                        )  # [1908]
-                                        angle_sign = -1.0  # [1909]
-                                        arc_center_y = (
-                                            widget_center.y() + radius - vertical_offset
-                                        )  # [1910]
-                                    else:  # [1911]
-                                        center_arc_math_angle = -math.pi / 2.0  # [1912]
-                                        start_arc_math_angle = (
-                                            center_arc_math_angle - abs(angle_rad) / 2.0
-                                        )  # [1913]
-                                        angle_sign = 1.0  # [1914]
-                                        arc_center_y = (
-                                            widget_center.y() - radius + vertical_offset
-                                        )  # [1915]
-                                    arc_center = QPointF(
-                                        widget_center.x(), arc_center_y
-                                    )  # [1916]
-
-                                    all_char_corners = []  # [1917]
-                                    cumulative_width = 0.0  # [1918]
-
-                                    for i, char in enumerate(text):  # [1919]
-                                        char_width = char_widths[i]  # [1920]
-                                        if radius < 1e-6 or char_width <= 0:
-                                            continue  # [1921]
-
-                                        half_char_width = char_width / 2.0  # [1922]
-                                        center_char_angle_offset_rad = (
-                                            cumulative_width + half_char_width
-                                        ) / radius  # [1923]
-                                        center_char_math_angle_rad = (
-                                            start_arc_math_angle
-                                            + angle_sign * center_char_angle_offset_rad
-                                        )  # [1924]
-
-                                        char_x = arc_center.x() + radius * math.cos(
-                                            center_char_math_angle_rad
-                                        )  # [1925]
-                                        char_y = arc_center.y() - radius * math.sin(
-                                            center_char_math_angle_rad
-                                        )  # [1926]
-
-                                        qt_rotation_deg = 90.0 - math.degrees(
-                                            center_char_math_angle_rad
-                                        )  # [1927]
-                                        if curve_angle < 0:
-                                            qt_rotation_deg += 180.0  # [1928]
-
-                                        char_rect_local = metrics.boundingRect(
-                                            char
-                                        )  # [1929]
-                                        char_rect_local.translate(
-                                            -half_char_width, -metrics.ascent()
-                                        )  # [1930]
-
-                                        char_transform = QTransform()  # [1931]
-                                        char_transform.translate(
-                                            char_x, char_y
-                                        )  # [1932]
-                                        char_transform.rotate(qt_rotation_deg)  # [1933]
-
-                                        corners_local = [
-                                            char_rect_local.topLeft(),
-                                            char_rect_local.topRight(),
-                                            char_rect_local.bottomRight(),
-                                            char_rect_local.bottomLeft(),
-                                        ]  # [1934]
-                                        all_char_corners.extend(
-                                            [
-                                                char_transform.map(p)
-                                                for p in corners_local
-                                            ]
-                                        )  # [1935]
-
-                                        cumulative_width += char_width  # [1936]
-
-                                    if all_char_corners:  # [1937]
-                                        xs = [p.x() for p in all_char_corners]
-                                        ys = [p.y() for p in all_char_corners]  # [1938]
-                                        min_x = min(xs)
-                                        max_x = max(xs)
-                                        min_y = min(ys)
-                                        max_y = max(ys)  # [1939]
-                                        bounding_rect = QRectF(
-                                            min_x, min_y, max_x - min_x, max_y - min_y
-                                        )  # [1940]
-                                    else:  # [1941]
-                                        bounding_rect = QRectF(geo)  # [1942]
-
+                                    bounding_rect = curved_layout[1].translated(
+                                        geo.center()
+                                    )  # [1940]
                             except Exception as e_calc:  # [1943]
                                 print(
                                     f"Error calculating curved text bounds for selection frame: {e_calc}"
@@ -6477,178 +8067,388 @@ class DesktopOverlayRgn(QWidget):  # [697]
                 painter.restore()  # [2028]
             painter.restore()  # [2029]
 
+    TEXT_ALIGNMENT = {
+        "left": Qt.AlignmentFlag.AlignLeft,
+        "center": Qt.AlignmentFlag.AlignHCenter,
+        "right": Qt.AlignmentFlag.AlignRight,
+        "justify": Qt.AlignmentFlag.AlignJustify,
+    }
+
+    @staticmethod
+    def _text_font(props):
+        font = QFont(props.get("font", "Arial"), props.get("size", 12))
+        font.setBold(props.get("bold", False))
+        font.setItalic(props.get("italic", False))
+        font.setUnderline(props.get("underline", False))
+        font.setStrikeOut(props.get("strikeout", False))
+        return font
+
+    @staticmethod
+    def _text_layout_key(props):
+        return (
+            props.get("text", ""),
+            props.get("font", "Arial"),
+            props.get("size", 12),
+            props.get("bold", False),
+            props.get("italic", False),
+            props.get("underline", False),
+            props.get("strikeout", False),
+        )
+
+    @staticmethod
+    def _has_rtl_text(text):
+        return any(unicodedata.bidirectional(char) in ("R", "AL") for char in text)
+
+    def _text_layout(self, shape, props, painter, width):
+        """
+        Returns (font, layout) for a straight text shape, laid out for the
+        painter's device the same way QPainter.drawText() does it with word
+        wrap: tabs and carriage returns become spaces and every line starts
+        on a whole pixel. layout is (lines, width, height), where lines holds
+        each QTextLine with its offset for the alignment. It is kept per
+        shape and reused across frames until the text, its font, its
+        alignment, the wrap width or the device resolution change. Off the
+        GUI thread (the animation frame renderer) it is built without caching.
+        """
+        device = painter.device()
+        direction = painter.layoutDirection()
+        key = self._text_layout_key(props) + (
+            props.get("alignment", "left"),
+            width,
+            direction,
+            device.logicalDpiY(),
+        )
+        on_gui_thread = threading.current_thread() is threading.main_thread()
+        if on_gui_thread:
+            cached = self._text_layouts.get(shape)
+            if cached is not None and cached[0] == key:
+                return cached[1], cached[2]
+        font = self._text_font(props)
+        text = key[0].replace("\r", " ").replace("\n", "\u2028").replace("\t", " ")
+        option = QTextOption()
+        option.setTextDirection(direction)
+        if key[7] == "justify":
+            option.setAlignment(Qt.AlignmentFlag.AlignJustify)
+        else:
+            option.setAlignment(Qt.AlignmentFlag.AlignLeft)
+        text_layout = QTextLayout(text, font, device)
+        text_layout.setCacheEnabled(True)
+        text_layout.setTextOption(option)
+        leading = QFontMetricsF(font, device).leading()
+        height = -leading
+        text_width = 0.0
+        lines = []
+        text_layout.beginLayout()
+        while True:
+            line = text_layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(max(0.0, width))
+            height = float(math.ceil(height + leading))
+            line.setPosition(QPointF(0.0, height))
+            height += line.ascent() + line.descent()
+            text_width = max(text_width, line.naturalTextWidth())
+            if key[7] == "right":
+                lines.append((line, width - line.horizontalAdvance()))
+            elif key[7] == "center":
+                lines.append((line, (width - line.horizontalAdvance()) / 2))
+            else:
+                lines.append((line, 0.0))
+        text_layout.endLayout()
+        # The lines belong to text_layout, which has to outlive them.
+        layout = (lines, text_width, height, text_layout)
+        if on_gui_thread:
+            self._text_layouts[shape] = (key, font, layout)
+        return font, layout
+
+    def _draw_text_layout(self, painter, props, layout, rect):
+        """
+        Draws a straight text shape laid out by _text_layout() into rect,
+        centred vertically and aligned like drawText() aligns each line. A
+        right-to-left painter and right-aligned text that may run right to
+        left go through drawText() itself.
+
+        The lines are drawn with QTextLine.draw() on purpose. Drawing their
+        glyph runs, or an image of them cached per shape, is faster but does
+        not give the same pixels as drawText(): glyph runs place glyphs and
+        underlines differently, and a pre-rendered image blends differently
+        over translucent pixels.
+        """
+        alignment = props.get("alignment", "left")
+        if painter.layoutDirection() == Qt.LayoutDirection.RightToLeft or (
+            alignment == "right" and self._has_rtl_text(props.get("text", ""))
+        ):
+            flags = Qt.TextFlag.TextWordWrap | Qt.AlignmentFlag.AlignVCenter
+            flags |= self.TEXT_ALIGNMENT.get(alignment, Qt.AlignmentFlag.AlignLeft)
+            painter.drawText(rect, flags, props.get("text", ""))
+            return
+
+        lines, width, height = layout[:3]
+        x = rect.x()
+        y = rect.y() + (rect.height() - height) / 2
+        if alignment == "right":
+            x_offset = rect.width() - width
+        elif alignment == "center":
+            x_offset = (rect.width() - width) / 2
+        else:
+            x_offset = 0.0
+        if not rect.contains(QRectF(x + x_offset, y, width, height)):
+            painter.setClipRect(rect, Qt.ClipOperation.IntersectClip)
+        for line, x_offset in lines:
+            line.draw(painter, QPointF(x + x_offset, y))
+
+    def _curved_text_layout(self, shape, props):
+        """
+        Returns (path, bounds) for a curved text shape, or None if the text
+        has no width. path holds the glyph outlines placed along the arc, so
+        the text paints with one fillPath(); bounds covers the character
+        cells. Both are relative to the centre of the shape's rect, so moving
+        the shape keeps the layout. Cached like _text_layout() until the
+        text, its font or curve_angle change.
+        """
+        curve_angle = props.get("curve_angle", 0)
+        key = self._text_layout_key(props) + ("curve", curve_angle)
+        on_gui_thread = threading.current_thread() is threading.main_thread()
+        if on_gui_thread:
+            cached = self._text_layouts.get(shape)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+        text = key[0]
+        font = self._text_font(props)
+        metrics = QFontMetrics(font)
+        char_widths = [metrics.horizontalAdvance(char) for char in text]
+        total_text_width = sum(char_widths)
+        layout = None
+        if total_text_width >= 1e-6:
+            angle_range_rad = max(math.radians(abs(curve_angle)), 1e-6)
+            radius = total_text_width / angle_range_rad
+            vertical_offset = metrics.height() * 0.5
+            if curve_angle > 0:
+                start_arc_math_angle = math.pi / 2.0 + angle_range_rad / 2.0
+                angle_sign = -1.0
+                arc_center_y = radius - vertical_offset
+            else:
+                start_arc_math_angle = -math.pi / 2.0 - angle_range_rad / 2.0
+                angle_sign = 1.0
+                arc_center_y = -radius + vertical_offset
+
+            path = QPainterPath()
+            bounds = QRectF()
+            cumulative_width = 0.0
+            for char, char_width in zip(text, char_widths):
+                if char_width <= 0:
+                    continue
+                half_char_width = char_width / 2.0
+                char_math_angle_rad = (
+                    start_arc_math_angle
+                    + angle_sign * (cumulative_width + half_char_width) / radius
+                )
+                qt_rotation_deg = 90.0 - math.degrees(char_math_angle_rad)
+                if curve_angle < 0:
+                    qt_rotation_deg += 180.0
+                char_transform = (
+                    QTransform()
+                    .translate(
+                        radius * math.cos(char_math_angle_rad),
+                        arc_center_y - radius * math.sin(char_math_angle_rad),
+                    )
+                    .rotate(qt_rotation_deg)
+                )
+                glyph = QPainterPath()
+                glyph.addText(-half_char_width, 0.0, font, char)
+                path.addPath(char_transform.map(glyph))
+                # boundingRect() is already relative to the baseline.
+                char_rect = QRectF(metrics.boundingRect(char)).translated(
+                    -half_char_width, 0.0
+                )
+                bounds = bounds.united(char_transform.mapRect(char_rect))
+                cumulative_width += char_width
+            layout = (path, bounds)
+
+        if on_gui_thread:
+            self._text_layouts[shape] = (key, layout)
+        return layout
+
     def _draw_division_points(self, painter: QPainter, shape: Shape):  # [2030]
         """Draws division points on the segments of the shape."""  # [2031]
         if not self.divide_enabled or self.number_of_divisions < 2:  # [2032]
             return  # [2033]
 
-        division_points_to_draw = []  # [2034]
-        geo = shape.geometry  # [2035]
+        entry = self._get_division_cache_entry(shape)
+        if not entry["segments"]:
+            return
+
+        points_polygon = entry["polygon"]
+        if points_polygon is None:
+            points_polygon = QPolygonF(
+                [
+                    point
+                    for segment_points in entry["segments"]
+                    for point in segment_points
+                ]
+            )
+            entry["polygon"] = points_polygon
+
+        painter.save()  # [2114]
+        point_color_base = self.division_point_color  # [2115]
+
+        if point_color_base == QColor(Qt.GlobalColor.yellow):  # [2117]
+            if shape.color.isValid() and shape.color.lightnessF() > 0.8:  # [2118]
+                contrasting_color = QColor(Qt.GlobalColor.black)  # [2119]
+            else:  # [2120]
+                contrasting_color = QColor(Qt.GlobalColor.yellow)  # [2121]
+            point_color_to_use = contrasting_color  # [2122]
+        else:  # [2123]
+            point_color_to_use = point_color_base  # [2124]
+
+        final_point_color = QColor(point_color_to_use)  # [2125]
+        final_point_color.setAlpha(220)  # [2126]
+
+        # A round-capped pen as wide as the point (plus the 0.5 outline) lets
+        # every point of the shape go out in a single drawPoints call.
+        point_pen = QPen(final_point_color, self.division_point_size + 0.5)
+        point_pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        painter.setPen(point_pen)
+        painter.drawPoints(points_polygon)
+        painter.restore()  # [2131]
+
+    def _get_division_cache_entry(self, shape: Shape) -> dict:
+        """
+        Returns the cached division points of a shape, recomputing them only
+        when its geometry, rotation or the number of divisions changed.
+        """
+        geo = shape.geometry
+        if isinstance(geo, QRectF):
+            geometry_key = (geo.x(), geo.y(), geo.width(), geo.height())
+        elif isinstance(geo, QPointF):
+            geometry_key = (geo.x(), geo.y())
+        elif isinstance(geo, list):
+            geometry_key = tuple(
+                (p.x(), p.y()) if isinstance(p, QPointF) else None for p in geo
+            )
+        else:
+            geometry_key = None
+        key = (
+            shape.type,
+            geometry_key,
+            self.number_of_divisions,
+            shape.rotation,
+            shape.startAngle,
+            shape.spanAngle,
+        )
+
+        entry = self._division_points_cache.get(id(shape))
+        if entry is not None and entry["key"] == key:
+            return entry
+
+        if len(self._division_points_cache) > 2 * len(self.shapes) + 64:
+            self._division_points_cache.clear()
+        entry = {
+            "key": key,
+            "segments": self._compute_division_segments(shape),
+            "snap_points": None,
+            "polygon": None,
+        }
+        self._division_points_cache[id(shape)] = entry
+        return entry
+
+    def _compute_division_segments(self, shape: Shape) -> List[List[QPointF]]:
+        """
+        Returns the division points of every segment of the shape (including
+        the segment end points), in unrotated shape coordinates.
+        """
+        segments = []
+        divisions = self.number_of_divisions
+        geo = shape.geometry
 
+        edges = []
         if (
             shape.type in ["line", "arrow", "line_point"]
             and isinstance(geo, list)
             and len(geo) >= 2
-        ):  # [2036]
-            for i in range(len(geo) - 1):  # [2037]
-                p_start, p_end = geo[i], geo[i + 1]  # [2038]
-                if isinstance(p_start, QPointF) and isinstance(
-                    p_end, QPointF
-                ):  # [2039]
-                    segment_vector = p_end - p_start  # [2040]
-                    segment_length = math.sqrt(
-                        QPointF.dotProduct(segment_vector, segment_vector)
-                    )  # [2041]
-                    if segment_length < 1e-6:
-                        continue  # [2042]
-                    step_vector = segment_vector / self.number_of_divisions  # [2043]
-                    for j in range(self.number_of_divisions + 1):  # [2044]
-                        point = p_start + step_vector * j  # [2045]
-                        division_points_to_draw.append(point)  # [2046]
-
+        ):
+            edges = [(geo[i], geo[i + 1]) for i in range(len(geo) - 1)]
         elif (
-            shape.type == "rect" and isinstance(geo, QRectF) and geo.isValid()
-        ):  # [2047]
+            shape.type in ["rect", "ellipse"]
+            and isinstance(geo, QRectF)
+            and geo.isValid()
+        ):
             corners = [
                 geo.topLeft(),
                 geo.topRight(),
                 geo.bottomRight(),
                 geo.bottomLeft(),
-            ]  # [2048]
-            for i in range(4):  # [2049]
-                p_start = corners[i]  # [2050]
-                p_end = corners[(i + 1) % 4]  # [2051]
-                segment_vector = p_end - p_start  # [2052]
-                segment_length = math.sqrt(
-                    QPointF.dotProduct(segment_vector, segment_vector)
-                )  # [2053]
-                if segment_length < 1e-6:
-                    continue  # [2054]
-                step_vector = segment_vector / self.number_of_divisions  # [2055]
-                for j in range(self.number_of_divisions + 1):  # [2056]
-                    point = p_start + step_vector * j  # [2057]
-                    division_points_to_draw.append(point)  # [2058]
-
+            ]
+            edges = [(corners[i], corners[(i + 1) % 4]) for i in range(4)]
         elif (
             shape.type in ["triangle", "polygon", "trapeze", "regular_polygon"]
             and isinstance(geo, list)
             and len(geo) >= 3
-        ):  # [2059]
-            num_vertices = len(geo)  # [2060]
-            for i in range(num_vertices):  # [2061]
-                p_start = geo[i]  # [2062]
-                p_end = geo[(i + 1) % num_vertices]  # [2063]
-                if isinstance(p_start, QPointF) and isinstance(
-                    p_end, QPointF
-                ):  # [2064]
-                    segment_vector = p_end - p_start  # [2065]
-                    segment_length = math.sqrt(
-                        QPointF.dotProduct(segment_vector, segment_vector)
-                    )  # [2066]
-                    if segment_length < 1e-6:
-                        continue  # [2067]
-                    step_vector = segment_vector / self.number_of_divisions  # [2068]
-                    for j in range(self.number_of_divisions + 1):  # [2069]
-                        point = p_start + step_vector * j  # [2070]
-                        division_points_to_draw.append(point)  # [2071]
-
-        elif (
-            shape.type == "ellipse" and isinstance(geo, QRectF) and geo.isValid()
-        ):  # [2072]
-            corners = [
-                geo.topLeft(),
-                geo.topRight(),
-                geo.bottomRight(),
-                geo.bottomLeft(),
-            ]  # [2073]
-            for i in range(4):  # [2074]
-                p_start = corners[i]  # [2075]
-                p_end = corners[(i + 1) % 4]  # [2076]
-                segment_vector = p_end - p_start  # [2077]
-                segment_length = math.sqrt(
-                    QPointF.dotProduct(segment_vector, segment_vector)
-                )  # [2078]
-                if segment_length < 1e-6:
-                    continue  # [2079]
-                step_vector = segment_vector / self.number_of_divisions  # [2080]
-                for j in range(self.number_of_divisions + 1):  # [2081]
-                    point = p_start + step_vector * j  # [2082]
-                    division_points_to_draw.append(point)  # [2083]
-
-        elif (
-            shape.type == "arc" and isinstance(geo, QRectF) and geo.isValid()
-        ):  # [2084]
-            center_arc = geo.center()  # [2085]
-            rx = geo.width() / 2.0  # [2086]
-            ry = geo.height() / 2.0  # [2087]
+        ):
+            num_vertices = len(geo)
+            edges = [(geo[i], geo[(i + 1) % num_vertices]) for i in range(num_vertices)]
+        elif shape.type == "arc" and isinstance(geo, QRectF) and geo.isValid():
+            center_arc = geo.center()
+            rx = geo.width() / 2.0
+            ry = geo.height() / 2.0
             if rx < 1e-6 or ry < 1e-6:
-                return  # [2088]
-
-            start_angle_rad = math.radians(shape.startAngle)  # [2089]
-            span_angle_rad = math.radians(shape.spanAngle)  # [2090]
-
-            for i in range(self.number_of_divisions + 1):  # [2091]
-                current_angle_rad = start_angle_rad + (
-                    span_angle_rad * i / self.number_of_divisions
-                )  # [2092]
-                x = center_arc.x() + rx * math.cos(current_angle_rad)  # [2093]
-                y = center_arc.y() - ry * math.sin(current_angle_rad)  # [2094]
-                division_points_to_draw.append(QPointF(x, y))  # [2095]
+                return segments
+
+            start_angle_rad = math.radians(shape.startAngle)
+            span_angle_rad = math.radians(shape.spanAngle)
+            arc_points = []
+            for i in range(divisions + 1):
+                current_angle_rad = start_angle_rad + span_angle_rad * i / divisions
+                arc_points.append(
+                    QPointF(
+                        center_arc.x() + rx * math.cos(current_angle_rad),
+                        center_arc.y() - ry * math.sin(current_angle_rad),
+                    )
+                )
+            segments.append(arc_points)
+            return segments
         elif (
             shape.type == "spline"
             and isinstance(geo, list)
             and len(geo) >= 4
             and (len(geo) - 1) % 3 == 0
-        ):  # [2096]
-            path = QPainterPath(geo[0])  # [2097]
-            for i in range(1, len(geo) - 1, 3):  # [2098]
-                if i + 2 < len(geo):  # [2099]
-                    p_start_segment = geo[i - 1] if i > 0 else geo[0]  # [2100]
-                    c1 = geo[i]  # [2101]
-                    c2 = geo[i + 1]  # [2102]
-                    p_end_segment = geo[i + 2]  # [2103]
+        ):
+            for i in range(1, len(geo) - 1, 3):
+                if i + 2 < len(geo):
+                    p_start_segment = geo[i - 1] if i > 0 else geo[0]
+                    c1, c2, p_end_segment = geo[i], geo[i + 1], geo[i + 2]
 
                     approx_len = (
-                        (c1 - p_start_segment).manhattanLength()  # [2104]
+                        (c1 - p_start_segment).manhattanLength()
                         + (c2 - c1).manhattanLength()
                         + (p_end_segment - c2).manhattanLength()
-                    )  # [2105]
+                    )
                     if approx_len < 1e-6:
-                        continue  # [2106]
-
-                    temp_path_segment = QPainterPath(p_start_segment)  # [2107]
-                    temp_path_segment.cubicTo(c1, c2, p_end_segment)  # [2108]
-
-                    for j in range(self.number_of_divisions + 1):  # [2109]
-                        percent = float(j) / self.number_of_divisions  # [2110]
-                        point_on_segment = temp_path_segment.pointAtPercent(
-                            percent
-                        )  # [2111]
-                        division_points_to_draw.append(point_on_segment)  # [2112]
-
-        if division_points_to_draw:  # [2113]
-            painter.save()  # [2114]
-            point_color_base = self.division_point_color  # [2115]
-            point_radius = self.division_point_size / 2.0  # [2116]
-
-            if point_color_base == QColor(Qt.GlobalColor.yellow):  # [2117]
-                if shape.color.isValid() and shape.color.lightnessF() > 0.8:  # [2118]
-                    contrasting_color = QColor(Qt.GlobalColor.black)  # [2119]
-                else:  # [2120]
-                    contrasting_color = QColor(Qt.GlobalColor.yellow)  # [2121]
-                point_color_to_use = contrasting_color  # [2122]
-            else:  # [2123]
-                point_color_to_use = point_color_base  # [2124]
-
-            final_point_color = QColor(point_color_to_use)  # [2125]
-            final_point_color.setAlpha(220)  # [2126]
-
-            painter.setPen(QPen(final_point_color, 0.5))  # [2127]
-            painter.setBrush(QBrush(final_point_color))  # [2128]
-
-            for point in division_points_to_draw:  # [2129]
-                painter.drawEllipse(point, point_radius, point_radius)  # [2130]
-            painter.restore()  # [2131]
+                        continue
+
+                    temp_path_segment = QPainterPath(p_start_segment)
+                    temp_path_segment.cubicTo(c1, c2, p_end_segment)
+                    segments.append(
+                        [
+                            temp_path_segment.pointAtPercent(float(j) / divisions)
+                            for j in range(divisions + 1)
+                        ]
+                    )
+            return segments
+
+        for p_start, p_end in edges:
+            if not isinstance(p_start, QPointF) or not isinstance(p_end, QPointF):
+                continue
+            segment_vector = p_end - p_start
+            segment_length = math.sqrt(
+                QPointF.dotProduct(segment_vector, segment_vector)
+            )
+            if segment_length < 1e-6:
+                continue
+            step_vector = segment_vector / divisions
+            segments.append([p_start + step_vector * j for j in range(divisions + 1)])
+        return segments
 
     def _draw_hatch_fill(self, painter: QPainter, shape: Shape):  # [2132]
         if not shape.hatch_properties or not shape.geometry:  # [2133]
@@ -6675,6 +8475,7 @@ class DesktopOverlayRgn(QWidget):  # [697]
         painter.setBrush(Qt.BrushStyle.NoBrush)  # [2148]
 
         clip_path = QPainterPath()  # [2149]
+        clip_rect = None
         geo = shape.geometry  # [2150]
         if isinstance(geo, QRectF) and geo.isValid():  # [2151]
             if (
@@ -6685,6 +8486,7 @@ class DesktopOverlayRgn(QWidget):  # [697]
                 )  # [2153]
             elif shape.type == "rect":  # [2154]
                 clip_path.addRect(geo)  # [2155]
+                clip_rect = geo
             elif shape.type == "ellipse":  # [2156]
                 clip_path.addEllipse(geo)  # [2157]
             elif shape.type == "arc":  # [2158]
@@ -6722,6 +8524,7 @@ class DesktopOverlayRgn(QWidget):  # [697]
                 clip_path.addEllipse(marker_rect)  # [2179]
             elif shape.type == "rect":
                 clip_path.addRect(marker_rect)  # [2180]
+                clip_rect = marker_rect
 
         if not clip_path.isEmpty():  # [2181]
             painter.setClipPath(clip_path)  # [2182]
@@ -6730,68 +8533,199 @@ class DesktopOverlayRgn(QWidget):  # [697]
             density_factor = hatch_thickness * 5  # [2184]
             if density_factor < 5:
                 density_factor = 5  # [2185]
+            spacing = int(density_factor)
+
+            device = painter.device()
+            dpr = device.devicePixelRatioF() if device is not None else 1.0
+            antialiased = painter.testRenderHint(QPainter.RenderHint.Antialiasing)
+            tiles_exact = self._hatch_tiles_exact(painter, dpr, antialiased, clip_rect)
 
             for hatch_type in hatch_style_list:  # [2186]
-                if hatch_type == "forward_slash":  # [2187]
-                    for i in range(
-                        int(
-                            bounding_rect_for_hatch.left()
-                            - bounding_rect_for_hatch.height()
-                        ),
-                        int(
-                            bounding_rect_for_hatch.right()
-                            + bounding_rect_for_hatch.height()
-                        ),
-                        int(density_factor),
-                    ):  # [2188]
-                        painter.drawLine(
-                            QPointF(i, bounding_rect_for_hatch.bottom()),
-                            QPointF(
-                                i + bounding_rect_for_hatch.height(),
-                                bounding_rect_for_hatch.top(),
-                            ),
-                        )  # [2189]
-                elif hatch_type == "backward_slash":  # [2190]
-                    for i in range(
-                        int(
-                            bounding_rect_for_hatch.left()
-                            - bounding_rect_for_hatch.height()
-                        ),
-                        int(
-                            bounding_rect_for_hatch.right()
-                            + bounding_rect_for_hatch.height()
-                        ),
-                        int(density_factor),
-                    ):  # [2191]
-                        painter.drawLine(
-                            QPointF(i, bounding_rect_for_hatch.top()),
-                            QPointF(
-                                i + bounding_rect_for_hatch.height(),
-                                bounding_rect_for_hatch.bottom(),
-                            ),
-                        )  # [2192]
-                elif hatch_type == "horizontal":  # [2193]
-                    for y in range(
-                        int(bounding_rect_for_hatch.top()),
-                        int(bounding_rect_for_hatch.bottom()),
-                        int(density_factor),
-                    ):  # [2194]
-                        painter.drawLine(
-                            QPointF(bounding_rect_for_hatch.left(), y),
-                            QPointF(bounding_rect_for_hatch.right(), y),
-                        )  # [2195]
-                elif hatch_type == "vertical":  # [2196]
-                    for x in range(
-                        int(bounding_rect_for_hatch.left()),
-                        int(bounding_rect_for_hatch.right()),
-                        int(density_factor),
-                    ):  # [2197]
-                        painter.drawLine(
-                            QPointF(x, bounding_rect_for_hatch.top()),
-                            QPointF(x, bounding_rect_for_hatch.bottom()),
-                        )  # [2198]
+                band = None
+                if tiles_exact:
+                    band = self._get_hatch_band(
+                        hatch_type, bounding_rect_for_hatch, spacing
+                    )
+                if band is None:
+                    self._draw_hatch_lines(
+                        painter, hatch_type, bounding_rect_for_hatch, spacing
+                    )
+                    continue
+                band_path, offset = band
+                tile = self._get_hatch_tile(
+                    hatch_type, hatch_color, hatch_thickness, spacing, dpr, antialiased
+                )
+                brush = QBrush(tile)
+                # The tile holds device pixels, so it is scaled down to
+                # logical units here rather than through its pixel ratio.
+                brush.setTransform(
+                    QTransform(1.0 / dpr, 0, 0, 1.0 / dpr, offset.x(), offset.y())
+                )
+                painter.fillPath(band_path, brush)
         painter.restore()  # [2199]
 
+    @staticmethod
+    def _hatch_tiles_exact(painter, dpr, antialiased, clip_rect):
+        """
+        Whether a tiled hatch brush reproduces the per-line loop pixel for
+        pixel. The painter must only translate by whole device pixels at a
+        whole-number pixel ratio. When antialiasing, the clip must also be
+        a rectangle with its edges on device pixels: where the clip covers
+        a pixel partly, a textured fill and a pen stroke round the coverage
+        differently, and the loop's round line caps show in the edge pixels.
+        Everything else is hatched line by line.
+        """
+        if dpr != int(dpr):
+            return False
+        transform = painter.worldTransform()
+        if transform.type().value > QTransform.TransformationType.TxTranslate.value:
+            return False
+        values = [transform.dx(), transform.dy()]
+        if antialiased:
+            if clip_rect is None:
+                return False
+            rect = clip_rect.normalized()
+            values += [rect.left(), rect.top(), rect.right(), rect.bottom()]
+        return all(value * dpr == int(value * dpr) for value in values)
+
+    def _draw_hatch_lines(self, painter, hatch_type, bounding_rect, spacing):
+        """Draws one hatch style line by line with the painter's current pen."""
+        if hatch_type == "forward_slash":  # [2187]
+            for i in range(
+                int(bounding_rect.left() - bounding_rect.height()),
+                int(bounding_rect.right() + bounding_rect.height()),
+                spacing,
+            ):  # [2188]
+                painter.drawLine(
+                    QPointF(i, bounding_rect.bottom()),
+                    QPointF(i + bounding_rect.height(), bounding_rect.top()),
+                )  # [2189]
+        elif hatch_type == "backward_slash":  # [2190]
+            for i in range(
+                int(bounding_rect.left() - bounding_rect.height()),
+                int(bounding_rect.right() + bounding_rect.height()),
+                spacing,
+            ):  # [2191]
+                painter.drawLine(
+                    QPointF(i, bounding_rect.top()),
+                    QPointF(i + bounding_rect.height(), bounding_rect.bottom()),
+                )  # [2192]
+        elif hatch_type == "horizontal":  # [2193]
+            for y in range(
+                int(bounding_rect.top()), int(bounding_rect.bottom()), spacing
+            ):  # [2194]
+                painter.drawLine(
+                    QPointF(bounding_rect.left(), y), QPointF(bounding_rect.right(), y)
+                )  # [2195]
+        elif hatch_type == "vertical":  # [2196]
+            for x in range(
+                int(bounding_rect.left()), int(bounding_rect.right()), spacing
+            ):  # [2197]
+                painter.drawLine(
+                    QPointF(x, bounding_rect.top()), QPointF(x, bounding_rect.bottom())
+                )  # [2198]
+
+    def _get_hatch_band(self, hatch_type, bounding_rect, spacing):
+        """
+        Describes where a tiled horizontal or vertical hatch paints inside
+        bounding_rect.
+
+        Returns (band_path, offset), or None for styles drawn line by line.
+        band_path covers exactly the hatch lines the per-line loop draws
+        (from the first to the last line, half a spacing beyond each) and
+        offset is the brush translation that puts the tile's lines on them.
+        Diagonal lines are left to the loop: Qt does not rasterise an
+        antialiased 45-degree line identically at every position, so no
+        tile matches them exactly.
+        """
+        left = bounding_rect.left()
+        right = bounding_rect.right()
+        top = bounding_rect.top()
+        bottom = bounding_rect.bottom()
+        half = spacing / 2.0
+        band_path = QPainterPath()
+
+        if hatch_type == "horizontal":
+            rows = range(int(top), int(bottom), spacing)
+            if not rows:
+                return None
+            band_path.addRect(
+                QRectF(
+                    left - 1.0,
+                    rows[0] - half,
+                    bounding_rect.width() + 2.0,
+                    rows[-1] - rows[0] + spacing,
+                )
+            )
+            return band_path, QPointF(0, rows[0] % spacing)
+
+        if hatch_type == "vertical":
+            columns = range(int(left), int(right), spacing)
+            if not columns:
+                return None
+            band_path.addRect(
+                QRectF(
+                    columns[0] - half,
+                    top - 1.0,
+                    columns[-1] - columns[0] + spacing,
+                    bounding_rect.height() + 2.0,
+                )
+            )
+            return band_path, QPointF(columns[0] % spacing, 0)
+
+        return None
+
+    def _get_hatch_tile(self, hatch_type, color, thickness, spacing, dpr, antialiased):
+        """
+        Returns a cached, seamlessly repeating QPixmap with horizontal or
+        vertical hatch lines (an uncached QImage off the GUI thread), in
+        device pixels with a pixel ratio of 1.
+
+        Tiles are keyed per style (combined styles are painted as separate
+        layers, like the per-line loop does), colour, thickness, spacing,
+        device pixel ratio and antialiasing.
+        """
+        key = (hatch_type, color.rgba(), thickness, spacing, dpr, antialiased)
+        # Animation frames are pre-rendered off the GUI thread, where QPixmap
+        # cannot be used; those renders get an uncached QImage instead.
+        on_gui_thread = threading.current_thread() is threading.main_thread()
+        tile = self._hatch_tile_cache.get(key) if on_gui_thread else None
+        if tile is not None:
+            return tile
+
+        tile_size = spacing * max(1, math.ceil(32 / spacing))
+        image = QImage(
+            round(tile_size * dpr),
+            round(tile_size * dpr),
+            QImage.Format.Format_ARGB32_Premultiplied,
+        )
+        image.setDevicePixelRatio(dpr)
+        image.fill(Qt.GlobalColor.transparent)
+
+        pen = QPen(color, thickness, Qt.PenStyle.SolidLine)
+        pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+        far = 2.0 * tile_size
+        tile_painter = QPainter(image)
+        tile_painter.setRenderHint(QPainter.RenderHint.Antialiasing, antialiased)
+        tile_painter.setPen(pen)
+        # Lines one tile above and below are drawn too, so thick lines wrap.
+        for k in range(-1, tile_size // spacing + 1):
+            c = k * spacing
+            if hatch_type == "horizontal":
+                tile_painter.drawLine(QPointF(-far, c), QPointF(far, c))
+            else:
+                tile_painter.drawLine(QPointF(c, -far), QPointF(c, far))
+        tile_painter.end()
+        image.setDevicePixelRatio(1.0)
+
+        if not on_gui_thread:
+            return image
+        if len(self._hatch_tile_cache) >= 256:
+            self._hatch_tile_cache.clear()
+        tile = QPixmap.fromImage(image)
+        self._hatch_tile_cache[key] = tile
+        return tile
+
     def _draw_center_point_for_shape(self, painter: QPainter, shape: Shape):  # [2200]
         """Draws the center point for the given shape if self.show_center_point is True."""  # [2201]
         if (
@@ -7045,22 +8979,75 @@ class DesktopOverlayRgn(QWidget):  # [697]
         """Schedules shape removal after a specified time in TEMP mode."""  # [2332]
         if not self.temp_mode:  # [2333]
             return  # [2334]
-        duration_ms = int(self.temp_mode_shape_duration * 1000)  # [2335]
-        QTimer.singleShot(
-            duration_ms, lambda: self._remove_temp_shape(shape_to_remove)
+        expiry = time.monotonic() + self.temp_mode_shape_duration  # [2335]
+        heapq.heappush(
+            self._temp_expiry_heap,
+            (expiry, next(self._temp_expiry_counter), shape_to_remove),
         )  # [2336]
+        if self._temp_expiry_heap[0][2] is shape_to_remove and not self._temp_fading:
+            self._schedule_temp_expiry()
+
+    def _schedule_temp_expiry(self):
+        """Arms the expiry timer for the next fade frame or the next due shape."""
+        if self._temp_fading:
+            self._temp_expiry_timer.start(1000 // TEMP_FADE_FPS)
+        elif self._temp_expiry_heap:
+            fade_start = self._temp_expiry_heap[0][0] - self.temp_mode_fade_duration
+            self._temp_expiry_timer.start(
+                max(0, math.ceil((fade_start - time.monotonic()) * 1000))
+            )
+        else:
+            self._temp_expiry_timer.stop()
 
-    def _remove_temp_shape(self, shape_to_remove):  # [2337]
-        """Removes a shape from the shapes list (called by timer)."""  # [2338]
+    def _process_temp_expiry(self):  # [2337]
+        """
+        Starts the fade-out of shapes that are close to expiring, advances the
+        running fades and removes every expired shape in one pass over the
+        shapes list. Only the area of the affected shapes is repainted.
+        """  # [2338]
         try:  # [2339]
-            if shape_to_remove in self.shapes:  # [2340]
-                self.shapes.remove(shape_to_remove)  # [2341]
-                if shape_to_remove in self.selected_shapes:  # [2342]
-                    self.selected_shapes.remove(shape_to_remove)  # [2343]
-                self.update()  # [2344]
+            now = time.monotonic()
+            fade_duration = self.temp_mode_fade_duration
+            expired = set()
+            while (
+                self._temp_expiry_heap
+                and self._temp_expiry_heap[0][0] - fade_duration <= now
+            ):
+                expiry, _, shape = heapq.heappop(self._temp_expiry_heap)
+                if expiry > now:
+                    self._temp_fading[shape] = expiry
+                else:
+                    expired.add(shape)
+            for shape, expiry in list(self._temp_fading.items()):
+                if expiry <= now or fade_duration <= 0:
+                    del self._temp_fading[shape]
+                    expired.add(shape)
+                else:
+                    self._temp_fade_opacity[shape] = min(
+                        1.0, (expiry - now) / fade_duration
+                    )
+
+            dirty = QRect()
+            for shape in itertools.chain(expired, self._temp_fading):
+                rect = self._get_shape_repaint_rect(shape)
+                if rect is not None:
+                    dirty = dirty.united(rect)
+            if expired:  # [2340]
+                for shape in expired:
+                    self._temp_fade_opacity.pop(shape, None)
+                self.shapes = [
+                    shape for shape in self.shapes if shape not in expired
+                ]  # [2341]
+                if any(shape in self.selected_shapes for shape in expired):  # [2342]
+                    self.selected_shapes = [
+                        shape for shape in self.selected_shapes if shape not in expired
+                    ]  # [2343]
+            if not dirty.isEmpty():
+                self.update(dirty)  # [2344]
         except Exception as e:  # [2345]
-            print(f"Error removing temp shape: {e}")  # [2346]
+            print(f"Error removing temp shapes: {e}")  # [2346]
             traceback.print_exc()  # [2347]
+        self._schedule_temp_expiry()
 
     @Slot(bool)  # [2348]
     def set_drawing_mode(
@@ -7484,6 +9471,12 @@ class DesktopOverlayRgn(QWidget):  # [697]
         if duration != self.temp_mode_shape_duration:  # [2651]
             self.temp_mode_shape_duration = duration  # [2652]
 
+    def set_temp_mode_fade_duration(self, seconds):
+        """Sets how long TEMP mode shapes take to fade out before they are removed."""
+        self.temp_mode_fade_duration = max(0.0, seconds)
+        if not self._temp_fading:
+            self._schedule_temp_expiry()
+
     @Slot(dict)  # [2653]
     def update_default_text_properties(self, new_defaults):  # [2654]
         """Slot to update default text properties from the control panel (Normal mode)."""  # [2655]
@@ -8249,6 +10242,120 @@ class DesktopOverlayRgn(QWidget):  # [697]
                 f"Saved snap settings: Mode={self.snap_mode}, Sensitivity={self.snap_sensitivity}"
             )  # [3104]
 
+    def load_scene_file_settings(self):
+        """Loads the scene file output settings."""
+        if self.settings:
+            self.settings.beginGroup("sceneFiles")
+            self.scene_save_compact = self.settings.value(
+                "compactJson", False, type=bool
+            )
+            self.scene_coordinate_precision = self.settings.value(
+                "coordinatePrecision", 2, type=int
+            )
+            cache_megabytes = self.settings.value(
+                "cacheMegabytes", SCENE_CACHE_DEFAULT_MB, type=int
+            )
+            self.settings.endGroup()
+            self.scene_cache.set_max_bytes(cache_megabytes * 1024 * 1024)
+
+    def save_scene_file_settings(self):
+        """Saves the scene file output settings."""
+        if self.settings:
+            self.settings.beginGroup("sceneFiles")
+            self.settings.setValue("compactJson", self.scene_save_compact)
+            self.settings.setValue(
+                "coordinatePrecision", self.scene_coordinate_precision
+            )
+            self.settings.setValue(
+                "cacheMegabytes", self.scene_cache.max_bytes // (1024 * 1024)
+            )
+            self.settings.endGroup()
+
+    def load_autosave_settings(self):
+        """Loads the autosave journal settings."""
+        if self.settings:
+            self.settings.beginGroup("autosave")
+            self.autosave_enabled = self.settings.value("enabled", True, type=bool)
+            self.autosave_interval_ms = max(
+                250,
+                self.settings.value(
+                    "intervalMs", AUTOSAVE_DEFAULT_INTERVAL_MS, type=int
+                ),
+            )
+            self.settings.endGroup()
+
+    def save_autosave_settings(self):
+        """Saves the autosave journal settings."""
+        if self.settings:
+            self.settings.beginGroup("autosave")
+            self.settings.setValue("enabled", self.autosave_enabled)
+            self.settings.setValue("intervalMs", self.autosave_interval_ms)
+            self.settings.endGroup()
+
+    def load_scene_slot_settings(self):
+        """Loads the scene slot files and starts preloading them."""
+        if self.settings:
+            self.settings.beginGroup("sceneSlots")
+            paths = [
+                self.settings.value(f"slot{index + 1}", "", type=str)
+                for index in range(SCENE_SLOT_COUNT)
+            ]
+            self.settings.endGroup()
+            for index, path in enumerate(paths):
+                if path:
+                    self.assign_scene_slot(index, path, save=False)
+
+    def save_scene_slot_settings(self):
+        """Saves the scene slot files."""
+        if self.settings:
+            self.settings.beginGroup("sceneSlots")
+            for index in range(SCENE_SLOT_COUNT):
+                self.settings.setValue(
+                    f"slot{index + 1}", self.scene_slots.path(index) or ""
+                )
+            self.settings.endGroup()
+
+    def load_screenshot_settings(self):
+        """Loads the screenshot encoding settings."""
+        if self.settings:
+            self.settings.beginGroup("screenshots")
+            self.screenshot_png_compression = max(
+                0,
+                min(
+                    9,
+                    self.settings.value(
+                        "pngCompression", SCREENSHOT_DEFAULT_PNG_COMPRESSION, type=int
+                    ),
+                ),
+            )
+            self.screenshot_jpeg_quality = max(
+                0,
+                min(
+                    100,
+                    self.settings.value(
+                        "jpegQuality", SCREENSHOT_DEFAULT_JPEG_QUALITY, type=int
+                    ),
+                ),
+            )
+            burst_format = self.settings.value("burstFormat", "png", type=str).lower()
+            self.screenshot_burst_format = (
+                burst_format if burst_format in ("png", "jpg") else "png"
+            )
+            capture_mode = self.settings.value("captureMode", "screen", type=str)
+            if capture_mode in dict(self.SCREENSHOT_MODES):
+                self.screenshot_capture_mode = capture_mode
+            self.settings.endGroup()
+
+    def save_screenshot_settings(self):
+        """Saves the screenshot encoding settings."""
+        if self.settings:
+            self.settings.beginGroup("screenshots")
+            self.settings.setValue("pngCompression", self.screenshot_png_compression)
+            self.settings.setValue("jpegQuality", self.screenshot_jpeg_quality)
+            self.settings.setValue("burstFormat", self.screenshot_burst_format)
+            self.settings.setValue("captureMode", self.screenshot_capture_mode)
+            self.settings.endGroup()
+
     def load_snap_settings(self):  # [3105]
         """Loads snapping settings."""  # [3106]
         if self.settings:  # [3107]
@@ -8653,18 +10760,31 @@ class DesktopOverlayRgn(QWidget):  # [697]
         all_shapes_before=None,
         selected_shapes_before=None,
         selected_shapes_after=None,
+        copy_shapes=True,
     ):  # [3329]
-        """Saves the current state for undo functionality."""  # [3330]
-        all_shapes_before_copy = (
-            deepcopy(self.shapes)
-            if all_shapes_before is None
-            else deepcopy(all_shapes_before)
-        )  # [3331]
-        selected_shapes_before_copy = (
-            deepcopy(self.selected_shapes)
-            if selected_shapes_before is None
-            else deepcopy(selected_shapes_before)
-        )  # [3332]
+        """
+        Saves the current state for undo functionality.
+
+        With copy_shapes=False the given all_shapes_before and
+        selected_shapes_before lists are stored as they are; the caller must
+        not modify them afterwards (used when the whole shape list is swapped
+        out).
+        """  # [3330]
+        self._autosave_touch(shapes_involved)
+        if not copy_shapes:
+            all_shapes_before_copy = all_shapes_before
+            selected_shapes_before_copy = selected_shapes_before
+        else:
+            all_shapes_before_copy = (
+                deepcopy(self.shapes)
+                if all_shapes_before is None
+                else deepcopy(all_shapes_before)
+            )  # [3331]
+            selected_shapes_before_copy = (
+                deepcopy(self.selected_shapes)
+                if selected_shapes_before is None
+                else deepcopy(selected_shapes_before)
+            )  # [3332]
 
         state = {  # [3333]
             "action": action_type,  # [3334]
@@ -8818,6 +10938,8 @@ class DesktopOverlayRgn(QWidget):  # [697]
 
     def undo(self):  # [3394]
         """Undoes the last action."""  # [3395]
+        self.cancel_scene_load()
+        self._autosave_touch()
         if not self.undo_stack:  # [3396]
             print("Undo stack is empty")  # [3397]
             return  # [3398]
@@ -9066,6 +11188,8 @@ class DesktopOverlayRgn(QWidget):  # [697]
 
     def redo(self):  # [3547]
         """Redoes the last undone action."""  # [3548]
+        self.cancel_scene_load()
+        self._autosave_touch()
         if not self.redo_stack:  # [3549]
             print("Redo stack is empty")  # [3550]
             return  # [3551]
@@ -9317,11 +11441,51 @@ class DesktopOverlayRgn(QWidget):  # [697]
             print(f"Error during redo operation for action '{action}': {e}")  # [3697]
             traceback.print_exc()  # [3698]
 
+    def render_scene_image(self, filename, width, height, dpr):
+        """
+        Paints a scene file into a transparent QImage of the given size with
+        the same drawing code as the overlay. Runs on the animation frame
+        render thread, so it only reads overlay settings.
+        """
+        reader = self.scene_cache.open(filename)
+        shapes = self._shapes_from_scene_data(reader.iter_shape_dicts(), filename)
+        if reader.format_error:
+            raise ValueError(reader.format_error)
+        image = QImage(
+            max(1, round(width * dpr)),
+            max(1, round(height * dpr)),
+            QImage.Format.Format_ARGB32_Premultiplied,
+        )
+        image.setDevicePixelRatio(dpr)
+        image.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(image)
+        try:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+            for shape in shapes:
+                if shape and shape.geometry:
+                    self.draw_shape(painter, shape, show_angle_offset=False)
+        finally:
+            painter.end()
+        return image
+
+    def show_animation_frame(self, tag, frame):
+        """Shows a pre-rendered animation frame until its tag is removed."""
+        self.animation_frames.append((tag, frame))
+        self.update()
+
     def remove_shapes_by_animation_tag(self, tag_to_remove):  # [3699]
-        """Removes all shapes with the given animation tag."""  # [3700]
+        """Removes all shapes and pre-rendered frames with the given animation tag."""  # [3700]
         if not tag_to_remove:  # [3701]
             return  # [3702]
 
+        frame_count = len(self.animation_frames)
+        self.animation_frames = [
+            (tag, frame) for tag, frame in self.animation_frames if tag != tag_to_remove
+        ]
+        if len(self.animation_frames) != frame_count:
+            self.update()
+
         original_shapes_count = len(self.shapes)  # [3703]
         self.shapes = [
             shape for shape in self.shapes if shape.animation_tag != tag_to_remove
@@ -9338,6 +11502,15 @@ class DesktopOverlayRgn(QWidget):  # [697]
         """Handles mouse press events for drawing, selecting, resizing, dragging."""  # [3710]
         if not self.drawing_mode:
             return  # [3711]
+        if self._region_capture is not None:
+            if event.button() == Qt.MouseButton.LeftButton:
+                pos = event.position().toPoint()
+                self._region_capture.update(start=pos, end=pos)
+                self.update()
+            else:
+                self.cancel_region_capture()
+            event.accept()
+            return
         if self.input_mode:  # [3712]
             print(
                 f"Cancelling input mode '{self.input_mode}' due to mouse press."
@@ -9643,8 +11816,6 @@ class DesktopOverlayRgn(QWidget):  # [697]
                     )  # [3919]
                     if self.show_angle_offset:  # [3920]
                         self.recalculate_and_update_angle_offsets()  # [3921]
-                    else:  # [3922]
-                        self.update()  # [3923]
                 event.accept()  # [3924]
                 action_taken = True  # [3925]
                 return  # [3926]
@@ -10179,6 +12350,13 @@ class DesktopOverlayRgn(QWidget):  # [697]
         """Handles mouse movement for drawing preview, dragging, and resizing."""  # [4210]
         if not self.drawing_mode:
             return  # [4211]
+        if self._region_capture is not None:
+            if self._region_capture["start"] is not None:
+                dirty = self._region_capture_rect()
+                self._region_capture["end"] = event.position().toPoint()
+                self.update(dirty.united(self._region_capture_rect()).adjusted(-2, -2, 2, 2))
+            event.accept()
+            return
         if self.input_mode:  # [4212]
             print(
                 f"Cancelling input mode '{self.input_mode}' due to mouse move."
@@ -10814,6 +12992,15 @@ class DesktopOverlayRgn(QWidget):  # [697]
         """Handles mouse release events to finalize drawing, dragging, or resizing."""  # [4507]
         if not self.drawing_mode:
             return  # [4508]
+        if self._region_capture is not None:
+            if (
+                event.button() == Qt.MouseButton.LeftButton
+                and self._region_capture["start"] is not None
+            ):
+                self._region_capture["end"] = event.position().toPoint()
+                self.finish_region_capture()
+            event.accept()
+            return
         if self.input_mode:  # [4509]
             self.input_mode = None
             self.update()
@@ -11468,6 +13655,11 @@ class DesktopOverlayRgn(QWidget):  # [697]
         modifiers = event.modifiers()  # [4735]
         text = event.text()  # [4736]
 
+        if self._region_capture is not None and key == Qt.Key.Key_Escape:
+            self.cancel_region_capture()
+            event.accept()
+            return
+
         is_anim_active = False  # [4737]
         if self.control_panel and hasattr(
             self.control_panel, "_animation_running"
@@ -12763,6 +14955,9 @@ class DesktopOverlayRgn(QWidget):  # [697]
         self.save_hatch_fill_settings()
         self.save_division_point_settings()
         self.save_snap_settings()
+        self.save_autosave_settings()
+        self.save_scene_slot_settings()
+        self.save_screenshot_settings()
         # Other DesktopOverlayRgn specific settings can be added here
         # e.g. self.settings.setValue("overlay/someOtherSetting", self.some_other_setting_value)
         self.settings.sync()
@@ -12943,9 +15138,29 @@ class DesktopOverlayRgn(QWidget):  # [697]
         print(f"Pasted {len(self.clipboard_shapes)} shapes.")  # [5335]
 
     def capture_screenshot(self):  # [5336]
-        """Initiates the screenshot capture process."""  # [5337]
+        """Asks what to capture and initiates the screenshot capture process."""  # [5337]
         try:  # [5338]
-            self._do_capture_screenshot()  # [5339]
+            menu = QMenu(self)
+            for mode, label in self.SCREENSHOT_MODES:
+                action = menu.addAction(label)
+                action.setData(mode)
+                if mode == "selection":
+                    action.setEnabled(bool(self.selected_shapes))
+                if mode == self.screenshot_capture_mode and action.isEnabled():
+                    menu.setActiveAction(action)
+            chosen = menu.exec(QCursor.pos())
+            if chosen is None:
+                print("Screenshot cancelled.")
+                return
+            self.screenshot_capture_mode = chosen.data()
+            if self.screenshot_capture_mode == "region":
+                self.start_region_capture()
+                return
+            capture_rect = self._screenshot_capture_rect(self.screenshot_capture_mode)
+            QTimer.singleShot(
+                SCREENSHOT_SETTLE_MS,
+                lambda: self._do_capture_screenshot(capture_rect),
+            )
         except Exception as e:  # [5340]
             print(f"Error preparing screenshot: {e}")  # [5341]
             traceback.print_exc()  # [5342]
@@ -12955,29 +15170,166 @@ class DesktopOverlayRgn(QWidget):  # [697]
                 f"An unexpected error occurred during screenshot preparation:\n{e}",
             )  # [5343]
 
-    def _do_capture_screenshot(self):  # [5344]
-        """Actual screenshot capture and save logic."""  # [5345]
-        try:  # [5346]
-            screen = QGuiApplication.primaryScreen()  # [5347]
-            if not screen:  # [5348]
-                print("Error: Could not get primary screen.")  # [5349]
-                QMessageBox.warning(
-                    self, "Screenshot Error", "Could not access primary screen."
-                )  # [5350]
-                return  # [5351]
+    def _screenshot_capture_rect(self, mode):
+        """Returns the desktop area, in global coordinates, captured by a mode."""
+        if mode == "selection":
+            bounds = QRect()
+            for shape in self.selected_shapes:
+                rect = self._get_shape_repaint_rect(shape)
+                if rect is not None:
+                    bounds = bounds.united(rect)
+            return bounds.translated(self.mapToGlobal(QPoint(0, 0)))
+        primary = QGuiApplication.primaryScreen()
+        if mode == "all":
+            return primary.virtualGeometry()
+        screen = QGuiApplication.screenAt(QCursor.pos()) or primary
+        return screen.geometry()
+
+    def start_region_capture(self):
+        """Lets the user drag out the rectangle to capture; Esc or RMB cancels."""
+        self._region_capture = {
+            "start": None,
+            "end": None,
+            "restore_drawing_mode": not self.drawing_mode,
+        }
+        if not self.drawing_mode:
+            self.set_drawing_mode(True)
+        self.setCursor(Qt.CursorShape.CrossCursor)
+        self.activateWindow()
+        self.setFocus(Qt.FocusReason.OtherFocusReason)
+        print("Screenshot: drag out the region to capture (Esc cancels).")
+
+    def _region_capture_rect(self):
+        return QRect(self._region_capture["start"], self._region_capture["end"]).normalized()
+
+    def _end_region_capture(self):
+        region_capture, self._region_capture = self._region_capture, None
+        self.unsetCursor()
+        if region_capture["restore_drawing_mode"]:
+            self.set_drawing_mode(False)
+        self.update()
+        return region_capture
+
+    def cancel_region_capture(self):
+        if self._region_capture is not None:
+            self._end_region_capture()
+            print("Screenshot cancelled.")
+
+    def finish_region_capture(self):
+        rect = self._region_capture_rect()
+        self._end_region_capture()
+        if rect.width() < 2 or rect.height() < 2:
+            print("Screenshot cancelled: region too small.")
+            return
+        capture_rect = rect.translated(self.mapToGlobal(QPoint(0, 0)))
+        QTimer.singleShot(
+            SCREENSHOT_SETTLE_MS, lambda: self._do_capture_screenshot(capture_rect)
+        )
 
-            desktop_wid = 0  # [5352]
-            pixmap = screen.grabWindow(desktop_wid)  # [5353]
-            if pixmap.isNull():  # [5354]
-                print(
-                    "Whole screen grab failed, grabbing primary screen geometry."
-                )  # [5355]
-                geom = screen.geometry()  # [5356]
+    def grab_screenshot_image(self, capture_rect):
+        """
+        Captures a desktop area given in global coordinates: the desktop from
+        grab_desktop_image with the shapes painted on it by paint_scene, so
+        they are drawn at native resolution and only those inside the area
+        cost anything. Returns a QImage, or None if nothing could be grabbed.
+        """
+        image = self.grab_desktop_image(capture_rect)
+        if image is None:
+            return None
+        painter = QPainter(image)
+        try:
+            self.paint_scene(
+                painter, capture_rect.translated(-self.mapToGlobal(QPoint(0, 0)))
+            )
+        finally:
+            painter.end()
+        return image
+
+    def grab_desktop_image(self, capture_rect):
+        """
+        Grabs a desktop area given in global coordinates without the shapes.
+        Each screen it touches is grabbed for its own part only, with the
+        overlay showing just its background, and the parts are stitched at
+        the highest pixel ratio among them. Returns a QImage, or None if
+        nothing could be grabbed.
+        """
+        screens = [
+            screen
+            for screen in QGuiApplication.screens()
+            if screen.geometry().intersects(capture_rect)
+        ]
+        if not screens or capture_rect.isEmpty():
+            return None
+        dpr = max(screen.devicePixelRatio() for screen in screens)
+        image = QImage(
+            max(1, round(capture_rect.width() * dpr)),
+            max(1, round(capture_rect.height() * dpr)),
+            QImage.Format.Format_ARGB32_Premultiplied,
+        )
+        image.setDevicePixelRatio(dpr)
+        image.fill(Qt.GlobalColor.black)
+
+        self._capture_background_only = True
+        if self.isVisible():
+            self.repaint()
+        grabbed = False
+        painter = QPainter(image)
+        try:
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            for screen in screens:
+                screen_geometry = screen.geometry()
+                part = capture_rect.intersected(screen_geometry)
                 pixmap = screen.grabWindow(
-                    0, geom.x(), geom.y(), geom.width(), geom.height()
-                )  # [5357]
+                    0,
+                    part.x() - screen_geometry.x(),
+                    part.y() - screen_geometry.y(),
+                    part.width(),
+                    part.height(),
+                )
+                if pixmap.isNull():
+                    print(f"Screenshot: could not grab screen {screen.name()}.")
+                    continue
+                painter.drawPixmap(
+                    QRectF(part.translated(-capture_rect.topLeft())),
+                    pixmap,
+                    QRectF(pixmap.rect()),
+                )
+                grabbed = True
+        finally:
+            self._capture_background_only = False
+            if self.isVisible():
+                self.update()
+            painter.end()
+        return image if grabbed else None
+
+    def paint_scene(self, painter, overlay_area):
+        """
+        Paints the pre-rendered animation frames and the committed shapes
+        inside overlay_area (overlay coordinates) with its top-left corner at
+        the painter's origin, without selection handles or previews.
+        """
+        painter.save()
+        try:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+            painter.translate(-QPointF(overlay_area.topLeft()))
+            painter.setClipRect(overlay_area)
+            for _, frame in self.animation_frames:
+                painter.drawPixmap(0, 0, frame)
+            for shape in self.shapes:
+                if not shape or not shape.geometry:
+                    continue
+                bounds = self._get_shape_repaint_rect(shape)
+                if bounds is not None and bounds.intersects(overlay_area):
+                    self.draw_shape(painter, shape, show_angle_offset=False)
+        finally:
+            painter.restore()
 
-            if pixmap.isNull():  # [5358]
+    def _do_capture_screenshot(self, capture_rect):  # [5344]
+        """Actual screenshot capture and save logic."""  # [5345]
+        try:  # [5346]
+            image = self.grab_screenshot_image(capture_rect)
+            if image is None:  # [5358]
                 print("Error: Failed to capture screenshot.")  # [5359]
                 QMessageBox.warning(
                     self, "Screenshot Error", "Failed to capture screen content."
@@ -13002,68 +15354,150 @@ class DesktopOverlayRgn(QWidget):  # [697]
                     "paths/lastScreenshotSaveDir", os.path.dirname(filename)
                 )  # [5370]
                 file_format = None  # [5371]
-                quality = -1  # [5372]
                 low_filename = filename.lower()  # [5373]
                 if "png" in selected_filter.lower() or low_filename.endswith(
                     ".png"
                 ):  # [5374]
                     file_format = "png"  # [5375]
-                    quality = -1  # [5376]
                 elif (
                     "jp" in selected_filter.lower()
                     or low_filename.endswith(".jpg")
                     or low_filename.endswith(".jpeg")
                 ):  # [5377]
                     file_format = "jpg"  # [5378]
-                    quality = 95  # [5379]
                 else:  # [5380]
                     file_format = "jpg"  # [5381]
-                    quality = 95  # [5382]
                     if not (
                         low_filename.endswith(".jpg") or low_filename.endswith(".jpeg")
                     ):  # [5383]
                         filename += ".jpg"  # [5384]
 
-                if pixmap.save(filename, file_format, quality):  # [5385]
-                    print(
-                        f"Screenshot saved to: {filename} (Format: {file_format}, Quality: {quality})"
-                    )  # [5386]
-                else:  # [5387]
-                    print(f"Error: Failed to save screenshot to {filename}.")  # [5388]
-                    QMessageBox.warning(
-                        self, "Save Error", f"Could not save screenshot to:\n{filename}"
-                    )  # [5389]
+                self.save_screenshot_image(image, filename, file_format)
             else:  # [5390]
                 print("Screenshot cancelled.")  # [5391]
 
-        except Exception as e:  # [5392]
-            print(f"Error capturing or saving screenshot: {e}")  # [5393]
-            traceback.print_exc()  # [5394]
-            QMessageBox.critical(
-                self,
-                "Screenshot Error",
-                f"An unexpected error occurred during screenshot:\n{e}",
-            )  # [5395]
+        except Exception as e:  # [5392]
+            print(f"Error capturing or saving screenshot: {e}")  # [5393]
+            traceback.print_exc()  # [5394]
+            QMessageBox.critical(
+                self,
+                "Screenshot Error",
+                f"An unexpected error occurred during screenshot:\n{e}",
+            )  # [5395]
+
+    def _screenshot_quality(self, file_format):
+        if file_format == "png":
+            return ScreenshotWriter.png_quality(self.screenshot_png_compression)
+        return self.screenshot_jpeg_quality
+
+    def save_screenshot_image(self, image, filename, file_format):
+        """Hands a captured image to the screenshot writer; the result is reported by the poll."""
+        quality = self._screenshot_quality(file_format)
+        self.screenshot_writer.save(image, filename, file_format, quality)
+        self._screenshot_poll_timer.start()
+        print(
+            f"Screenshot queued for saving: {filename} (Format: {file_format}, Quality: {quality})"
+        )
+
+    def capture_burst_screenshot(self):
+        """
+        Grabs the screen into memory without asking for a file name. Captures
+        are encoded into the last screenshot folder once the burst pauses for
+        SCREENSHOT_BURST_IDLE_MS or the held images exceed SCREENSHOT_BURST_MAX_MB.
+        """
+        screen = QGuiApplication.screenAt(QCursor.pos()) or QGuiApplication.primaryScreen()
+        if not screen:
+            print("Error: Could not get primary screen.")
+            return
+        pixmap = screen.grabWindow(0)
+        if pixmap.isNull():
+            print("Error: Failed to capture burst screenshot.")
+            return
+        save_dir = self.settings.value(
+            "paths/lastScreenshotSaveDir",
+            QStandardPaths.writableLocation(
+                QStandardPaths.StandardLocation.PicturesLocation
+            ),
+        )
+        file_format = self.screenshot_burst_format
+        now = time.time()
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(now))
+        filename = os.path.join(
+            save_dir,
+            f"screenshot_{stamp}_{int(now * 1000) % 1000:03d}"
+            f"_{self.screenshot_writer.held_count() + 1:03d}.{file_format}",
+        )
+        held_bytes = self.screenshot_writer.hold(
+            pixmap.toImage(), filename, file_format, self._screenshot_quality(file_format)
+        )
+        print(
+            f"Burst screenshot {self.screenshot_writer.held_count()} held in memory "
+            f"({held_bytes / (1024 * 1024):.1f} MB)"
+        )
+        if held_bytes > SCREENSHOT_BURST_MAX_MB * 1024 * 1024:
+            self.flush_burst_screenshots()
+        else:
+            self._screenshot_burst_timer.start()
+
+    def flush_burst_screenshots(self):
+        """Starts encoding the burst captures held in memory."""
+        self._screenshot_burst_timer.stop()
+        count = self.screenshot_writer.release_held()
+        if count:
+            print(f"Encoding {count} burst screenshot(s)...")
+            self._screenshot_poll_timer.start()
+
+    def _poll_screenshot_writer(self):
+        for path, error in self.screenshot_writer.poll():
+            if error:
+                print(f"Error: Failed to save screenshot to {path}: {error}")
+                QMessageBox.warning(
+                    self, "Save Error", f"Could not save screenshot to:\n{path}\n\n{error}"
+                )
+            else:
+                print(f"Screenshot saved to: {path}")
+            self.screenshot_saved.emit(path, error or "")
+        if not self.screenshot_writer.busy():
+            self._screenshot_poll_timer.stop()
+
+    def finish_screenshots(self):
+        """Writes any held or queued screenshots before exit."""
+        self._screenshot_burst_timer.stop()
+        if self.screenshot_writer.busy():
+            print("Overlay: Writing pending screenshots...")
+        self.screenshot_writer.shutdown()
+        self._screenshot_poll_timer.stop()
+        for path, error in self.screenshot_writer.poll():
+            if error:
+                print(f"Error: Failed to save screenshot to {path}: {error}")
+            else:
+                print(f"Screenshot saved to: {path}")
+
+    @Slot(str, str)
+    def _clear_saved_view(self, path, error):
+        """Clears the view saved by _perform_delayed_screenshot_and_exit."""
+        if path not in self._views_to_clear:
+            return
+        self._views_to_clear.discard(path)
+        if error:
+            print("Keeping the view because it could not be saved.")
+            return
+        self.background_pixmap = None  # [5406]
+        print("Background image cleared after saving.")  # [5407]
+        print("Clearing shapes after saving view.")  # [5408]
+        self.clear_scene(save_undo=False)  # [5409]
 
     def _perform_delayed_screenshot_and_exit(self, filename):  # [5396]
         """Performs a screenshot and exits loadimg mode after saving."""  # [5397]
         print(f"Performing delayed screenshot to: {filename}")  # [5398]
         screen = QGuiApplication.primaryScreen()  # [5399]
-        shapes_cleared_after_save = False  # [5400]
         if screen:  # [5401]
             pixmap = screen.grabWindow(0)  # [5402]
             if not pixmap.isNull():  # [5403]
-                if pixmap.save(filename, "jpg", 95):  # [5404]
-                    print(f"View saved as JPG: {filename}")  # [5405]
-                    self.background_pixmap = None  # [5406]
-                    print("Background image cleared after saving.")  # [5407]
-                    print("Clearing shapes after saving view.")  # [5408]
-                    self.clear_scene(save_undo=False)  # [5409]
-                    shapes_cleared_after_save = True  # [5410]
-                else:  # [5411]
-                    QMessageBox.warning(
-                        self, "Save Error", f"Failed to save JPG image to:\n{filename}"
-                    )  # [5412]
+                # The scene is cleared by _clear_saved_view once the file is
+                # written, so a failed write keeps the drawing.
+                self._views_to_clear.add(filename)
+                self.save_screenshot_image(pixmap.toImage(), filename, "jpg")
             else:  # [5413]
                 QMessageBox.warning(
                     self, "Save Error", "Failed to grab screen content for saving."
@@ -13569,9 +16003,21 @@ class DesktopOverlayRgn(QWidget):  # [697]
             else:
                 print("Text dialog cancelled")  # [5627]
 
-    def save_scene(self, filename):  # [5628]
-        """Saves the current scene (list of shapes) to a JSON file."""  # [5629]
+    def save_scene(self, filename, compact=None):  # [5628]
+        """
+        Saves the current scene (list of shapes) to a JSON file.
+
+        In compact mode (compact=True, or the sceneFiles/compactJson setting
+        when compact is None) the file is written without indentation, shape
+        coordinates are rounded to scene_coordinate_precision decimals and
+        shape styles are stored once in a shared table (format version 2).
+        Files ending in .json.gz are always compact and gzip-compressed.
+        """  # [5629]
         print(f"Saving scene to {filename}")  # [5630]
+        if filename.lower().endswith(SCENE_GZIP_SUFFIX):
+            compact = True
+        elif compact is None:
+            compact = self.scene_save_compact
         try:  # [5631]
             mpoint_save_data = {  # [5632]
                 "settings": self.mpoint_settings,  # [5633]
@@ -13609,10 +16055,22 @@ class DesktopOverlayRgn(QWidget):  # [697]
             }  # [5653]
 
             scene_data = []  # [5654]
+            styles = []
+            style_indices = {}
             for i, shape in enumerate(self.shapes):  # [5655]
                 if shape:  # [5656]
                     try:  # [5657]
                         shape_dict = shape.to_dict()  # [5658]
+                        if shape_dict and compact:
+                            self._round_shape_dict_coordinates(shape_dict)
+                            style = Shape.split_style(shape_dict)
+                            style_key = json.dumps(style, sort_keys=True)
+                            style_index = style_indices.get(style_key)
+                            if style_index is None:
+                                style_index = len(styles)
+                                style_indices[style_key] = style_index
+                                styles.append(style)
+                            shape_dict["style"] = style_index
                         if shape_dict:  # [5659]
                             scene_data.append(shape_dict)  # [5660]
                         else:  # [5661]
@@ -13636,357 +16094,854 @@ class DesktopOverlayRgn(QWidget):  # [697]
                 "hatch_fill_settings": hatch_fill_settings_save,  # [5672]
                 "division_point_settings": division_point_settings_save,  # [5673]
             }  # [5674]
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(full_data, f, indent=4)  # [5675]
+            if compact:
+                # The style table goes first so readers can resolve shapes as
+                # they stream in.
+                full_data = {
+                    "schema_version": SCENE_SCHEMA_VERSION,
+                    "styles": styles,
+                    **full_data,
+                }
+            if filename.lower().endswith(SCENE_GZIP_SUFFIX):
+                with gzip.open(filename, "wt", encoding="utf-8") as f:
+                    json.dump(full_data, f, separators=(",", ":"))
+            elif compact:
+                with open(filename, "w", encoding="utf-8") as f:
+                    json.dump(full_data, f, separators=(",", ":"))
+            else:
+                with open(filename, "w", encoding="utf-8") as f:
+                    json.dump(full_data, f, indent=4)  # [5675]
             print(f"Scene saved successfully ({len(scene_data)} shapes).")  # [5676]
         except Exception as e:
             print(f"Error saving scene: {e}")
             traceback.print_exc()  # [5677]
 
+    def _round_shape_dict_coordinates(self, shape_dict):
+        """Rounds the geometry of a serialized shape for compact scene files."""
+        precision = self.scene_coordinate_precision
+        if precision < 0:
+            return
+
+        def round_value(value):
+            if isinstance(value, float):
+                value = round(value, precision)
+                if value.is_integer():
+                    return int(value)
+            return value
+
+        geometry = shape_dict.get("geometry")
+        if isinstance(geometry, (list, tuple)):
+            shape_dict["geometry"] = [
+                [round_value(v) for v in item]
+                if isinstance(item, (list, tuple))
+                else round_value(item)
+                for item in geometry
+            ]
+
     def load_scene(self, filename, join=False, animation_tag=None):  # [5678]
         """Loads a scene from a JSON file, optionally joining with the current scene."""  # [5679]
         loaded_count = 0  # [5680]
         try:  # [5681]
-            with open(filename, "r", encoding="utf-8") as f:
-                full_data = json.load(f)  # [5682]
-
-            scene_data = []  # [5683]
-            mpoint_load_data = None  # [5684]
-            dimension_text_defaults_load = None  # [5685]
-            dimension_preview_line_color_load_str = None  # [5686]
-            dimension_preview_color_explicitly_set_load = None  # [5687]
-            angle_tool_settings_load = None  # [5688]
-            hatch_fill_settings_load = None  # [5689]
-            division_point_settings_load = None  # [5690]
-
-            if isinstance(full_data, list):  # [5691]
-                print("Loading old scene format (list of shapes).")  # [5692]
-                scene_data = full_data  # [5693]
-            elif isinstance(full_data, dict):  # [5694]
-                scene_data = full_data.get("shapes", [])  # [5695]
-                mpoint_load_data = full_data.get("mpoint_data")  # [5696]
-                dimension_text_defaults_load = full_data.get(
-                    "dimension_text_defaults"
-                )  # [5697]
-                dimension_preview_line_color_load_str = full_data.get(
-                    "dimension_preview_line_color"
-                )  # [5698]
-                dimension_preview_color_explicitly_set_load = full_data.get(
-                    "dimension_preview_color_explicitly_set"
-                )  # [5699]
-                angle_tool_settings_load = full_data.get(
-                    "angle_tool_settings"
-                )  # [5700]
-                hatch_fill_settings_load = full_data.get(
-                    "hatch_fill_settings"
-                )  # [5701]
-                division_point_settings_load = full_data.get(
-                    "division_point_settings"
-                )  # [5702]
-                if not isinstance(scene_data, list):  # [5703]
-                    print(
-                        f"Error: 'shapes' key in loaded data is not a list. Aborting load for file {filename}."
-                    )  # [5704]
-                    return 0  # [5705]
-            else:  # [5706]
+            reader = self.scene_cache.open(filename)
+            loaded_shapes = self._shapes_from_scene_data(
+                reader.iter_shape_dicts(), filename, animation_tag
+            )
+            if reader.format_error:
                 print(
-                    f"Error: Loaded data is not a list or dictionary. Aborting load for file {filename}."
-                )  # [5707]
-                return 0  # [5708]
+                    f"Error: {reader.format_error}. Aborting load for file {filename}."
+                )  # [5704]
+                return 0  # [5705]
+
+            self._begin_scene_load(filename, join)
+            if not join:
+                self._apply_scene_settings(reader.settings)
+            loaded_count = self._commit_loaded_shapes(loaded_shapes, join, 0)
+            self._finish_scene_load(filename, loaded_count)
+            return loaded_count  # [5848]
 
-            if not join:  # [5709]
-                print("Replacing current scene.")  # [5710]
-                self.save_state(
-                    "load",
-                    all_shapes_before=deepcopy(self.shapes),
-                    selected_shapes_before=deepcopy(self.selected_shapes),
-                )  # [5711]
-                self.shapes.clear()
-                self.selected_shapes.clear()
-                self.current_drawing_shape = None  # [5712]
-                self.polygon_points.clear()
-                self.angle_points.clear()
-                self.brush_points.clear()
-                self.spline_points.clear()  # [5713]
-                self.show_angle_offset = False  # [5714]
-                self.angle_offsets.clear()  # [5715]
-                if self.input_mode:  # [5716]
-                    print(
-                        f"Cancelling input mode '{self.input_mode}' due to load scene."
-                    )  # [5717]
-                    self.input_mode = None  # [5718]
-                self.dimension_points.clear()  # [5719]
-                self.dimension_preview_shapes.clear()  # [5720]
-                self.angle_points.clear()  # [5721]
-                self.active_angle_shape_for_point_drag = None  # [5722]
-                self.active_angle_point_handle = None  # [5723]
-
-                if mpoint_load_data:  # [5724]
-                    self.mpoint_settings = mpoint_load_data.get(
-                        "settings", self.mpoint_settings
-                    )  # [5725]
-                    self.next_mpoint_label = mpoint_load_data.get(
-                        "next_label", self.next_mpoint_label
-                    )  # [5726]
-                    if self.control_panel:  # [5727]
-                        self.control_panel.update_mpoint_controls(
-                            self.mpoint_settings
-                        )  # [5728]
-                    print(
-                        f"Loaded MPoint settings: Size={self.mpoint_settings.get('size')}, Label={self.mpoint_settings.get('label_enabled')}, Next='{self.next_mpoint_label}'"
-                    )  # [5729]
-                else:  # [5730]
-                    print("No MPoint data found in save file.")  # [5731]
-                    self._reset_next_mpoint_label()  # [5732]
-                    self.mpoint_settings = {  # [5733]
-                        "style": "circle",
-                        "size": 10,
-                        "label_enabled": False,
-                        "label_pos": "Up",
-                        "label_start": "1",  # [5734]
-                    }  # [5735]
-                    if self.control_panel:  # [5736]
-                        self.control_panel.update_mpoint_controls(
-                            self.mpoint_settings
-                        )  # [5737]
-                if dimension_text_defaults_load:  # [5738]
-                    self.dimension_default_text_properties = (
-                        dimension_text_defaults_load  # [5739]
+        except Exception as e:  # [5853]
+            self._report_scene_load_error(filename, e)
+            return 0  # [5856]
+
+    def _report_scene_load_error(self, filename, error):
+        """Prints and shows a load error the same way for sync and background loads."""
+        if isinstance(error, json.JSONDecodeError):  # [5849]
+            print(f"Error decoding JSON from {filename}: {error}")  # [5850]
+            QMessageBox.warning(
+                self,
+                "Load Error",
+                f"Could not decode JSON file:\n{filename}\n\n{error}",
+            )  # [5851]
+            return
+        print(f"Error loading scene from {filename}: {error}")
+        traceback.print_exception(type(error), error, error.__traceback__)  # [5854]
+        QMessageBox.warning(
+            self,
+            "Load Error",
+            f"An unexpected error occurred loading the scene from:\n{filename}\n\n{error}",
+        )  # [5855]
+
+    def _begin_scene_load(self, filename, join):
+        """
+        Records the undo state for a load and, when replacing the scene,
+        clears the current one.
+        """
+        if not join:  # [5709]
+            print("Replacing current scene.")  # [5710]
+            self.save_state(
+                "load",
+                all_shapes_before=deepcopy(self.shapes),
+                selected_shapes_before=deepcopy(self.selected_shapes),
+            )  # [5711]
+            self.shapes.clear()
+            self.selected_shapes.clear()
+            self._reset_scene_input_state()
+        else:  # [5817]
+            print(
+                f"Joining loaded scene from {filename} with current scene."
+            )  # [5818]
+            self.save_state("load_join", previous_geometries=0)  # [5819]
+            pass  # [5820]
+
+    def _reset_scene_input_state(self):
+        """Drops in-progress drawing and tool state when the scene is replaced."""
+        self.current_drawing_shape = None  # [5712]
+        self.polygon_points.clear()
+        self.angle_points.clear()
+        self.brush_points.clear()
+        self.spline_points.clear()  # [5713]
+        self.show_angle_offset = False  # [5714]
+        self.angle_offsets.clear()  # [5715]
+        if self.input_mode:  # [5716]
+            print(
+                f"Cancelling input mode '{self.input_mode}' due to load scene."
+            )  # [5717]
+            self.input_mode = None  # [5718]
+        self.dimension_points.clear()  # [5719]
+        self.dimension_preview_shapes.clear()  # [5720]
+        self.angle_points.clear()  # [5721]
+        self.active_angle_shape_for_point_drag = None  # [5722]
+        self.active_angle_point_handle = None  # [5723]
+        self.background_pixmap = None  # [5816]
+
+    def _apply_scene_settings(self, scene_settings):
+        """Applies the tool settings stored in a scene file that replaces the scene."""
+        mpoint_load_data = scene_settings.get("mpoint_data")  # [5696]
+        dimension_text_defaults_load = scene_settings.get(
+            "dimension_text_defaults"
+        )  # [5697]
+        dimension_preview_line_color_load_str = scene_settings.get(
+            "dimension_preview_line_color"
+        )  # [5698]
+        dimension_preview_color_explicitly_set_load = scene_settings.get(
+            "dimension_preview_color_explicitly_set"
+        )  # [5699]
+        angle_tool_settings_load = scene_settings.get("angle_tool_settings")  # [5700]
+        hatch_fill_settings_load = scene_settings.get("hatch_fill_settings")  # [5701]
+        division_point_settings_load = scene_settings.get(
+            "division_point_settings"
+        )  # [5702]
+
+        if mpoint_load_data:  # [5724]
+            self.mpoint_settings = mpoint_load_data.get(
+                "settings", self.mpoint_settings
+            )  # [5725]
+            self.next_mpoint_label = mpoint_load_data.get(
+                "next_label", self.next_mpoint_label
+            )  # [5726]
+            if self.control_panel:  # [5727]
+                self.control_panel.update_mpoint_controls(
+                    self.mpoint_settings
+                )  # [5728]
+            print(
+                f"Loaded MPoint settings: Size={self.mpoint_settings.get('size')}, Label={self.mpoint_settings.get('label_enabled')}, Next='{self.next_mpoint_label}'"
+            )  # [5729]
+        else:  # [5730]
+            print("No MPoint data found in save file.")  # [5731]
+            self._reset_next_mpoint_label()  # [5732]
+            self.mpoint_settings = {  # [5733]
+                "style": "circle",
+                "size": 10,
+                "label_enabled": False,
+                "label_pos": "Up",
+                "label_start": "1",  # [5734]
+            }  # [5735]
+            if self.control_panel:  # [5736]
+                self.control_panel.update_mpoint_controls(
+                    self.mpoint_settings
+                )  # [5737]
+        if dimension_text_defaults_load:  # [5738]
+            self.dimension_default_text_properties = (
+                dimension_text_defaults_load  # [5739]
+            )
+            print("Loaded dimension text defaults from scene file.")  # [5740]
+        else:  # [5741]
+            self.dimension_default_text_properties = {  # [5742]
+                "text": "",
+                "font": "Arial",
+                "size": 10,
+                "bold": False,
+                "italic": False,  # [5743]
+                "underline": False,
+                "strikeout": False,
+                "color": "#000000",  # [5744]
+                "background_color": None,
+                "alignment": "center",
+                "curve_angle": 0,  # [5745]
+                "dimension_suffix": "",  # [5746]
+            }  # [5747]
+            print(
+                "No dimension text defaults found in scene file, reset to defaults."
+            )  # [5748]
+
+        if dimension_preview_line_color_load_str:  # [5749]
+            loaded_preview_color = QColor(
+                dimension_preview_line_color_load_str
+            )  # [5750]
+            if loaded_preview_color.isValid():  # [5751]
+                self.dimension_preview_line_color = (
+                    loaded_preview_color  # [5752]
+                )
+                if (
+                    dimension_preview_color_explicitly_set_load is not None
+                ):  # [5753]
+                    self.dimension_preview_color_explicitly_set = (
+                        dimension_preview_color_explicitly_set_load  # [5754]
                     )
-                    print("Loaded dimension text defaults from scene file.")  # [5740]
-                else:  # [5741]
-                    self.dimension_default_text_properties = {  # [5742]
-                        "text": "",
-                        "font": "Arial",
-                        "size": 10,
-                        "bold": False,
-                        "italic": False,  # [5743]
-                        "underline": False,
-                        "strikeout": False,
-                        "color": "#000000",  # [5744]
-                        "background_color": None,
-                        "alignment": "center",
-                        "curve_angle": 0,  # [5745]
-                        "dimension_suffix": "",  # [5746]
-                    }  # [5747]
-                    print(
-                        "No dimension text defaults found in scene file, reset to defaults."
-                    )  # [5748]
-
-                if dimension_preview_line_color_load_str:  # [5749]
-                    loaded_preview_color = QColor(
-                        dimension_preview_line_color_load_str
-                    )  # [5750]
-                    if loaded_preview_color.isValid():  # [5751]
-                        self.dimension_preview_line_color = (
-                            loaded_preview_color  # [5752]
-                        )
-                        if (
-                            dimension_preview_color_explicitly_set_load is not None
-                        ):  # [5753]
-                            self.dimension_preview_color_explicitly_set = (
-                                dimension_preview_color_explicitly_set_load  # [5754]
-                            )
-                        else:  # [5755]
-                            default_preview_color = QColor(self.current_pen_color)
-                            default_preview_color.setAlpha(100)  # [5756]
-                            self.dimension_preview_color_explicitly_set = (
-                                self.dimension_preview_line_color
-                                != default_preview_color
-                            )  # [5757]
-                    else:  # [5758]
-                        self.dimension_preview_line_color = QColor(
-                            0, 255, 255, 100
-                        )  # [5759]
-                        self.dimension_preview_color_explicitly_set = False  # [5760]
-                        print(
-                            "Warning: Invalid dimension preview line color in scene file, using default."
-                        )  # [5761]
-                else:  # [5762]
-                    self.dimension_preview_line_color = QColor(
-                        0, 255, 255, 100
-                    )  # [5763]
-                    self.dimension_preview_color_explicitly_set = False  # [5764]
-                self.dimension_preview_color_changed.emit(
-                    self.dimension_preview_line_color
-                )  # [5765]
+                else:  # [5755]
+                    default_preview_color = QColor(self.current_pen_color)
+                    default_preview_color.setAlpha(100)  # [5756]
+                    self.dimension_preview_color_explicitly_set = (
+                        self.dimension_preview_line_color
+                        != default_preview_color
+                    )  # [5757]
+            else:  # [5758]
+                self.dimension_preview_line_color = QColor(
+                    0, 255, 255, 100
+                )  # [5759]
+                self.dimension_preview_color_explicitly_set = False  # [5760]
+                print(
+                    "Warning: Invalid dimension preview line color in scene file, using default."
+                )  # [5761]
+        else:  # [5762]
+            self.dimension_preview_line_color = QColor(
+                0, 255, 255, 100
+            )  # [5763]
+            self.dimension_preview_color_explicitly_set = False  # [5764]
+        self.dimension_preview_color_changed.emit(
+            self.dimension_preview_line_color
+        )  # [5765]
 
-                if angle_tool_settings_load:  # [5766]
-                    color_str = angle_tool_settings_load.get(
-                        "lineColor",
-                        self.current_angle_tool_line_color.name(
-                            QColor.NameFormat.HexArgb
-                        ),
-                    )  # [5767]
-                    loaded_color = QColor(color_str)  # [5768]
-                    self.current_angle_tool_line_color = (
-                        loaded_color if loaded_color.isValid() else QColor(255, 165, 0)
-                    )  # [5769]
-                    self.current_angle_tool_text_size = angle_tool_settings_load.get(
-                        "textSize", self.current_angle_tool_text_size
-                    )  # [5770]
-                    self.current_angle_tool_show_inner = angle_tool_settings_load.get(
-                        "showInner", self.current_angle_tool_show_inner
-                    )  # [5771]
-                    self.current_angle_tool_show_outer = angle_tool_settings_load.get(
-                        "showOuter", self.current_angle_tool_show_outer
-                    )  # [5772]
-                    self.angle_tool_config_changed.emit(
-                        angle_tool_settings_load
-                    )  # [5773]
-                    print("Loaded angle tool settings from scene file.")  # [5774]
-                else:  # [5775]
-                    self.current_angle_tool_line_color = QColor(255, 165, 0)  # [5776]
-                    self.current_angle_tool_text_size = 10  # [5777]
-                    self.current_angle_tool_show_inner = True  # [5778]
-                    self.current_angle_tool_show_outer = False  # [5779]
-                    self.angle_tool_config_changed.emit(
-                        {  # [5780]
-                            "color": self.current_angle_tool_line_color,  # [5781]
-                            "textSize": self.current_angle_tool_text_size,  # [5782]
-                            "showInner": self.current_angle_tool_show_inner,  # [5783]
-                            "showOuter": self.current_angle_tool_show_outer,  # [5784]
-                        }
-                    )  # [5785]
-                    print("No angle tool settings found, reset to defaults.")  # [5786]
-
-                if hatch_fill_settings_load:  # [5787]
-                    try:  # [5788]
-                        style_list = hatch_fill_settings_load.get("style", [])  # [5789]
-                        self.current_hatch_style = (
-                            style_list if isinstance(style_list, list) else []
-                        )  # [5790]
-                    except:
-                        self.current_hatch_style = []  # [5791]
-
-                    color_str = hatch_fill_settings_load.get(
-                        "color",
-                        self.current_hatch_color.name(QColor.NameFormat.HexArgb),
-                    )  # [5792]
-                    loaded_color = QColor(color_str)  # [5793]
-                    self.current_hatch_color = (
-                        loaded_color
-                        if loaded_color.isValid()
-                        else QColor(128, 128, 128)
-                    )  # [5794]
-                    self.current_hatch_thickness = hatch_fill_settings_load.get(
-                        "thickness", self.current_hatch_thickness
-                    )  # [5795]
-                    if self.control_panel:
-                        self.control_panel.update_hatch_fill_controls()  # [5796]
-                    print("Loaded hatch fill settings from scene file.")  # [5797]
-                else:  # [5798]
-                    self.current_hatch_style = []  # [5799]
-                    self.current_hatch_color = QColor(128, 128, 128)  # [5800]
-                    self.current_hatch_thickness = 1  # [5801]
-                    if self.control_panel:
-                        self.control_panel.update_hatch_fill_controls()  # [5802]
-                    print("No hatch fill settings found, reset to defaults.")  # [5803]
-
-                if division_point_settings_load:  # [5804]
-                    color_str = division_point_settings_load.get(
-                        "color",
-                        QColor(Qt.GlobalColor.yellow).name(QColor.NameFormat.HexArgb),
-                    )  # [5805]
-                    loaded_color = QColor(color_str)  # [5806]
-                    self.division_point_color = (
-                        loaded_color
-                        if loaded_color.isValid()
-                        else QColor(Qt.GlobalColor.yellow)
-                    )  # [5807]
-                    self.division_point_size = division_point_settings_load.get(
-                        "size", 5.0
-                    )  # [5808]
-                    print("Loaded division point settings from scene file.")  # [5809]
-                else:  # [5810]
-                    self.division_point_color = QColor(Qt.GlobalColor.yellow)  # [5811]
-                    self.division_point_size = 5.0  # [5812]
+        if angle_tool_settings_load:  # [5766]
+            color_str = angle_tool_settings_load.get(
+                "lineColor",
+                self.current_angle_tool_line_color.name(
+                    QColor.NameFormat.HexArgb
+                ),
+            )  # [5767]
+            loaded_color = QColor(color_str)  # [5768]
+            self.current_angle_tool_line_color = (
+                loaded_color if loaded_color.isValid() else QColor(255, 165, 0)
+            )  # [5769]
+            self.current_angle_tool_text_size = angle_tool_settings_load.get(
+                "textSize", self.current_angle_tool_text_size
+            )  # [5770]
+            self.current_angle_tool_show_inner = angle_tool_settings_load.get(
+                "showInner", self.current_angle_tool_show_inner
+            )  # [5771]
+            self.current_angle_tool_show_outer = angle_tool_settings_load.get(
+                "showOuter", self.current_angle_tool_show_outer
+            )  # [5772]
+            self.angle_tool_config_changed.emit(
+                angle_tool_settings_load
+            )  # [5773]
+            print("Loaded angle tool settings from scene file.")  # [5774]
+        else:  # [5775]
+            self.current_angle_tool_line_color = QColor(255, 165, 0)  # [5776]
+            self.current_angle_tool_text_size = 10  # [5777]
+            self.current_angle_tool_show_inner = True  # [5778]
+            self.current_angle_tool_show_outer = False  # [5779]
+            self.angle_tool_config_changed.emit(
+                {  # [5780]
+                    "color": self.current_angle_tool_line_color,  # [5781]
+                    "textSize": self.current_angle_tool_text_size,  # [5782]
+                    "showInner": self.current_angle_tool_show_inner,  # [5783]
+                    "showOuter": self.current_angle_tool_show_outer,  # [5784]
+                }
+            )  # [5785]
+            print("No angle tool settings found, reset to defaults.")  # [5786]
+
+        if hatch_fill_settings_load:  # [5787]
+            try:  # [5788]
+                style_list = hatch_fill_settings_load.get("style", [])  # [5789]
+                self.current_hatch_style = (
+                    style_list if isinstance(style_list, list) else []
+                )  # [5790]
+            except:
+                self.current_hatch_style = []  # [5791]
+
+            color_str = hatch_fill_settings_load.get(
+                "color",
+                self.current_hatch_color.name(QColor.NameFormat.HexArgb),
+            )  # [5792]
+            loaded_color = QColor(color_str)  # [5793]
+            self.current_hatch_color = (
+                loaded_color
+                if loaded_color.isValid()
+                else QColor(128, 128, 128)
+            )  # [5794]
+            self.current_hatch_thickness = hatch_fill_settings_load.get(
+                "thickness", self.current_hatch_thickness
+            )  # [5795]
+            if self.control_panel:
+                self.control_panel.update_hatch_fill_controls()  # [5796]
+            print("Loaded hatch fill settings from scene file.")  # [5797]
+        else:  # [5798]
+            self.current_hatch_style = []  # [5799]
+            self.current_hatch_color = QColor(128, 128, 128)  # [5800]
+            self.current_hatch_thickness = 1  # [5801]
+            if self.control_panel:
+                self.control_panel.update_hatch_fill_controls()  # [5802]
+            print("No hatch fill settings found, reset to defaults.")  # [5803]
+
+        if division_point_settings_load:  # [5804]
+            color_str = division_point_settings_load.get(
+                "color",
+                QColor(Qt.GlobalColor.yellow).name(QColor.NameFormat.HexArgb),
+            )  # [5805]
+            loaded_color = QColor(color_str)  # [5806]
+            self.division_point_color = (
+                loaded_color
+                if loaded_color.isValid()
+                else QColor(Qt.GlobalColor.yellow)
+            )  # [5807]
+            self.division_point_size = division_point_settings_load.get(
+                "size", 5.0
+            )  # [5808]
+            print("Loaded division point settings from scene file.")  # [5809]
+        else:  # [5810]
+            self.division_point_color = QColor(Qt.GlobalColor.yellow)  # [5811]
+            self.division_point_size = 5.0  # [5812]
+            print(
+                "No division point settings found, reset to defaults."
+            )  # [5813]
+        self.division_point_color_changed.emit(
+            self.division_point_color
+        )  # [5814]
+        self.division_point_size_changed.emit(
+            self.division_point_size
+        )  # [5815]
+
+    def _shapes_from_scene_data(
+        self, scene_data, filename, animation_tag=None, first_index=0
+    ):
+        """Builds Shape objects from shape dicts. Safe to call from a worker thread."""
+        loaded_shapes = []  # [5821]
+        for i, shape_data in enumerate(scene_data, first_index):  # [5822]
+            if isinstance(shape_data, dict):  # [5823]
+                shape = Shape.from_dict(shape_data)  # [5824]
+                if shape:  # [5825]
+                    if animation_tag:  # [5826]
+                        shape.animation_tag = animation_tag  # [5827]
+                    loaded_shapes.append(shape)  # [5828]
+                else:
                     print(
-                        "No division point settings found, reset to defaults."
-                    )  # [5813]
-                self.division_point_color_changed.emit(
-                    self.division_point_color
-                )  # [5814]
-                self.division_point_size_changed.emit(
-                    self.division_point_size
-                )  # [5815]
+                        f"Warning: Failed to load shape {i} from dict in {filename}: {shape_data}"
+                    )  # [5829]
+            else:
+                print(
+                    f"Warning: Invalid shape data format (not a dict) at index {i} in {filename}: {shape_data}"
+                )  # [5830]
 
-                self.background_pixmap = None  # [5816]
-            else:  # [5817]
+        return loaded_shapes
+
+    def _commit_loaded_shapes(self, loaded_shapes, join, already_loaded):
+        """
+        Appends a batch of loaded shapes to the scene and returns the running
+        total of shapes added by this load.
+        """
+        loaded_count = already_loaded
+        if loaded_shapes:  # [5831]
+            self.shapes.extend(loaded_shapes)  # [5833]
+            loaded_count = already_loaded + len(loaded_shapes)  # [5834]
+            if join and self.undo_stack:  # [5835]
+                if self.undo_stack[-1]["action"] == "load_join":  # [5836]
+                    self.undo_stack[-1]["action_data"]["load_join_count"] = (
+                        loaded_count  # [5837]
+                    )
+
+            if self.temp_mode:  # [5838]
                 print(
-                    f"Joining loaded scene from {filename} with current scene."
-                )  # [5818]
-                self.save_state("load_join", previous_geometries=0)  # [5819]
-                pass  # [5820]
-
-            loaded_shapes = []  # [5821]
-            for i, shape_data in enumerate(scene_data):  # [5822]
-                if isinstance(shape_data, dict):  # [5823]
-                    shape = Shape.from_dict(shape_data)  # [5824]
-                    if shape:  # [5825]
-                        if animation_tag:  # [5826]
-                            shape.animation_tag = animation_tag  # [5827]
-                        loaded_shapes.append(shape)  # [5828]
-                    else:
-                        print(
-                            f"Warning: Failed to load shape {i} from dict in {filename}: {shape_data}"
-                        )  # [5829]
+                    f"Scheduling removal for {len(loaded_shapes)} shapes loaded in TEMP mode."
+                )  # [5839]
+                for shape in loaded_shapes:  # [5840]
+                    self.schedule_shape_removal(shape)  # [5841]
+
+        return loaded_count
+
+    def _finish_scene_load(self, filename, loaded_count):
+        """Refreshes modes and angle offsets once all shapes of a load are in."""
+        self._configure_mode()  # [5842]
+
+        if self.show_angle_offset:  # [5843]
+            print("Load/Join finished, recalculating angle offsets.")  # [5844]
+            self.recalculate_and_update_angle_offsets()  # [5845]
+        else:
+            self.update()  # [5846]
+
+        print(
+            f"Finished loading {filename}. Added {loaded_count} shapes. Total shapes now: {len(self.shapes)}."
+        )  # [5847]
+        stats = self.scene_cache.stats()
+        print(
+            f"Scene cache: {stats['entries']} scenes, {stats['bytes'] / 1048576:.1f} of {stats['max_bytes'] / 1048576:.0f} MB, "
+            f"{stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions."
+        )
+
+    def _autosave_path(self):
+        directory = QStandardPaths.writableLocation(
+            QStandardPaths.StandardLocation.AppLocalDataLocation
+        )
+        return os.path.join(directory, AUTOSAVE_JOURNAL_NAME)
+
+    def offer_autosave_recovery(self):
+        """
+        Offers to restore the scene from a journal left behind by a session
+        that did not exit cleanly, then starts autosaving.
+        """
+        path = self._autosave_path()
+        if os.path.exists(path):
+            try:
+                shape_dicts = SceneJournal.read(path)
+            except OSError as e:
+                print(f"Could not read autosave journal {path}: {e}")
+                shape_dicts = []
+            if shape_dicts:
+                reply = QMessageBox.question(
+                    self,
+                    "Restore Autosave",
+                    f"The previous session did not close normally.\n\n"
+                    f"Restore its scene ({len(shape_dicts)} shapes) from the autosave?",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                    QMessageBox.StandardButton.Yes,
+                )
+                if reply == QMessageBox.StandardButton.Yes:
+                    self._restore_autosave(path, shape_dicts)
                 else:
-                    print(
-                        f"Warning: Invalid shape data format (not a dict) at index {i} in {filename}: {shape_data}"
-                    )  # [5830]
-
-            if loaded_shapes:  # [5831]
-                start_index = len(self.shapes)  # [5832]
-                self.shapes.extend(loaded_shapes)  # [5833]
-                loaded_count = len(loaded_shapes)  # [5834]
-                if join and self.undo_stack:  # [5835]
-                    if self.undo_stack[-1]["action"] == "load_join":  # [5836]
-                        self.undo_stack[-1]["action_data"]["load_join_count"] = (
-                            loaded_count  # [5837]
-                        )
+                    # Keep one copy around in case the answer was a misclick.
+                    try:
+                        os.replace(path, path + ".previous")
+                        print(f"Autosave journal kept as {path}.previous")
+                    except OSError as e:
+                        print(f"Could not keep autosave journal {path}: {e}")
+        self.start_autosave()
+
+    def _restore_autosave(self, path, shape_dicts):
+        loaded_shapes = self._shapes_from_scene_data(shape_dicts, path)
+        self._begin_scene_load(path, False)
+        loaded_count = self._commit_loaded_shapes(loaded_shapes, False, 0)
+        self._finish_scene_load(path, loaded_count)
+
+    def start_autosave(self):
+        """Starts the autosave journal if autosave is enabled."""
+        if not self.autosave_enabled or self._autosave_journal is not None:
+            return
+        self._autosave_ids.clear()
+        self._autosave_order = []
+        self._autosave_pending.clear()
+        self._autosave_touched.clear()
+        self._autosave_watching = False
+        self._autosave_dirty = True
+        self._autosave_journal = SceneJournal(self._autosave_path())
+        self._autosave_journal.start()
+        self._autosave_timer.start(self.autosave_interval_ms)
+        print(
+            f"Autosave journal started: {self._autosave_journal.path} "
+            f"(every {self.autosave_interval_ms} ms)"
+        )
 
-                if self.temp_mode:  # [5838]
-                    print(
-                        f"Scheduling removal for {loaded_count} shapes loaded in TEMP mode."
-                    )  # [5839]
-                    for shape in loaded_shapes:  # [5840]
-                        self.schedule_shape_removal(shape)  # [5841]
+    def stop_autosave(self, discard=True):
+        """
+        Flushes and stops the autosave journal. On a clean exit the journal is
+        discarded, so it only survives a crash.
+        """
+        if self._autosave_journal is None:
+            return
+        self._autosave_timer.stop()
+        self._autosave_tick(time_budget=None)
+        self._autosave_journal.stop(discard=discard)
+        self._autosave_journal = None
+
+    def _autosave_touch(self, shapes=None):
+        """
+        Marks the scene as changed for the next autosave tick. Called for
+        every undoable action, so it only records which shapes to look at.
+        """
+        self._autosave_dirty = True
+        if self._autosave_journal is None:
+            return
+        self._autosave_watching = True
+        for shape in self.selected_shapes:
+            self._autosave_touched[id(shape)] = shape
+        if shapes:
+            for shape in shapes:
+                if isinstance(shape, Shape):
+                    self._autosave_touched[id(shape)] = shape
+
+    def _autosave_tick(self, time_budget=AUTOSAVE_SLICE_SECONDS):
+        """
+        Diffs the scene against what the journal already holds and submits
+        the records. Structural changes are found by shape identity; touched
+        shapes get "modify" records, which the journal drops when nothing
+        changed. Since the undo state is saved before the change it records,
+        the selection counts as touched from a touch until the drag or resize
+        in progress has ended. Modified and new shapes are serialized for at
+        most time_budget seconds per tick and the rest on the next tick, so
+        an idle scene costs nothing however much is selected.
+        """
+        if self._autosave_journal is None:
+            return
+        start = time.perf_counter()
+        records = []
+        if self._autosave_dirty or len(self.shapes) != len(self._autosave_ids):
+            self._autosave_dirty = False
+            previous_ids = self._autosave_ids
+            current_ids = {}
+            for shape in self.shapes:
+                entry = previous_ids.get(id(shape))
+                if entry is None or entry[1] is not shape:
+                    entry = (self._autosave_next_id, shape)
+                    self._autosave_next_id += 1
+                    self._autosave_pending.append(entry)
+                current_ids[id(shape)] = entry
+            for key, (jid, shape) in previous_ids.items():
+                if current_ids.get(key, (None, None))[1] is not shape:
+                    records.append({"op": "remove", "id": jid})
+            self._autosave_ids = current_ids
+            live_ids = {jid for jid, _ in current_ids.values()}
+            self._autosave_order = [
+                jid for jid in self._autosave_order if jid in live_ids
+            ]
 
-            self._configure_mode()  # [5842]
+        if self._autosave_watching:
+            for shape in self.selected_shapes:
+                self._autosave_touched[id(shape)] = shape
+            self._autosave_watching = (
+                self.dragging
+                or self.resizing
+                or self.active_angle_shape_for_point_drag is not None
+            )
+        pending_ids = {jid for jid, _ in self._autosave_pending}
+        touched = self._autosave_touched
+        while touched:
+            key, shape = touched.popitem()
+            entry = self._autosave_ids.get(key)
+            if not entry or entry[1] is not shape or entry[0] in pending_ids:
+                continue
+            records.append(
+                {"op": "modify", "id": entry[0], "shape": shape.to_dict()}
+            )
+            if (
+                time_budget is not None
+                and time.perf_counter() - start > time_budget
+            ):
+                break
 
-            if self.show_angle_offset:  # [5843]
-                print("Load/Join finished, recalculating angle offsets.")  # [5844]
-                self.recalculate_and_update_angle_offsets()  # [5845]
-            else:
-                self.update()  # [5846]
+        while self._autosave_pending:
+            jid, shape = self._autosave_pending.popleft()
+            if self._autosave_ids.get(id(shape), (None, None))[1] is shape:
+                records.append({"op": "add", "id": jid, "shape": shape.to_dict()})
+                self._autosave_order.append(jid)
+            if (
+                time_budget is not None
+                and time.perf_counter() - start > time_budget
+            ):
+                break
 
-            print(
-                f"Finished loading {filename}. Added {loaded_count} shapes. Total shapes now: {len(self.shapes)}."
-            )  # [5847]
-            return loaded_count  # [5848]
+        if self._autosave_pending or touched:
+            # Come back as soon as the event loop is idle for the rest.
+            self._autosave_timer.start(0)
+        else:
+            current_order = [jid for jid, _ in self._autosave_ids.values()]
+            if current_order != self._autosave_order:
+                records.append({"op": "order", "ids": current_order})
+                self._autosave_order = current_order
+            if (
+                self._autosave_timer.isActive()
+                and self._autosave_timer.interval() != self.autosave_interval_ms
+            ):
+                self._autosave_timer.start(self.autosave_interval_ms)
+        self._autosave_journal.submit(records)
+
+    def assign_scene_slot(self, index, path, save=True):
+        """Puts a scene file into a slot (None empties it) and preloads it."""
+        path = os.path.abspath(path) if path else None
+        old_path = self.scene_slots.path(index)
+        if old_path and old_path not in (
+            self.scene_slots.path(i) for i in range(SCENE_SLOT_COUNT) if i != index
+        ):
+            self._scene_slot_watcher.removePath(old_path)
+        self.scene_slots.assign(index, path)
+        if path:
+            if path not in self._scene_slot_watcher.files():
+                self._scene_slot_watcher.addPath(path)
+            self._scene_slot_timer.start()
+            print(f"Scene slot {index + 1}: preloading {path}")
+        if save:
+            self.save_scene_slot_settings()
+        self.scene_slot_changed.emit(index)
+
+    def switch_to_scene_slot(self, index):
+        """
+        Replaces the scene with a preloaded slot by swapping the shape list.
+        The previous list goes to the undo stack as is, so the switch is a
+        single "load" undo entry and costs no copying.
+        """
+        path = self.scene_slots.path(index)
+        if not path:
+            print(f"Scene slot {index + 1} is empty.")
+            return False
+        self.cancel_scene_load()
+        self._poll_scene_slots()
+        taken = self.scene_slots.take(index)
+        if taken is None:
+            if self.scene_slots.status(index) == "error":
+                print(f"Scene slot {index + 1}: {path} could not be read.")
+                return False
+            # Not preloaded yet; fall back to a regular background load.
+            print(f"Scene slot {index + 1} is still loading; loading {path} directly.")
+            return self.load_scene_async(path, join=False)
+        shapes, scene_settings = taken
+        self._scene_slot_timer.start()
 
-        except json.JSONDecodeError as e:  # [5849]
-            print(f"Error decoding JSON from {filename}: {e}")  # [5850]
-            QMessageBox.warning(
-                self, "Load Error", f"Could not decode JSON file:\n{filename}\n\n{e}"
-            )  # [5851]
-            return 0  # [5852]
-        except Exception as e:  # [5853]
-            print(f"Error loading scene from {filename}: {e}")
-            traceback.print_exc()  # [5854]
-            QMessageBox.warning(
-                self,
-                "Load Error",
-                f"An unexpected error occurred loading the scene from:\n{filename}\n\n{e}",
-            )  # [5855]
-            return 0  # [5856]
+        print(f"Switching to scene slot {index + 1}: {path}")
+        self.save_state(
+            "load",
+            all_shapes_before=self.shapes,
+            selected_shapes_before=list(self.selected_shapes),
+            copy_shapes=False,
+        )
+        self.shapes = shapes
+        self.selected_shapes = []
+        self._reset_scene_input_state()
+        self._apply_scene_settings(scene_settings)
+        if self.temp_mode:
+            for shape in shapes:
+                self.schedule_shape_removal(shape)
+        self._finish_scene_load(path, len(shapes))
+        return True
+
+    def _poll_scene_slots(self):
+        for index in self.scene_slots.poll():
+            self.scene_slot_changed.emit(index)
+        if not self.scene_slots.busy():
+            self._scene_slot_timer.stop()
+
+    def _on_scene_slot_file_changed(self, path):
+        # Editors often save several times in a row or replace the file, so
+        # reload once things have settled.
+        self._scene_slot_changed_paths.add(path)
+        self._scene_slot_reload_timer.start()
+
+    def _reload_changed_scene_slots(self):
+        changed_paths = self._scene_slot_changed_paths
+        self._scene_slot_changed_paths = set()
+        for path in changed_paths:
+            # A file replaced on save drops out of the watcher; watch it again.
+            if os.path.exists(path) and path not in self._scene_slot_watcher.files():
+                self._scene_slot_watcher.addPath(path)
+            for index in range(SCENE_SLOT_COUNT):
+                if self.scene_slots.path(index) == path:
+                    print(f"Scene slot {index + 1}: {path} changed, reloading.")
+                    self.scene_slots.reload(index)
+                    self.scene_slot_changed.emit(index)
+        self._scene_slot_timer.start()
+
+    def load_scene_async(
+        self, filename, join=False, animation_tag=None, on_finished=None
+    ):
+        """
+        Loads a scene like load_scene, but reads and converts the file on a
+        worker thread and adds the shapes in time-sliced batches on the GUI
+        thread, with a cancellable progress dialog. The undo states are the same
+        as for load_scene. on_finished(loaded_count, cancelled) is called once
+        the load has ended. Returns False if another load is still running;
+        on_finished is then called at once with (0, True).
+        """
+        if self._scene_load_job is not None:
+            print(f"A scene is still loading, ignoring request to load {filename}.")
+            if on_finished:
+                on_finished(0, True)
+            return False
+
+        job = {
+            "filename": filename,
+            "join": join,
+            "queue": queue.Queue(),
+            "cancel": threading.Event(),
+            "begun": False,
+            "undo_depth": 0,
+            "loaded": 0,
+            "on_finished": on_finished,
+            "progress": None,
+            "last_repaint": 0.0,
+        }
+
+        progress = QProgressDialog(
+            f"Loading {os.path.basename(filename)}...",
+            "Cancel",
+            0,
+            1000,
+            self.control_panel,
+        )
+        progress.setWindowTitle("Load Scene")
+        progress.setMinimumDuration(400)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.canceled.connect(self.cancel_scene_load)
+        job["progress"] = progress
+
+        self._scene_load_job = job
+        worker = threading.Thread(
+            target=self._scene_load_worker,
+            args=(job, animation_tag),
+            name="SceneLoader",
+            daemon=True,
+        )
+        worker.start()
+        self._scene_load_timer.start()
+        return True
+
+    def _scene_load_worker(self, job, animation_tag):
+        """Worker thread: streams the file and converts shape dicts in batches."""
+        job_queue = job["queue"]
+        filename = job["filename"]
+        begun = False
+        try:
+            reader = self.scene_cache.open(filename)
+            batch = []
+            first_index = 0
+            shape_dicts = reader.iter_shape_dicts()
+            end_of_shapes = object()
+            while True:
+                shape_data = next(shape_dicts, end_of_shapes)
+                if shape_data is not end_of_shapes:
+                    batch.append(shape_data)
+                    if len(batch) < SCENE_LOAD_BATCH_SIZE:
+                        continue
+                if job["cancel"].is_set():
+                    return
+                if reader.format_error:
+                    job_queue.put(("invalid", reader.format_error))
+                    return
+                if not begun:
+                    job_queue.put(("begin", None))
+                    begun = True
+                if batch:
+                    shapes = self._shapes_from_scene_data(
+                        batch, filename, animation_tag, first_index=first_index
+                    )
+                    progress = reader.bytes_read / max(1, reader.file_size)
+                    job_queue.put(("shapes", (shapes, progress)))
+                    first_index += len(batch)
+                    batch = []
+                if shape_data is end_of_shapes:
+                    break
+            job_queue.put(("done", reader.settings))
+        except Exception as e:
+            job_queue.put(("error", e))
+
+    def _process_scene_load_queue(self):
+        """Commits converted shapes on the GUI thread within a fixed time slice."""
+        job = self._scene_load_job
+        if job is None:
+            self._scene_load_timer.stop()
+            return
+
+        deadline = time.perf_counter() + SCENE_LOAD_SLICE_SECONDS
+        shapes_added = False
+        while time.perf_counter() < deadline:
+            try:
+                kind, payload = job["queue"].get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "begin":
+                self._begin_scene_load(job["filename"], job["join"])
+                job["begun"] = True
+                job["undo_depth"] = len(self.undo_stack)
+            elif kind == "shapes":
+                shapes, progress = payload
+                job["loaded"] = self._commit_loaded_shapes(
+                    shapes, job["join"], job["loaded"]
+                )
+                job["progress"].setValue(int(progress * 1000))
+                shapes_added = True
+            elif kind == "done":
+                if not job["join"]:
+                    self._apply_scene_settings(payload)
+                self._end_scene_load(cancelled=False)
+                return
+            elif kind == "invalid":
+                print(f"Error: {payload}. Aborting load for file {job['filename']}.")
+                self._end_scene_load(cancelled=False, failed=True)
+                return
+            elif kind == "error":
+                self._end_scene_load(cancelled=False, failed=True)
+                self._report_scene_load_error(job["filename"], payload)
+                return
+
+        if shapes_added:
+            # Repainting the growing scene after every slice would cost more
+            # than the load itself, so the overlay is refreshed a few times a second.
+            now = time.perf_counter()
+            if now - job["last_repaint"] >= SCENE_LOAD_REPAINT_SECONDS:
+                job["last_repaint"] = now
+                self.update()
+
+    def cancel_scene_load(self):
+        """Stops a running background load, keeping the shapes added so far."""
+        job = self._scene_load_job
+        if job is None:
+            return
+        print(f"Loading {job['filename']} cancelled after {job['loaded']} shapes.")
+        self._end_scene_load(cancelled=True)
+
+    def _end_scene_load(self, cancelled, failed=False):
+        """
+        Tears down the running background load and finishes the scene update.
+        A load that failed part-way through the file is rolled back.
+        """
+        job = self._scene_load_job
+        self._scene_load_job = None
+        self._scene_load_timer.stop()
+        job["cancel"].set()
+        progress = job["progress"]
+        progress.canceled.disconnect(self.cancel_scene_load)
+        progress.close()
+        progress.deleteLater()
+
+        if failed and job["begun"]:
+            if len(self.undo_stack) == job["undo_depth"]:
+                state = self.undo_stack.pop()
+                self.shapes = state["all_shapes_before"]
+                self.selected_shapes = state["selected_shapes_before"]
+                print(f"Rolled back {job['loaded']} shapes from {job['filename']}.")
+            job["loaded"] = 0
+            self.update()
+        elif job["begun"]:
+            self._finish_scene_load(job["filename"], job["loaded"])
+        if job["on_finished"]:
+            job["on_finished"](job["loaded"], cancelled)
 
     def clear_scene(self, save_undo=True, keep_background_image=False):  # [5857]
         """Clears all shapes from the scene."""  # [5858]
+        self.cancel_scene_load()
         print("Clearing scene...")  # [5859]
-        if self.shapes or (
-            self.background_pixmap and not keep_background_image
+        if (
+            self.shapes
+            or self.animation_frames
+            or (self.background_pixmap and not keep_background_image)
         ):  # [5860]
             if save_undo:  # [5861]
                 bg_pixmap_copy = (
@@ -14005,6 +16960,7 @@ class DesktopOverlayRgn(QWidget):  # [697]
                 )  # [5867]
 
             self.shapes.clear()
+            self.animation_frames.clear()
             self.current_drawing_shape = None
             self.selected_shapes.clear()  # [5868]
             self.polygon_points.clear()
@@ -14368,6 +17324,87 @@ class DesktopOverlayRgn(QWidget):  # [697]
             label_height,  # [6107]
         )  # [6108]
 
+    @property
+    def selected_shapes(self):
+        """The current selection (a ShapeSelection, usable as a list)."""
+        return self._selection
+
+    @selected_shapes.setter
+    def selected_shapes(self, shapes):
+        self._selection.replace(shapes)
+
+    def _get_shape_repaint_rect(self, shape):
+        """
+        Returns a QRect covering everything painted for a shape, including its
+        selection handles, or None if the shape has no usable geometry.
+        """
+        if not shape or not shape.geometry:
+            return None
+        geo = shape.geometry
+        pivot = QPointF()
+        if isinstance(geo, QRectF):
+            if not geo.isValid():
+                return None
+            bounds = geo.normalized()
+            pivot = (
+                self._get_arc_visual_center(shape)
+                if shape.type == "arc"
+                else bounds.center()
+            )
+        elif isinstance(geo, QPointF):
+            half_size = (shape.mpoint_size or 10) / 2.0
+            bounds = QRectF(
+                geo.x() - half_size, geo.y() - half_size, half_size * 2, half_size * 2
+            )
+            pivot = geo
+        elif isinstance(geo, list):
+            valid_points = [p for p in geo if isinstance(p, QPointF)]
+            if not valid_points:
+                return None
+            bounds = QPolygonF(valid_points).boundingRect()
+            if shape.type == "angle_marker" and len(valid_points) == 3:
+                pivot = valid_points[1]
+            elif shape.type in ["line", "arrow", "angle_marker"]:
+                pivot = valid_points[0]
+            else:
+                pivot = bounds.center()
+        else:
+            return None
+
+        if shape.rotation != 0:
+            transform = (
+                QTransform()
+                .translate(pivot.x(), pivot.y())
+                .rotate(shape.rotation)
+                .translate(-pivot.x(), -pivot.y())
+            )
+            bounds = transform.mapRect(bounds)
+
+        pad = max(shape.line_thickness, 1) / 2.0 + self.handle_size + 4
+        if shape.arrow_head_size:
+            pad += shape.arrow_head_size + 5
+        if shape.type == "text" and shape.text_properties:
+            pad += shape.text_properties.get("size", 12) * 2
+        if shape.is_dimension_part:
+            pad += 5
+        return bounds.adjusted(-pad, -pad, pad, pad).toAlignedRect()
+
+    def _on_selection_changed(self, removed, added):
+        """Schedules a repaint limited to the shapes whose selection changed."""
+        if not self.isVisible():
+            return
+        changed = list(removed) + list(added)
+        if len(changed) > 256:
+            self.update()
+            return
+        dirty = QRect()
+        for shape in changed:
+            rect = self._get_shape_repaint_rect(shape)
+            if rect is not None:
+                dirty = dirty.united(rect)
+        if not dirty.isEmpty():
+            self.update(dirty)
+
     def select_shapes_in_lasso(self, invert_selection=False):  # [6109]
         """# [6110]
         Selects shapes whose centers are inside (or outside, if invert_selection=True) # [6111]
@@ -14379,35 +17416,47 @@ class DesktopOverlayRgn(QWidget):  # [697]
             self.polygon_points = []  # [6117]
             return  # [6118]
 
-        lasso_polygon = QPolygonF(self.polygon_points)  # [6119]
-        newly_selected = []  # [6120]
         selected_before_lasso = deepcopy(self.selected_shapes)  # [6121]
 
+        # Collect the centres of all visible shapes once, and index the
+        # visible members of every group so expansion is a dict lookup.
+        candidates = []
+        xs = []
+        ys = []
+        group_members = {}
         for shape in self.shapes:  # [6122]
             if not shape.visible:
                 continue  # [6123]
-
+            if shape.group_id:
+                group_members.setdefault(shape.group_id, []).append(shape)
             center = self._get_shape_center(shape)  # [6124]
             if not center.isNull():  # [6125]
-                is_inside = lasso_polygon.containsPoint(
-                    center, Qt.FillRule.OddEvenFill
-                )  # [6126]
-                should_select = (
-                    is_inside if not invert_selection else not is_inside
-                )  # [6127]
-
-                if should_select:  # [6128]
-                    if shape.group_id:  # [6129]
-                        group_members = [
-                            s
-                            for s in self.shapes
-                            if s.group_id == shape.group_id and s.visible
-                        ]  # [6130]
-                        for member in group_members:  # [6131]
-                            if member not in newly_selected:  # [6132]
-                                newly_selected.append(member)  # [6133]
-                    elif shape not in newly_selected:  # [6134]
-                        newly_selected.append(shape)  # [6135]
+                candidates.append(shape)
+                xs.append(center.x())
+                ys.append(center.y())
+
+        inside_mask = self._points_in_lasso_mask(xs, ys, self.polygon_points)
+
+        newly_selected = []  # [6120]
+        added_ids = set()
+        expanded_groups = set()
+        for shape, is_inside in zip(candidates, inside_mask):
+            should_select = (
+                is_inside if not invert_selection else not is_inside
+            )  # [6127]
+            if not should_select:
+                continue
+            if shape.group_id:  # [6129]
+                if shape.group_id in expanded_groups:
+                    continue
+                expanded_groups.add(shape.group_id)
+                members = group_members.get(shape.group_id, [])  # [6130]
+            else:
+                members = [shape]
+            for member in members:  # [6131]
+                if id(member) not in added_ids:  # [6132]
+                    added_ids.add(id(member))
+                    newly_selected.append(member)  # [6133]
 
         if set(newly_selected) != set(self.selected_shapes):  # [6136]
             self.save_state(
@@ -14431,6 +17480,58 @@ class DesktopOverlayRgn(QWidget):  # [697]
         self.is_lasso_selecting = False  # [6146]
         self.polygon_points = []  # [6147]
 
+    def _points_in_lasso_mask(self, xs, ys, polygon_points):
+        """
+        Returns a list of booleans telling which of the points (xs[i], ys[i])
+        lie inside the lasso polygon (even-odd rule). Points outside the
+        polygon's bounding box are rejected up front; the remaining ones are
+        tested against all edges at once with numpy when it is available.
+        """
+        count = len(xs)
+        if count == 0 or len(polygon_points) < 3:
+            return [False] * count
+
+        poly_xs = [p.x() for p in polygon_points]
+        poly_ys = [p.y() for p in polygon_points]
+        min_x, max_x = min(poly_xs), max(poly_xs)
+        min_y, max_y = min(poly_ys), max(poly_ys)
+
+        np = _numpy.load()
+        if np is not None:
+            px = np.asarray(xs, dtype=float)
+            py = np.asarray(ys, dtype=float)
+            mask = (px >= min_x) & (px <= max_x) & (py >= min_y) & (py <= max_y)
+            idx = np.nonzero(mask)[0]
+            if idx.size == 0:
+                return mask.tolist()
+            cx = px[idx]
+            cy = py[idx]
+            inside = np.zeros(idx.size, dtype=bool)
+            vx = np.asarray(poly_xs, dtype=float)
+            vy = np.asarray(poly_ys, dtype=float)
+            vx_prev = np.roll(vx, 1)
+            vy_prev = np.roll(vy, 1)
+            for xi, yi, xj, yj in zip(vx, vy, vx_prev, vy_prev):
+                if yi == yj:
+                    continue
+                crosses = (yi > cy) != (yj > cy)
+                x_at_y = (xj - xi) * (cy - yi) / (yj - yi) + xi
+                inside ^= crosses & (cx < x_at_y)
+            mask[idx] = inside
+            return mask.tolist()
+
+        lasso_polygon = QPolygonF(polygon_points)  # [6119]
+        result = [False] * count
+        for i in range(count):
+            x = xs[i]
+            y = ys[i]
+            if x < min_x or x > max_x or y < min_y or y > max_y:
+                continue
+            result[i] = lasso_polygon.containsPoint(
+                QPointF(x, y), Qt.FillRule.OddEvenFill
+            )  # [6126]
+        return result
+
     def _get_shape_center(self, shape):  # [6148]
         """Helper method to get the visual center of a shape for lasso testing."""  # [6149]
         if not shape or not shape.geometry:  # [6150]
@@ -14506,8 +17607,7 @@ class DesktopOverlayRgn(QWidget):  # [697]
             self.selected_shapes = new_selection  # [6191]
             if self.show_angle_offset:  # [6192]
                 self.recalculate_and_update_angle_offsets()  # [6193]
-            else:  # [6194]
-                self.update()  # [6195]
+            # Otherwise the selection model already scheduled the repaint.
         else:  # [6196]
             print("All visible shapes already selected.")  # [6197]
 
@@ -15213,6 +18313,15 @@ class DesktopOverlayRgn(QWidget):  # [697]
             self.update()  # [6515]
             self.selected_shapes = shapes_to_ungroup  # [6516]
 
+    @staticmethod
+    def _nearest_sorted_coord(sorted_coords, value):
+        """Returns the coordinate nearest to value from a sorted list (None if empty)."""
+        if not sorted_coords:
+            return None
+        index = bisect.bisect_left(sorted_coords, value)
+        candidates = sorted_coords[max(0, index - 1) : index + 1]
+        return min(candidates, key=lambda coord: (abs(value - coord), coord))
+
     def _get_snapped_point(
         self, original_point: QPointF
     ) -> Optional[QPointF]:  # [6517]
@@ -15235,31 +18344,31 @@ class DesktopOverlayRgn(QWidget):  # [697]
             and lines_app_instance
             and lines_app_instance.linijki_widoczne
         ):  # [6531]
-            active_guide_lines = lines_app_instance.get_active_guide_lines()  # [6532]
+            guide_h_lines, guide_v_lines = (
+                lines_app_instance.get_sorted_guide_lines()
+            )  # [6532]
 
             # Check horizontal lines # [6533]
-            best_h_snap_dist = snap_threshold + 1  # [6534]
             snapped_to_h_line = None  # [6535]
-            for line_type, line_pos in active_guide_lines:  # [6536]
-                if line_type == "h":  # [6537]
-                    dist_y = abs(original_point.y() - line_pos)  # [6538]
-                    if dist_y <= snap_threshold and dist_y < best_h_snap_dist:  # [6539]
-                        best_h_snap_dist = dist_y  # [6540]
-                        snapped_y = float(line_pos)  # [6541]
-                        snapped_to_h_line = ("h", snapped_y)  # [6542]
-                        point_was_snapped = True  # [6543]
+            line_pos = self._nearest_sorted_coord(guide_h_lines, original_point.y())
+            if (
+                line_pos is not None
+                and abs(original_point.y() - line_pos) <= snap_threshold
+            ):
+                snapped_y = float(line_pos)  # [6541]
+                snapped_to_h_line = ("h", snapped_y)  # [6542]
+                point_was_snapped = True  # [6543]
 
             # Check vertical lines # [6544]
-            best_v_snap_dist = snap_threshold + 1  # [6545]
             snapped_to_v_line = None  # [6546]
-            for line_type, line_pos in active_guide_lines:  # [6547]
-                if line_type == "v":  # [6548]
-                    dist_x = abs(original_point.x() - line_pos)  # [6549]
-                    if dist_x <= snap_threshold and dist_x < best_v_snap_dist:  # [6550]
-                        best_v_snap_dist = dist_x  # [6551]
-                        snapped_x = float(line_pos)  # [6552]
-                        snapped_to_v_line = ("v", snapped_x)  # [6553]
-                        point_was_snapped = True  # [6554]
+            line_pos = self._nearest_sorted_coord(guide_v_lines, original_point.x())
+            if (
+                line_pos is not None
+                and abs(original_point.x() - line_pos) <= snap_threshold
+            ):
+                snapped_x = float(line_pos)  # [6552]
+                snapped_to_v_line = ("v", snapped_x)  # [6553]
+                point_was_snapped = True  # [6554]
 
             # Prefer intersection snap if both directions are snapped # [6555]
             if snapped_to_h_line and snapped_to_v_line:  # [6556]
@@ -15283,33 +18392,29 @@ class DesktopOverlayRgn(QWidget):  # [697]
             if not (
                 self.snap_mode == "all" and point_was_snapped
             ):  # If "all" and already snapped to a guide line, don't snap to grid # [6567]
-                grid_h_lines, grid_v_lines = (
-                    grid_overlay_instance.get_visible_grid_lines()
+                nearest_grid_y, nearest_grid_x = (
+                    grid_overlay_instance.get_nearest_grid_lines(
+                        original_point.x(), original_point.y()
+                    )
                 )  # [6568]
 
-                best_h_grid_snap_dist = snap_threshold + 1  # [6569]
                 snapped_to_h_grid_line_coord = None  # [6570]
-                for line_y in grid_h_lines:  # [6571]
-                    dist_y = abs(original_point.y() - line_y)  # [6572]
-                    if (
-                        dist_y <= snap_threshold and dist_y < best_h_grid_snap_dist
-                    ):  # [6573]
-                        best_h_grid_snap_dist = dist_y  # [6574]
-                        snapped_y = float(line_y)  # [6575]
-                        snapped_to_h_grid_line_coord = snapped_y  # [6576]
-                        point_was_snapped = True  # [6577]
-
-                best_v_grid_snap_dist = snap_threshold + 1  # [6578]
+                if (
+                    nearest_grid_y is not None
+                    and abs(original_point.y() - nearest_grid_y) <= snap_threshold
+                ):  # [6573]
+                    snapped_y = float(nearest_grid_y)  # [6575]
+                    snapped_to_h_grid_line_coord = snapped_y  # [6576]
+                    point_was_snapped = True  # [6577]
+
                 snapped_to_v_grid_line_coord = None  # [6579]
-                for line_x in grid_v_lines:  # [6580]
-                    dist_x = abs(original_point.x() - line_x)  # [6581]
-                    if (
-                        dist_x <= snap_threshold and dist_x < best_v_grid_snap_dist
-                    ):  # [6582]
-                        best_v_grid_snap_dist = dist_x  # [6583]
-                        snapped_x = float(line_x)  # [6584]
-                        snapped_to_v_grid_line_coord = snapped_x  # [6585]
-                        point_was_snapped = True  # [6586]
+                if (
+                    nearest_grid_x is not None
+                    and abs(original_point.x() - nearest_grid_x) <= snap_threshold
+                ):  # [6582]
+                    snapped_x = float(nearest_grid_x)  # [6584]
+                    snapped_to_v_grid_line_coord = snapped_x  # [6585]
+                    point_was_snapped = True  # [6586]
 
                 # If snapped to grid, update feedback # [6587]
                 if (
@@ -15526,14 +18631,18 @@ class DesktopOverlayRgn(QWidget):  # [697]
 
     def _get_division_points_for_shape(self, shape: Shape) -> List[QPointF]:
         """Returns a list of division points for the given shape, without drawing them."""
-        division_points = []
         if (
             not self.divide_enabled
             or self.number_of_divisions < 2
             or not shape.visible
             or not shape.geometry
         ):
-            return division_points
+            return []
+
+        # Shares the cached points used by _draw_division_points.
+        entry = self._get_division_cache_entry(shape)
+        if entry["snap_points"] is not None:
+            return entry["snap_points"]
 
         geo = shape.geometry
         center_transform = QPointF()
@@ -15555,130 +18664,23 @@ class DesktopOverlayRgn(QWidget):  # [697]
                         sum(p.y() for p in valid_points_for_center)
                         / len(valid_points_for_center),
                     )
-        transform = QTransform()
-        if shape.rotation != 0 and not center_transform.isNull():
-            transform.translate(center_transform.x(), center_transform.y())
-            transform.rotate(shape.rotation)
-            transform.translate(-center_transform.x(), -center_transform.y())
 
-        # Generate division points (logic similar to _draw_division_points, but without drawing)
-        if (
-            shape.type in ["line", "arrow", "line_point"]
-            and isinstance(geo, list)
-            and len(geo) >= 2
-        ):  # [6614]
-            for i in range(len(geo) - 1):
-                p_start, p_end = geo[i], geo[i + 1]
-                if isinstance(p_start, QPointF) and isinstance(p_end, QPointF):
-                    segment_vector = p_end - p_start
-                    segment_length = math.sqrt(
-                        QPointF.dotProduct(segment_vector, segment_vector)
-                    )
-                    if segment_length < 1e-6:
-                        continue
-                    step_vector = segment_vector / self.number_of_divisions
-                    for j in range(
-                        1, self.number_of_divisions
-                    ):  # Skip start and end of segment
-                        division_points.append(p_start + step_vector * j)  # [6615]
-        # ... (implementation for other shape types, analogous to _draw_division_points) ...
-        elif shape.type == "rect" and isinstance(geo, QRectF) and geo.isValid():
-            corners = [
-                geo.topLeft(),
-                geo.topRight(),
-                geo.bottomRight(),
-                geo.bottomLeft(),
-            ]
-            for i in range(4):
-                p_start, p_end = corners[i], corners[(i + 1) % 4]
-                segment_vector = p_end - p_start
-                segment_length = math.sqrt(
-                    QPointF.dotProduct(segment_vector, segment_vector)
-                )
-                if segment_length < 1e-6:
-                    continue
-                step_vector = segment_vector / self.number_of_divisions  # [6616]
-                for j in range(1, self.number_of_divisions):
-                    division_points.append(p_start + step_vector * j)
-        elif (
-            shape.type in ["triangle", "polygon", "trapeze", "regular_polygon"]
-            and isinstance(geo, list)
-            and len(geo) >= 3
-        ):
-            num_vertices = len(geo)
-            for i in range(num_vertices):
-                p_start, p_end = geo[i], geo[(i + 1) % num_vertices]
-                if isinstance(p_start, QPointF) and isinstance(p_end, QPointF):
-                    segment_vector = p_end - p_start
-                    segment_length = math.sqrt(
-                        QPointF.dotProduct(segment_vector, segment_vector)
-                    )  # [6617]
-                    if segment_length < 1e-6:
-                        continue
-                    step_vector = segment_vector / self.number_of_divisions
-                    for j in range(1, self.number_of_divisions):
-                        division_points.append(p_start + step_vector * j)
-        elif (
-            shape.type == "ellipse" and isinstance(geo, QRectF) and geo.isValid()
-        ):  # Approximation for ellipse, e.g., on bounding box
-            corners = [
-                geo.topLeft(),
-                geo.topRight(),
-                geo.bottomRight(),
-                geo.bottomLeft(),
-            ]
-            for i in range(4):
-                p_start, p_end = corners[i], corners[(i + 1) % 4]
-                segment_vector = p_end - p_start  # [6618]
-                segment_length = math.sqrt(
-                    QPointF.dotProduct(segment_vector, segment_vector)
-                )
-                if segment_length < 1e-6:
-                    continue
-                step_vector = segment_vector / self.number_of_divisions
-                for j in range(1, self.number_of_divisions):
-                    division_points.append(p_start + step_vector * j)
-        elif shape.type == "arc" and isinstance(geo, QRectF) and geo.isValid():
-            center_arc, rx, ry = geo.center(), geo.width() / 2.0, geo.height() / 2.0
-            if rx < 1e-6 or ry < 1e-6:
-                return []
-            start_angle_rad, span_angle_rad = (
-                math.radians(shape.startAngle),
-                math.radians(shape.spanAngle),
-            )  # [6619]
-            for i in range(1, self.number_of_divisions):
-                current_angle_rad = start_angle_rad + (
-                    span_angle_rad * i / self.number_of_divisions
-                )
-                division_points.append(
-                    QPointF(
-                        center_arc.x() + rx * math.cos(current_angle_rad),
-                        center_arc.y() - ry * math.sin(current_angle_rad),
-                    )
-                )
-        elif (
-            shape.type == "spline"
-            and isinstance(geo, list)
-            and len(geo) >= 4
-            and (len(geo) - 1) % 3 == 0
-        ):
-            for i in range(1, len(geo) - 1, 3):
-                if i + 2 < len(geo):
-                    p_start_segment = geo[i - 1] if i > 0 else geo[0]
-                    c1, c2, p_end_segment = geo[i], geo[i + 1], geo[i + 2]
-                    temp_path_segment = QPainterPath(p_start_segment)  # [6620]
-                    temp_path_segment.cubicTo(c1, c2, p_end_segment)
-                    for j in range(1, self.number_of_divisions):
-                        division_points.append(
-                            temp_path_segment.pointAtPercent(
-                                float(j) / self.number_of_divisions
-                            )
-                        )
+        # Skip the start and end of every segment
+        division_points = [
+            point
+            for segment_points in entry["segments"]
+            for point in segment_points[1:-1]
+        ]
 
         # Apply rotation transform (if any)
         if shape.rotation != 0 and not center_transform.isNull():
+            transform = QTransform()
+            transform.translate(center_transform.x(), center_transform.y())
+            transform.rotate(shape.rotation)
+            transform.translate(-center_transform.x(), -center_transform.y())
             division_points = [transform.map(p) for p in division_points]
 
+        entry["snap_points"] = division_points
         return division_points  # [6621]
 
 
@@ -16050,7 +19052,7 @@ class AnimationConfigDialog(QDialog):
 
     def __init__(self, scene_files, parent=None):  # [6643]
         super().__init__(parent)
-        self.settings = QSettings("MyCompany", "DesktopOverlayRGN")
+        self.settings = Settings("MyCompany", "DesktopOverlayRGN")
         self.setWindowTitle("Animation Configuration")
         self.setMinimumWidth(650)
         self.scene_files = scene_files
@@ -16116,6 +19118,38 @@ class AnimationConfigDialog(QDialog):
         grid_layout.addWidget(self.mode_combo, row, 1)
         row += 1
 
+        prerender_layout = QHBoxLayout()
+        self.prerender_check = QCheckBox("Pre-render Frames")
+        self.prerender_check.setToolTip(
+            "Render every scene to an image before playback and show the images,\n"
+            "so display timing does not depend on scene complexity."
+        )
+        self.prerender_check.setChecked(
+            self.settings.value("animation/prerender", False, type=bool)
+        )
+        prerender_layout.addWidget(self.prerender_check)
+        prerender_layout.addWidget(QLabel("Memory (MB):"))
+        self.frame_cache_spin = QSpinBox()
+        self.frame_cache_spin.setRange(16, 16384)
+        self.frame_cache_spin.setSingleStep(64)
+        self.frame_cache_spin.setValue(
+            self.settings.value(
+                "animation/frameCacheMegabytes",
+                ANIMATION_FRAME_CACHE_DEFAULT_MB,
+                type=int,
+            )
+        )
+        self.frame_cache_spin.setToolTip(
+            "Memory budget for pre-rendered frames; the least recently shown\n"
+            "frames are dropped first and those scenes are drawn as shapes."
+        )
+        self.frame_cache_spin.setEnabled(self.prerender_check.isChecked())
+        self.prerender_check.toggled.connect(self.frame_cache_spin.setEnabled)
+        prerender_layout.addWidget(self.frame_cache_spin)
+        prerender_layout.addStretch()
+        grid_layout.addLayout(prerender_layout, row, 0, 1, 2)
+        row += 1
+
         self.play_mode_group = QButtonGroup(self)
         self.play_mode_group.setExclusive(True)
         play_layout = QVBoxLayout()
@@ -16165,6 +19199,16 @@ class AnimationConfigDialog(QDialog):
 
         layout.addLayout(grid_layout)  # [6651]
 
+        if self.control_panel.animation_report:
+            report_label = QLabel(
+                f"Last playback:\n{self.control_panel.animation_report}"
+            )
+            report_label.setTextInteractionFlags(
+                Qt.TextInteractionFlag.TextSelectableByMouse
+            )
+            report_label.setStyleSheet("color: gray;")
+            layout.addWidget(report_label)
+
         header_layout = QHBoxLayout()
         header_layout.setContentsMargins(2, 2, 2, 2)
         header_layout.setSpacing(5)
@@ -16345,6 +19389,13 @@ class AnimationConfigDialog(QDialog):
         cancel_button = button_box.addButton(
             "Cancel", QDialogButtonBox.ButtonRole.RejectRole
         )
+        export_button = button_box.addButton(
+            "Export...", QDialogButtonBox.ButtonRole.ActionRole
+        )
+        export_button.setToolTip(
+            "Render the sequence to an animated GIF or PNG file, or a PNG sequence"
+        )
+        export_button.clicked.connect(self._export_animation)
         button_box.accepted.connect(self.accept)
         button_box.rejected.connect(self.reject)
         layout.addWidget(button_box)
@@ -16463,6 +19514,10 @@ class AnimationConfigDialog(QDialog):
         self.settings.setValue("animation/interval", self.interval_spin.value())
         self.settings.setValue("animation/defaultTime", self.default_time_spin.value())
         self.settings.setValue("animation/mode", self.mode_combo.currentText())
+        self.settings.setValue("animation/prerender", self.prerender_check.isChecked())
+        self.settings.setValue(
+            "animation/frameCacheMegabytes", self.frame_cache_spin.value()
+        )
         self.settings.setValue("animation/playFront", self.play_front_check.isChecked())
         self.settings.setValue("animation/playBack", self.play_back_check.isChecked())
         self.settings.setValue("animation/loop", self.play_loop_check.isChecked())
@@ -16513,39 +19568,743 @@ class AnimationConfigDialog(QDialog):
                 item_data["start_time_spin"].setValue(0)
                 item_data["start_time_spin"].blockSignals(False)
 
-    def get_parameters(self):  # [6675]
-        return {
-            "start_delay": self.start_delay_spin.value(),
-            "time_mode_auto": self.time_mode_auto_check.isChecked(),
-            "interval": self.interval_spin.value(),
-            "default_time": self.default_time_spin.value(),
-            "mode": self.mode_combo.currentText(),
-            "play_front": self.play_front_check.isChecked(),
-            "play_back": self.play_back_check.isChecked(),
-            "loop": self.play_loop_check.isChecked(),  # [6676]
-            "pingpong_front": self.play_pingpong_front_check.isChecked(),
-            "pingpong_back": self.play_pingpong_back_check.isChecked(),
-        }
+    @Slot()
+    def _export_animation(self):
+        self.control_panel.export_animation(
+            self.get_parameters(), self.get_scene_data(), self
+        )
+
+    def get_parameters(self):  # [6675]
+        return {
+            "start_delay": self.start_delay_spin.value(),
+            "time_mode_auto": self.time_mode_auto_check.isChecked(),
+            "interval": self.interval_spin.value(),
+            "default_time": self.default_time_spin.value(),
+            "mode": self.mode_combo.currentText(),
+            "prerender": self.prerender_check.isChecked(),
+            "frame_cache_mb": self.frame_cache_spin.value(),
+            "play_front": self.play_front_check.isChecked(),
+            "play_back": self.play_back_check.isChecked(),
+            "loop": self.play_loop_check.isChecked(),  # [6676]
+            "pingpong_front": self.play_pingpong_front_check.isChecked(),
+            "pingpong_back": self.play_pingpong_back_check.isChecked(),
+        }
+
+    def get_scene_data(self):
+        scene_data_list = []
+        for item_data in self.scene_item_widgets:
+            scene_data_list.append(
+                {
+                    "filepath": item_data["filepath"],
+                    "individual_start_time": item_data[
+                        "start_time_spin"
+                    ].value(),  # [6677]
+                    "display_time": item_data["time_spin"].value(),
+                    "clear_after": item_data["clear_checkbox"].isChecked(),
+                    "use_between_time": item_data["between_time_check"].isChecked(),
+                    "between_time": item_data["between_time_spin"].value(),
+                    "include_in_animation": item_data[
+                        "include_scene_checkbox"
+                    ].isChecked(),
+                }
+            )
+        return scene_data_list
+
+
+class AnimationExportDialog(QDialog):
+    """Asks for the format, frame rate, size and background of an animation export."""
+
+    FORMATS = [
+        ("Animated GIF", "gif", "GIF Images (*.gif)"),
+        ("Animated PNG (APNG)", "apng", "APNG Images (*.png *.apng)"),
+        ("PNG Sequence", "png", "PNG Images (*.png)"),
+    ]
+
+    def __init__(self, scene_size, board_mode, parent=None):
+        super().__init__(parent)
+        self.settings = Settings("MyCompany", "DesktopOverlayRGN")
+        self.setWindowTitle("Export Animation")
+        self.scene_width, self.scene_height = scene_size
+
+        layout = QVBoxLayout(self)
+        form_layout = QFormLayout()
+
+        self.format_combo = QComboBox()
+        for label, fmt, _ in self.FORMATS:
+            self.format_combo.addItem(label, fmt)
+        if not _pillow.installed():
+            self.format_combo.model().item(0).setEnabled(False)
+            self.format_combo.setItemData(
+                0, "Install Pillow to export GIF files", Qt.ItemDataRole.ToolTipRole
+            )
+        index = self.format_combo.findData(
+            self.settings.value("animationExport/format", "gif")
+        )
+        if index < 0 or (index == 0 and not _pillow.installed()):
+            index = 1
+        self.format_combo.setCurrentIndex(index)
+        form_layout.addRow("Format:", self.format_combo)
+
+        self.fps_spin = QSpinBox()
+        self.fps_spin.setRange(1, 60)
+        self.fps_spin.setValue(
+            self.settings.value(
+                "animationExport/fps", ANIMATION_EXPORT_DEFAULT_FPS, type=int
+            )
+        )
+        form_layout.addRow("Frames per second:", self.fps_spin)
+
+        size_layout = QHBoxLayout()
+        self.width_spin = QSpinBox()
+        self.width_spin.setRange(16, 7680)
+        self.width_spin.setSuffix(" px")
+        self.width_spin.setValue(
+            self.settings.value(
+                "animationExport/width",
+                min(ANIMATION_EXPORT_DEFAULT_WIDTH, self.scene_width),
+                type=int,
+            )
+        )
+        self.height_label = QLabel()
+        self.width_spin.valueChanged.connect(self._update_height_label)
+        size_layout.addWidget(self.width_spin)
+        size_layout.addWidget(self.height_label)
+        size_layout.addStretch()
+        form_layout.addRow("Width:", size_layout)
+        self._update_height_label(self.width_spin.value())
+
+        self.background_combo = QComboBox()
+        self.background_combo.addItems(["Transparent", "Board color"])
+        self.background_combo.setToolTip(
+            "GIF frames keep only pixels above half opacity."
+        )
+        self.background_combo.setCurrentIndex(1 if board_mode else 0)
+        form_layout.addRow("Background:", self.background_combo)
+
+        layout.addLayout(form_layout)
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    @Slot(int)
+    def _update_height_label(self, width):
+        height = max(1, round(width * self.scene_height / max(1, self.scene_width)))
+        self.height_label.setText(f"x {height} px")
+
+    def accept(self):
+        self.settings.setValue("animationExport/format", self.format_combo.currentData())
+        self.settings.setValue("animationExport/fps", self.fps_spin.value())
+        self.settings.setValue("animationExport/width", self.width_spin.value())
+        super().accept()
+
+    def get_options(self):
+        index = self.format_combo.currentIndex()
+        return {
+            "format": self.FORMATS[index][1],
+            "file_filter": self.FORMATS[index][2],
+            "fps": self.fps_spin.value(),
+            "scale": self.width_spin.value() / max(1, self.scene_width),
+            "board_background": self.background_combo.currentIndex() == 1,
+        }
+
+
+class AnimationScheduler:
+    """
+    Runs animation events at deadlines on the monotonic clock, from a
+    priority queue of (due time, event) and a single QTimer re-armed to the
+    earliest deadline.
+
+    Deadlines are absolute: schedule_at() counts from start(), and
+    schedule_after() called from inside an event counts from that event's
+    deadline rather than from the moment it actually ran, so late events do
+    not push everything after them back. How late each event ran is
+    collected for drift_report().
+    """
+
+    def __init__(self, parent):
+        self._timer = QTimer(parent)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._fire)
+        self._heap = []
+        self._sequence = itertools.count()
+        self._origin = time.monotonic()
+        self._current_due = None
+        self.fired = 0
+        self.total_drift = 0.0
+        self.max_drift = 0.0
+
+    def start(self):
+        """Drops pending events and makes now the origin for schedule_at()."""
+        self.clear()
+        self._origin = time.monotonic()
+        self.fired = 0
+        self.total_drift = 0.0
+        self.max_drift = 0.0
+
+    def clear(self):
+        self._timer.stop()
+        self._heap.clear()
+
+    def schedule_at(self, seconds, callback, *args):
+        """Schedules callback(*args) at seconds after start()."""
+        self._push(self._origin + seconds, callback, args)
+
+    def schedule_after(self, seconds, callback, *args):
+        """
+        Schedules callback(*args) seconds after the deadline of the event
+        being run, or after now outside of an event.
+        """
+        base = self._current_due if self._current_due is not None else time.monotonic()
+        self._push(base + seconds, callback, args)
+
+    def drift_report(self):
+        if not self.fired:
+            return "no events fired"
+        return (
+            f"{self.fired} events, mean drift {self.total_drift / self.fired * 1000:.1f} ms, "
+            f"max {self.max_drift * 1000:.1f} ms"
+        )
+
+    def _push(self, due, callback, args):
+        # The sequence number keeps events with equal deadlines in order.
+        heapq.heappush(self._heap, (due, next(self._sequence), callback, args))
+        if self._current_due is None:
+            self._rearm()
+
+    def _rearm(self):
+        if not self._heap:
+            self._timer.stop()
+            return
+        delay = self._heap[0][0] - time.monotonic()
+        self._timer.start(max(0, math.ceil(delay * 1000)))
+
+    def _fire(self):
+        # QTimer may wake up a little early; treat anything due within a
+        # millisecond as due now.
+        while self._heap and self._heap[0][0] <= time.monotonic() + 0.001:
+            due, _, callback, args = heapq.heappop(self._heap)
+            drift = max(0.0, time.monotonic() - due)
+            self.fired += 1
+            self.total_drift += drift
+            self.max_drift = max(self.max_drift, drift)
+            if drift > ANIMATION_DRIFT_WARN_SECONDS:
+                print(
+                    f"Animation scheduler: {getattr(callback, '__name__', callback)} ran {drift * 1000:.0f} ms late"
+                )
+            self._current_due = due
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error in scheduled animation event: {e}")
+                traceback.print_exc()
+            finally:
+                self._current_due = None
+        self._rearm()
+
+
+class AnimationFrameCache:
+    """
+    LRU cache of animation scenes pre-rendered to screen-sized frames.
+
+    Frames are painted into QImages by a worker thread through a render
+    callable, then turned into QPixmaps on the GUI thread by poll(), so
+    showing a frame during playback is a single blit whatever the scene
+    complexity. Keys include the file's modification time and size and the
+    frame size, so edited scenes and resized screens are rendered again.
+    The least recently used frames are evicted past max_bytes.
+    """
+
+    def __init__(self, render, max_bytes=ANIMATION_FRAME_CACHE_DEFAULT_MB * 1024 * 1024):
+        self._render = render
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rendered = 0
+        self.render_seconds = 0.0
+        self._frames = OrderedDict()
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._cancel = threading.Event()
+        self._batch = 0
+        self._thread = None
+
+    @staticmethod
+    def frame_key(path, width, height, dpr):
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (path, stat.st_mtime_ns, stat.st_size, width, height, dpr)
+
+    @staticmethod
+    def _frame_bytes(frame):
+        return frame.width() * frame.height() * max(1, frame.depth() // 8)
+
+    def request(self, paths, width, height, dpr):
+        """
+        Queues the frames that are not cached yet as a new batch; returns how
+        many were queued.
+        """
+        self._cancel.clear()
+        self._batch += 1
+        queued = set()
+        for path in paths:
+            key = self.frame_key(path, width, height, dpr)
+            if key is None or key in self._frames or key in queued:
+                continue
+            queued.add(key)
+            self._jobs.put((self._batch, key))
+        if queued and self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="AnimationFrameCache", daemon=True
+            )
+            self._thread.start()
+        return len(queued)
+
+    def cancel(self):
+        """Drops queued renders; a render in progress is discarded."""
+        self._cancel.set()
+        while True:
+            try:
+                self._jobs.get_nowait()
+            except queue.Empty:
+                break
+
+    def poll(self):
+        """
+        Stores finished frames (GUI thread only); returns how many frames of
+        the current batch finished.
+        """
+        finished = 0
+        while True:
+            try:
+                batch, key, image, seconds = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if batch == self._batch:
+                finished += 1
+            if image is None:
+                continue
+            self.rendered += 1
+            self.render_seconds += seconds
+            self._put(key, QPixmap.fromImage(image))
+        return finished
+
+    def get(self, path, width, height, dpr):
+        key = self.frame_key(path, width, height, dpr)
+        frame = self._frames.get(key) if key is not None else None
+        if frame is None:
+            self.misses += 1
+            return None
+        self._frames.move_to_end(key)
+        self.hits += 1
+        return frame
+
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max(0, max_bytes)
+        self._evict()
+
+    def clear(self):
+        self._frames.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        return {
+            "frames": len(self._frames),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "rendered": self.rendered,
+            "mean_render_seconds": (
+                self.render_seconds / self.rendered if self.rendered else 0.0
+            ),
+        }
+
+    def _put(self, key, frame):
+        if key in self._frames:
+            self.current_bytes -= self._frame_bytes(self._frames.pop(key))
+        self._frames[key] = frame
+        self.current_bytes += self._frame_bytes(frame)
+        self._evict()
+
+    def _evict(self):
+        while self._frames and self.current_bytes > self.max_bytes:
+            _, frame = self._frames.popitem(last=False)
+            self.current_bytes -= self._frame_bytes(frame)
+            self.evictions += 1
+
+    def _run(self):
+        while True:
+            batch, key = self._jobs.get()
+            path, _, _, width, height, dpr = key
+            start = time.perf_counter()
+            try:
+                image = self._render(path, width, height, dpr)
+            except Exception as e:
+                print(f"Could not pre-render animation frame for {path}: {e}")
+                traceback.print_exc()
+                image = None
+            if self._cancel.is_set():
+                image = None
+            self._results.put((batch, key, image, time.perf_counter() - start))
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_chunk(kind, data):
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    )
+
+
+class AnimationExporter:
+    """
+    Renders an animation sequence to an animated GIF or APNG file, or to a
+    numbered PNG sequence, without playing it on screen.
+
+    The sequence is turned into a timeline of scene intervals and sampled at
+    the export frame rate; runs of identical frames are written once with a
+    longer delay. A worker thread renders each scene once through the render
+    callable, composes the frames and hands their pixels to a pool of
+    encoder processes. Encoded frames are written in order as they finish,
+    so only a few frames are held in memory at any time.
+    """
+
+    def __init__(self, render, params, scenes, options):
+        self._render = render
+        self.params = params
+        self.scenes = scenes
+        self.path = options["path"]
+        self.format = options["format"]
+        self.fps = options["fps"]
+        self.width, self.height = options["scene_size"]
+        self.scale = options["scale"]
+        self.background = options.get("background")
+        self.pixel_width = max(1, round(self.width * self.scale))
+        self.pixel_height = max(1, round(self.height * self.scale))
+        self.intervals, self.duration = self.build_timeline(params, scenes)
+        self.runs = self.frame_runs(self.intervals, self.duration, self.fps)
+        self.total_frames = sum(count for _, count in self.runs)
+        self.frames_written = 0
+        self.finished = False
+        self.cancelled = False
+        self.error = None
+        self.pool_kind = None
+        self._results = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = None
+        self._file = None
+
+    @staticmethod
+    def sequence_order(count, params):
+        """Scene indices of one pass of the sequence for the playback type."""
+        forward = list(range(count))
+        if params.get("pingpong_front") and count > 1:
+            return forward + forward[-2::-1]
+        if params.get("pingpong_back") and count > 1:
+            return forward[::-1] + forward[1:]
+        if params.get("play_back") or params.get("pingpong_back"):
+            return forward[::-1]
+        return forward
+
+    @classmethod
+    def build_timeline(cls, params, scenes):
+        """
+        Returns the (scene_index, start, end) intervals in which scenes are
+        visible, ordered by start, and the length of the sequence in seconds.
+        end is None for scenes that are not cleared. Times are counted from
+        the end of the start delay, which is not exported.
+        """
+        default_time = params["default_time"]
+        intervals = []
+        time_s = 0.0
+        if params.get("time_mode_auto", True):
+            for index in cls.sequence_order(len(scenes), params):
+                scene = scenes[index]
+                if scene.get("include_in_animation", True):
+                    end = time_s + default_time
+                    intervals.append(
+                        (index, time_s, end if scene.get("clear_after") else None)
+                    )
+                    time_s = end
+                time_s += params["interval"]
+            return intervals, time_s
+
+        def display_time(scene):
+            return scene["display_time"] if scene["display_time"] > 0 else default_time
+
+        for index in cls.sequence_order(len(scenes), params):
+            scene = scenes[index]
+            if not scene.get("include_in_animation", True) or scene.get(
+                "individual_start_time", 0.0
+            ):
+                continue
+            end = time_s + display_time(scene)
+            intervals.append((index, time_s, end if scene.get("clear_after") else None))
+            time_s = end
+        duration = time_s
+        for index, scene in enumerate(scenes):
+            start = scene.get("individual_start_time", 0.0)
+            if not scene.get("include_in_animation", True) or start <= 0:
+                continue
+            end = start + display_time(scene)
+            intervals.append((index, start, end if scene.get("clear_after") else None))
+            duration = max(duration, end)
+        intervals.sort(key=lambda interval: interval[1])
+        return intervals, duration
+
+    @staticmethod
+    def frame_runs(intervals, duration, fps):
+        """
+        Samples the timeline at fps; returns (visible_interval_indices,
+        frame_count) runs of identical consecutive frames.
+        """
+        runs = []
+        if not intervals:
+            return runs
+        for frame in range(max(1, round(duration * fps))):
+            time_s = frame / fps + 1e-9
+            visible = tuple(
+                i
+                for i, (_, start, end) in enumerate(intervals)
+                if start <= time_s and (end is None or time_s < end)
+            )
+            if runs and runs[-1][0] == visible:
+                runs[-1][1] += 1
+            else:
+                runs.append([visible, 1])
+        return [(visible, count) for visible, count in runs]
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="AnimationExporter", daemon=True
+        )
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def poll(self):
+        """Picks up progress (GUI thread); returns True once the export ended."""
+        while True:
+            try:
+                kind, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self.frames_written = value
+            elif kind == "error":
+                self.error = value
+                self.finished = True
+            elif kind == "cancelled":
+                self.cancelled = True
+                self.finished = True
+            elif kind == "done":
+                self.finished = True
+        return self.finished
+
+    def _make_pool(self, workers):
+        # A frozen build would start the whole application again in every
+        # encoder process, so it encodes on threads.
+        if getattr(sys, "frozen", False):
+            self.pool_kind = "threads"
+            return concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        # Forking this multithreaded Qt process could deadlock the children.
+        try:
+            pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            self.pool_kind = "processes"
+        except (OSError, NotImplementedError, ImportError) as e:
+            print(f"Encoder processes are not available ({e}); encoding on threads.")
+            pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+            self.pool_kind = "threads"
+        return pool
+
+    def _run(self):
+        workers = max(1, (os.cpu_count() or 2) - 1)
+        pool = self._make_pool(workers)
+        try:
+            self._begin_output()
+            completed = self._write_frames(
+                pool, workers * ANIMATION_EXPORT_FRAMES_PER_WORKER
+            )
+            self._end_output(completed)
+            self._results.put(("done", None) if completed else ("cancelled", None))
+        except Exception as e:
+            traceback.print_exc()
+            self._end_output(False)
+            self._results.put(("error", str(e)))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _write_frames(self, pool, window):
+        last_use = {}
+        for run_index, (visible, _) in enumerate(self.runs):
+            for interval_index in visible:
+                last_use[self.intervals[interval_index][0]] = run_index
+        images = {}
+        pending = deque()
+        first_frame = 0
+        for run_index, (visible, count) in enumerate(self.runs):
+            if self._cancel.is_set():
+                return False
+            rgba = self._compose(visible, images)
+            for scene_index in [i for i in images if last_use.get(i) == run_index]:
+                del images[scene_index]
+            if self.format == "gif":
+                duration_cs = round((first_frame + count) * 100 / self.fps) - round(
+                    first_frame * 100 / self.fps
+                )
+                future = pool.submit(
+                    encode_gif_frame,
+                    rgba,
+                    self.pixel_width,
+                    self.pixel_height,
+                    max(1, duration_cs) * 10,
+                )
+            else:
+                future = pool.submit(
+                    encode_png_frame, rgba, self.pixel_width, self.pixel_height
+                )
+            pending.append((future, first_frame, count))
+            first_frame += count
+            while len(pending) >= window:
+                self._write_next(pending)
+        while pending:
+            if self._cancel.is_set():
+                return False
+            self._write_next(pending)
+        return True
+
+    def _compose(self, visible, images):
+        frame = QImage(
+            self.pixel_width,
+            self.pixel_height,
+            QImage.Format.Format_ARGB32_Premultiplied,
+        )
+        frame.setDevicePixelRatio(self.scale)
+        if self.background is not None:
+            frame.fill(self.background)
+        else:
+            frame.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(frame)
+        try:
+            for interval_index in visible:
+                scene_index = self.intervals[interval_index][0]
+                image = images.get(scene_index)
+                if image is None:
+                    path = self.scenes[scene_index]["filepath"]
+                    try:
+                        image = self._render(path, self.width, self.height, self.scale)
+                    except Exception as e:
+                        raise ValueError(f"{os.path.basename(path)}: {e}") from e
+                    images[scene_index] = image
+                painter.drawImage(QPointF(0, 0), image)
+        finally:
+            painter.end()
+        return bytes(frame.convertToFormat(QImage.Format.Format_RGBA8888).constBits())
+
+    def _write_next(self, pending):
+        future, first_frame, count = pending.popleft()
+        data = future.result()
+        if self.format == "png":
+            png = (
+                PNG_SIGNATURE
+                + self._png_header()
+                + _png_chunk(b"IDAT", data)
+                + _png_chunk(b"IEND", b"")
+            )
+            for number in range(first_frame, first_frame + count):
+                with open(self._sequence_pattern.format(number), "wb") as f:
+                    f.write(png)
+        elif self.format == "apng":
+            self._file.write(
+                _png_chunk(
+                    b"fcTL",
+                    struct.pack(
+                        ">IIIIIHHBB",
+                        self._apng_sequence,
+                        self.pixel_width,
+                        self.pixel_height,
+                        0,
+                        0,
+                        min(count, 0xFFFF),
+                        self.fps,
+                        0,
+                        0,
+                    ),
+                )
+            )
+            self._apng_sequence += 1
+            if first_frame == 0:
+                self._file.write(_png_chunk(b"IDAT", data))
+            else:
+                self._file.write(
+                    _png_chunk(b"fdAT", struct.pack(">I", self._apng_sequence) + data)
+                )
+                self._apng_sequence += 1
+        else:
+            self._file.write(data)
+        self._results.put(("progress", first_frame + count))
+
+    def _png_header(self):
+        return _png_chunk(
+            b"IHDR",
+            struct.pack(">IIBBBBB", self.pixel_width, self.pixel_height, 8, 6, 0, 0, 0),
+        )
 
-    def get_scene_data(self):
-        scene_data_list = []
-        for item_data in self.scene_item_widgets:
-            scene_data_list.append(
-                {
-                    "filepath": item_data["filepath"],
-                    "individual_start_time": item_data[
-                        "start_time_spin"
-                    ].value(),  # [6677]
-                    "display_time": item_data["time_spin"].value(),
-                    "clear_after": item_data["clear_checkbox"].isChecked(),
-                    "use_between_time": item_data["between_time_check"].isChecked(),
-                    "between_time": item_data["between_time_spin"].value(),
-                    "include_in_animation": item_data[
-                        "include_scene_checkbox"
-                    ].isChecked(),
-                }
+    def _begin_output(self):
+        loop = self.params.get("loop", False)
+        if self.format == "png":
+            base, _ = os.path.splitext(self.path)
+            digits = max(5, len(str(self.total_frames - 1)))
+            self._sequence_pattern = f"{base}_{{:0{digits}d}}.png"
+            return
+        self._file = open(self.path + ".part", "wb")
+        if self.format == "apng":
+            self._apng_sequence = 0
+            self._file.write(
+                PNG_SIGNATURE
+                + self._png_header()
+                + _png_chunk(b"acTL", struct.pack(">II", len(self.runs), 0 if loop else 1))
             )
-        return scene_data_list
+        else:
+            self._file.write(
+                b"GIF89a"
+                + struct.pack("<HHBBB", self.pixel_width, self.pixel_height, 0, 0, 0)
+            )
+            if loop:
+                self._file.write(b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    def _end_output(self, completed):
+        """Finishes the file; an unfinished GIF or APNG file is removed."""
+        if self._file is None:
+            return
+        f, self._file = self._file, None
+        if completed:
+            with f:
+                f.write(_png_chunk(b"IEND", b"") if self.format == "apng" else b";")
+            os.replace(self.path + ".part", self.path)
+            return
+        f.close()
+        try:
+            os.remove(self.path + ".part")
+        except OSError as e:
+            print(f"Could not remove unfinished animation export {self.path}: {e}")
 
 
 class ControlPanel(QDockWidget):
@@ -16576,9 +20335,10 @@ class ControlPanel(QDockWidget):
             | Qt.WindowType.WindowSystemMenuHint
         )
         self.shortcuts_window = None
+        self._shortcuts_window_shown = False
         self.info_dialog = None  # [6679]
         self._initial_position_set = False  # [6680]
-        self.settings = QSettings("MyCompany", "DesktopOverlayRGN")  # [6681]
+        self.settings = Settings("MyCompany", "DesktopOverlayRGN")  # [6681]
         self.fixed_size_widgets = {}  # [6682]
         self.mpoint_widget_group = {}  # [6683]
         self.angle_tool_widget_group = {}  # [6684]
@@ -16586,7 +20346,7 @@ class ControlPanel(QDockWidget):
         self.division_settings_group = {}  # [6686]
         self._anim_dialog_previewed_scene_tags = {}  # [6687]
         self.zoom_enabled = False  # [6688]
-        self._zoom_first_use_info_shown = False  # [6689]
+        self._magnifier_size = MAGNIFIER_DEFAULT_SIZE
 
         self._dragging_window = False  # [6690]
         self._drag_window_offset = QPoint()  # [6691]
@@ -16664,6 +20424,15 @@ class ControlPanel(QDockWidget):
             "Duration for shapes in TEMP mode (seconds)"
         )  # [6717]
         temp_time_layout.addWidget(self.time_spin)
+        temp_time_layout.addWidget(QLabel("Fade:"))
+        self.fade_spin = QDoubleSpinBox()
+        self.fade_spin.setRange(0.0, 10.0)
+        self.fade_spin.setDecimals(2)
+        self.fade_spin.setSingleStep(0.1)
+        self.fade_spin.setToolTip(
+            "Fade-out at the end of a TEMP mode shape's time (seconds, 0 = none)"
+        )
+        temp_time_layout.addWidget(self.fade_spin)
         top_row3_layout.addLayout(temp_time_layout)  # [6718]
 
         self._create_line_style_combo(top_row3_layout)  # Pass QHBoxLayout # [6719]
@@ -16680,10 +20449,22 @@ class ControlPanel(QDockWidget):
         self.zoom_button = QPushButton("ZOOM")  # [6725]
         self.zoom_button.setCheckable(True)  # [6726]
         self.zoom_button.setToolTip(
-            "Toggle Windows Magnifier (Win + '+') / (Win + 'Esc')"
+            "Toggle the magnifier loupe at the cursor"
         )  # [6727]
         self.zoom_button.clicked.connect(self.toggle_zoom_button_handler)  # [6728]
         fill_back_layout.addWidget(self.zoom_button)  # [6729]
+        self.zoom_factor_spin = QSpinBox()
+        self.zoom_factor_spin.setRange(2, MAGNIFIER_MAX_ZOOM)
+        self.zoom_factor_spin.setSuffix("x")
+        self.zoom_factor_spin.setValue(MAGNIFIER_DEFAULT_ZOOM)
+        self.zoom_factor_spin.setToolTip("Magnifier zoom factor")
+        fill_back_layout.addWidget(self.zoom_factor_spin)
+        self.zoom_smooth_check = QCheckBox("Smooth")
+        self.zoom_smooth_check.setChecked(True)
+        self.zoom_smooth_check.setToolTip(
+            "Smooth the magnified image instead of showing enlarged pixels"
+        )
+        fill_back_layout.addWidget(self.zoom_smooth_check)
 
         self.hide_shapes_button = QPushButton("HIDE")
         self.hide_shapes_button.setCheckable(True)
@@ -17805,6 +21586,32 @@ class ControlPanel(QDockWidget):
                 h_layout.addWidget(btn_widget)  # [7205]
             action_column_layout.addLayout(h_layout)  # [7206]
 
+        # Scene slots: click switches (or assigns an empty slot), right-click
+        # assigns or clears.
+        slot_layout = QHBoxLayout()
+        slot_layout.setSpacing(2)
+        slot_layout.addWidget(QLabel("Slots:"))
+        self.scene_slot_buttons = []
+        for index in range(SCENE_SLOT_COUNT):
+            slot_button = QPushButton(str(index + 1))
+            slot_button.setSizePolicy(
+                QSizePolicy.Policy.MinimumExpanding, QSizePolicy.Policy.Fixed
+            )
+            slot_button.setMinimumWidth(18)
+            slot_button.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+            slot_button.clicked.connect(
+                lambda checked=False, i=index: self.scene_slot_action(i)
+            )
+            slot_button.customContextMenuRequested.connect(
+                lambda pos, i=index: self.show_scene_slot_menu(i, pos)
+            )
+            slot_layout.addWidget(slot_button)
+            self.scene_slot_buttons.append(slot_button)
+        action_column_layout.addLayout(slot_layout)
+        self.overlay.scene_slot_changed.connect(self.update_scene_slot_button)
+        for index in range(SCENE_SLOT_COUNT):
+            self.update_scene_slot_button(index)
+
         self.drawing_button.setCheckable(True)  # [7207]
 
         layout.addLayout(action_column_layout)  # [7208]
@@ -17902,6 +21709,9 @@ class ControlPanel(QDockWidget):
         self.time_spin.valueChanged.connect(
             self.overlay.set_temp_mode_duration
         )  # [7246]
+        self.fade_spin.valueChanged.connect(self.overlay.set_temp_mode_fade_duration)
+        self.zoom_factor_spin.valueChanged.connect(self._update_magnifier_options)
+        self.zoom_smooth_check.toggled.connect(self._update_magnifier_options)
         self.fill_check.stateChanged.connect(self.update_fill_state_and_hatch)  # [7247]
         self.dim_check.stateChanged.connect(
             lambda state: self.overlay.set_dim_background(
@@ -17941,10 +21751,29 @@ class ControlPanel(QDockWidget):
         self._animation_was_indicator_shown = True  # [7262]
         self._animation_pause_remaining_clear = -1  # [7263]
         self._animation_pause_remaining_step = -1  # [7264]
-        self._animation_individual_scene_timers = []  # [7265]
+        self._animation_scheduler = AnimationScheduler(self)  # [7265]
+        self._animation_individual_scene_tags = set()
+        self._animation_sequence_finished = False
+        self._animation_frame_poll_timer = QTimer(self)
+        self._animation_frame_poll_timer.setInterval(ANIMATION_FRAME_POLL_MS)
+        self._animation_frame_poll_timer.timeout.connect(
+            self._poll_animation_prerender
+        )
+        self._animation_prerender_job = None
+        self._animation_export = None
+        self._animation_export_progress = None
+        self._animation_export_started = 0.0
+        self._animation_export_poll_timer = QTimer(self)
+        self._animation_export_poll_timer.setInterval(ANIMATION_EXPORT_POLL_MS)
+        self._animation_export_poll_timer.timeout.connect(self._poll_animation_export)
+        self._animation_show_times = []
+        self._animation_frames_shown = 0
+        self.animation_report = ""
 
         self.overlay.control_panel = self  # [7266]
+        _mark_startup("panel widgets")
         self.restore_settings()  # [7267]
+        _mark_startup("panel restore_settings")
         # Ensure snap controls state is initialized after settings restore # [7268]
         self.update_snap_controls_from_settings()  # [7269]
         print("ControlPanel initialized and settings restored.")  # [7270]
@@ -18009,6 +21838,7 @@ class ControlPanel(QDockWidget):
 
     def _handle_lines_toggle_checkbox(self, state):  # [7311]
         """Handles the checkbox state change for Lines."""  # [7312]
+        self._finish_deferred_startup()
         global lines_app_instance  # [7313]
         if lines_app_instance:  # [7314]
             is_checked = state == Qt.CheckState.Checked.value  # [7315]
@@ -18025,6 +21855,7 @@ class ControlPanel(QDockWidget):
 
     def _handle_lines_settings_button(self):  # [7320]
         """Handles the settings button click for Lines."""  # [7321]
+        self._finish_deferred_startup()
         global lines_app_instance, lines_settings_dialog_instance  # [7322]
         if lines_app_instance:  # [7323]
             if (
@@ -18038,12 +21869,14 @@ class ControlPanel(QDockWidget):
 
     def _handle_grid_toggle_checkbox(self, state):  # [7329]
         """Handles the checkbox state change for Grid."""  # [7330]
+        self._finish_deferred_startup()
         global grid_settings_window_instance, grid_overlay_instance  # [7331]
         if grid_settings_window_instance and grid_overlay_instance:  # [7332]
             grid_settings_window_instance.toggleGrid(state)  # [7333]
 
     def _handle_grid_settings_button(self):  # [7334]
         """Handles the settings button click for Grid."""  # [7335]
+        self._finish_deferred_startup()
         global grid_settings_window_instance  # [7336]
         if grid_settings_window_instance:  # [7337]
             if not grid_settings_window_instance.isVisible():  # [7338]
@@ -18051,6 +21884,11 @@ class ControlPanel(QDockWidget):
             grid_settings_window_instance.raise_()  # [7340]
             grid_settings_window_instance.activateWindow()  # [7341]
 
+    def _finish_deferred_startup(self):
+        main_app = getattr(self, "main_app_parent", None)
+        if main_app is not None:
+            main_app.finish_deferred_startup()
+
     @Slot(bool)  # [7342]
     def update_lines_toggle_checkbox_state(self, visible):  # [7343]
         """Updates the Lines checkbox state based on a signal."""  # [7344]
@@ -18079,77 +21917,31 @@ class ControlPanel(QDockWidget):
         self.toggle_zoom(checked)  # [7364]
 
     def toggle_zoom(self, enable):  # [7365]
-        """Enables or disables Windows Magnifier."""  # [7366]
-        if not _IS_WINDOWS:  # [7367]
-            print("Magnifier control is only available on Windows.")  # [7368]
-            if self.zoom_button.isChecked() != self.zoom_enabled:  # [7369]
-                self.zoom_button.setChecked(self.zoom_enabled)  # [7370]
-            return  # [7371]
-
-        if enable:  # [7372]
-            if not self.zoom_enabled:  # [7373]
-                try:  # [7374]
-                    if not self._zoom_first_use_info_shown:  # [7375]
-                        QMessageBox.information(
-                            self,
-                            "Magnifier Information",  # [7376]
-                            "Windows Magnifier will be launched directly.\n"  # [7377]
-                            "Please set your desired zoom level and mode directly in the Magnifier application "  # [7378]
-                            "the first time you use it.\nThis message will not be shown again.",
-                        )  # [7379]
-                        self._zoom_first_use_info_shown = True  # [7380]
-                        self.settings.setValue(
-                            "magnifier/firstUseInfoShown", True
-                        )  # [7381]
-
-                    subprocess.Popen(
-                        ["cmd.exe", "/c", "start", "", "Magnify.exe"], shell=True
-                    )  # [7382]
-                    self.zoom_enabled = True  # [7383]
-                    print("Launched Windows Magnifier (Magnify.exe)")  # [7384]
-                except Exception as e:  # [7385]
-                    print(f"Error launching Magnifier: {e}")  # [7386]
-                    QMessageBox.warning(
-                        self, "Magnifier Error", f"Could not launch Magnifier: {e}"
-                    )  # [7387]
-                    self.zoom_enabled = False  # [7388]
-            if self.zoom_button.isChecked() != self.zoom_enabled:  # [7389]
-                self.zoom_button.setChecked(self.zoom_enabled)  # [7390]
-        else:  # [7391]
-            if self.zoom_enabled:  # [7392]
-                if not _PYAUTOGUI_AVAILABLE:  # [7393]
-                    QMessageBox.warning(
-                        self,
-                        "Magnifier Control Disabled",  # [7394]
-                        "PyAutoGUI module is not installed.\n"  # [7395]
-                        "Magnifier closing via hotkey is disabled.\n"  # [7396]
-                        "Please install PyAutoGUI: pip install pyautogui",
-                    )  # [7397]
-                    if self.zoom_button.isChecked() != self.zoom_enabled:  # [7398]
-                        self.zoom_button.setChecked(self.zoom_enabled)  # [7399]
-                    return  # [7400]
-
-                print(
-                    "Attempting to close Magnifier via hotkey (Win + Esc)..."
-                )  # [7401]
-                try:  # [7402]
-                    pyautogui.hotkey("win", "esc")  # [7403]
-                    self.zoom_enabled = False  # [7404]
-                    print("Sent Win + Esc to close Magnifier.")  # [7405]
-                except Exception as e:  # [7406]
-                    print(f"Error sending Win + Esc to close Magnifier: {e}")  # [7407]
-                    QMessageBox.warning(
-                        self,
-                        "Magnifier Error",
-                        f"Could not send hotkey to close Magnifier: {e}",
-                    )  # [7408]
-            if self.zoom_button.isChecked() != self.zoom_enabled:  # [7409]
-                self.zoom_button.setChecked(self.zoom_enabled)  # [7410]
+        """Shows or hides the magnifier loupe that follows the cursor."""  # [7366]
+        if enable and not self.zoom_enabled:  # [7372]
+            if self.overlay.magnifier is None:
+                self.overlay.magnifier = MagnifierLoupe(self.overlay)
+                self.overlay.magnifier.set_diameter(self._magnifier_size)
+            self._update_magnifier_options()
+            self.overlay.magnifier.start()
+            self.zoom_enabled = True  # [7383]
+        elif not enable and self.zoom_enabled:  # [7391]
+            self.overlay.magnifier.stop()
+            self.zoom_enabled = False  # [7404]
+        if self.zoom_button.isChecked() != self.zoom_enabled:  # [7409]
+            self.zoom_button.setChecked(self.zoom_enabled)  # [7410]
+
+    def _update_magnifier_options(self):
+        magnifier = self.overlay.magnifier
+        if magnifier is not None:
+            magnifier.set_zoom(self.zoom_factor_spin.value())
+            magnifier.set_smoothing(self.zoom_smooth_check.isChecked())
 
     @Slot(bool)  # [7411]
     def toggle_dark_mode(self, checked):  # [7412]
         app = QApplication.instance()  # [7413]
-        if _QDARKSTYLE_AVAILABLE:  # [7414]
+        qdarkstyle = _qdarkstyle.load() if checked else None
+        if qdarkstyle is not None or not checked:  # [7414]
             if checked:  # [7415]
                 app.setStyleSheet(
                     qdarkstyle.load_stylesheet(qt_api="pyside6")
@@ -18433,6 +22225,7 @@ class ControlPanel(QDockWidget):
         self.arrow_size_spin.blockSignals(True)
         self.brush_size_spin.blockSignals(True)  # [7569]
         self.time_spin.blockSignals(True)
+        self.fade_spin.blockSignals(True)
         self.fill_check.blockSignals(True)
         self.dim_check.blockSignals(True)  # [7570]
         self.tool_text_check.blockSignals(True)
@@ -18576,6 +22369,11 @@ class ControlPanel(QDockWidget):
         )  # [7599]
         self.time_spin.setValue(saved_time_duration)
         self.overlay.set_temp_mode_duration(saved_time_duration)  # [7600]
+        saved_fade_duration = self.settings.value(
+            "controlPanel/tempFadeDuration", 0.0, type=float
+        )
+        self.fade_spin.setValue(saved_fade_duration)
+        self.overlay.set_temp_mode_fade_duration(saved_fade_duration)
         saved_tool = self.settings.value("controlPanel/currentTool", "rect")
         self.set_tool(
             saved_tool if saved_tool in self.tool_buttons else "rect"
@@ -18742,9 +22540,15 @@ class ControlPanel(QDockWidget):
         self.update_hide_button_visuals(self.overlay.shapes_visible)  # [7661]
         self.overlay.load_angle_tool_settings()  # [7662]
         self.overlay.load_hatch_fill_settings()  # [7663]
-        self._zoom_first_use_info_shown = self.settings.value(
-            "magnifier/firstUseInfoShown", False, type=bool
-        )  # [7664]
+        self.zoom_factor_spin.setValue(
+            self.settings.value("magnifier/zoom", MAGNIFIER_DEFAULT_ZOOM, type=int)
+        )
+        self.zoom_smooth_check.setChecked(
+            self.settings.value("magnifier/smooth", True, type=bool)
+        )
+        self._magnifier_size = self.settings.value(
+            "magnifier/size", MAGNIFIER_DEFAULT_SIZE, type=int
+        )
 
         # Load dark mode setting and apply it # [7665]
         dark_mode_enabled = self.settings.value(
@@ -18756,7 +22560,8 @@ class ControlPanel(QDockWidget):
         else:  # [7670]
             self.dark_mode_button.setText("DARK")  # [7671]
         app = QApplication.instance()  # [7672]
-        if _QDARKSTYLE_AVAILABLE:  # [7673]
+        qdarkstyle = _qdarkstyle.load() if dark_mode_enabled else None
+        if qdarkstyle is not None or not dark_mode_enabled:  # [7673]
             if dark_mode_enabled:  # [7674]
                 app.setStyleSheet(
                     qdarkstyle.load_stylesheet(qt_api="pyside6")
@@ -18780,6 +22585,7 @@ class ControlPanel(QDockWidget):
         self.arrow_size_spin.blockSignals(False)
         self.brush_size_spin.blockSignals(False)  # [7686]
         self.time_spin.blockSignals(False)
+        self.fade_spin.blockSignals(False)
         self.fill_check.blockSignals(False)
         self.dim_check.blockSignals(False)  # [7687]
         self.tool_text_check.blockSignals(False)
@@ -18879,6 +22685,12 @@ class ControlPanel(QDockWidget):
         self.settings.setValue(
             "controlPanel/tempDuration", self.overlay.temp_mode_shape_duration
         )  # [7718]
+        self.settings.setValue(
+            "controlPanel/tempFadeDuration", self.overlay.temp_mode_fade_duration
+        )
+        self.settings.setValue("magnifier/zoom", self.zoom_factor_spin.value())
+        self.settings.setValue("magnifier/smooth", self.zoom_smooth_check.isChecked())
+        self.settings.setValue("magnifier/size", self._magnifier_size)
         self.settings.setValue(
             "controlPanel/currentTool", self.overlay.current_tool
         )  # [7719]
@@ -19553,29 +23365,88 @@ class ControlPanel(QDockWidget):
 
     @Slot()  # [8010]
     def save_scene_action(self):  # [8011]
+        json_filter = "JSON Files (*.json)"
+        compact_filter = "Compact JSON (*.json)"
+        gzip_filter = "Compressed JSON (*.json.gz)"
         filename, selected_filter = QFileDialog.getSaveFileName(  # [8012]
             self,
             "Save Scene",
             "",  # [8013]
-            "JSON Files (*.json);;SVG Files (*.svg)",  # [8014]
+            f"{json_filter};;{compact_filter};;{gzip_filter};;SVG Files (*.svg)",  # [8014]
+            compact_filter if self.overlay.scene_save_compact else json_filter,
         )  # [8015]
         if filename:  # [8016]
             if selected_filter == "SVG Files (*.svg)":  # [8017]
                 if not filename.lower().endswith(".svg"):  # [8018]
                     filename += ".svg"  # [8019]
                 self.overlay.export_scene_to_svg(filename)  # [8020]
+            elif selected_filter == gzip_filter or filename.lower().endswith(
+                SCENE_GZIP_SUFFIX
+            ):
+                if not filename.lower().endswith(SCENE_GZIP_SUFFIX):
+                    if filename.lower().endswith(".json"):
+                        filename = filename[: -len(".json")]
+                    filename += SCENE_GZIP_SUFFIX
+                self.overlay.save_scene(filename)
             else:  # [8021]
                 if not filename.lower().endswith(".json"):  # [8022]
                     filename += ".json"  # [8023]
+                self.overlay.scene_save_compact = selected_filter == compact_filter
+                self.overlay.save_scene_file_settings()
                 self.overlay.save_scene(filename)  # [8024]
 
     @Slot()  # [8025]
     def load_scene_action(self):  # [8026]
         filename, _ = QFileDialog.getOpenFileName(
-            self, "Load Scene", "", "JSON Files (*.json)"
+            self, "Load Scene", "", "Scene Files (*.json *.json.gz)"
         )  # [8027]
         if filename:
-            self.overlay.load_scene(filename, join=False)  # [8028]
+            self.overlay.load_scene_async(filename, join=False)  # [8028]
+
+    @Slot(int)
+    def scene_slot_action(self, index):
+        if self.overlay.scene_slots.path(index):
+            self.overlay.switch_to_scene_slot(index)
+        else:
+            self.assign_scene_slot_action(index)
+
+    @Slot(int)
+    def assign_scene_slot_action(self, index):
+        filename, _ = QFileDialog.getOpenFileName(
+            self,
+            f"Assign Scene to Slot {index + 1}",
+            os.path.dirname(self.overlay.scene_slots.path(index) or ""),
+            "Scene Files (*.json *.json.gz)",
+        )
+        if filename:
+            self.overlay.assign_scene_slot(index, filename)
+
+    def show_scene_slot_menu(self, index, pos):
+        button = self.scene_slot_buttons[index]
+        menu = QMenu(button)
+        assign_action = menu.addAction("Assign Scene...")
+        clear_action = menu.addAction("Clear Slot")
+        clear_action.setEnabled(bool(self.overlay.scene_slots.path(index)))
+        chosen = menu.exec(button.mapToGlobal(pos))
+        if chosen is assign_action:
+            self.assign_scene_slot_action(index)
+        elif chosen is clear_action:
+            self.overlay.assign_scene_slot(index, None)
+
+    @Slot(int)
+    def update_scene_slot_button(self, index):
+        button = self.scene_slot_buttons[index]
+        path = self.overlay.scene_slots.path(index)
+        status = self.overlay.scene_slots.status(index)
+        hint = f"Slot {index + 1} (Ctrl+Alt+{index + 1})"
+        if path:
+            button.setToolTip(f"{hint}: {os.path.basename(path)} [{status}]")
+        else:
+            button.setToolTip(f"{hint}: empty - click to assign a scene")
+        button.setFlat(status == "empty")
+        font = button.font()
+        font.setItalic(status in ("loading", "error"))
+        button.setFont(font)
 
     @Slot()  # [8029]
     def load_and_join_scene_action(self):  # [8030]
@@ -19586,42 +23457,66 @@ class ControlPanel(QDockWidget):
             ),
         )  # [8031]
         filenames, _ = QFileDialog.getOpenFileNames(
-            self, "Load & Join Scene(s)", last_dir, "JSON Files (*.json)"
+            self, "Load & Join Scene(s)", last_dir, "Scene Files (*.json *.json.gz)"
         )  # [8032]
         if filenames:  # [8033]
             self.settings.setValue(
                 "paths/lastLoadJoinDir", os.path.dirname(filenames[0])
             )  # [8034]
-            total_loaded = 0
             shapes_before_join = deepcopy(self.overlay.shapes)
             selection_before_join = deepcopy(self.overlay.selected_shapes)  # [8035]
-            initial_load_join_saved = False  # [8036]
-            for filename in filenames:  # [8037]
-                loaded_count = self.overlay.load_scene(filename, join=True)  # [8038]
-                if loaded_count > 0 and not initial_load_join_saved:  # [8039]
+            join_state = {"total_loaded": 0, "initial_load_join_saved": False}  # [8036]
+            pending_filenames = list(filenames)
+
+            # Files are loaded one after another in the background; each
+            # finished load starts the next one.
+            def load_next_file(loaded_count=0, cancelled=False):  # [8037]
+                if (
+                    loaded_count > 0 and not join_state["initial_load_join_saved"]
+                ):  # [8039]
                     self.overlay.save_state(
                         "load_join",
                         all_shapes_before=shapes_before_join,
                         selected_shapes_before=selection_before_join,
                         previous_geometries=0,
                     )  # [8040]
-                    initial_load_join_saved = True  # [8041]
-                total_loaded += loaded_count  # [8042]
-            if (
-                total_loaded > 0
-                and self.overlay.undo_stack
-                and self.overlay.undo_stack[-1]["action"] == "load_join"
-            ):  # [8043]
-                self.overlay.undo_stack[-1]["action_data"]["load_join_count"] = (
-                    total_loaded  # [8044]
-                )
-                print(
-                    f"Joined a total of {total_loaded} shapes from {len(filenames)} file(s)."
-                )  # [8045]
-            else:
-                print(
-                    "No shapes loaded from selected file(s) or undo stack inconsistent."
-                )  # [8046]
+                    join_state["initial_load_join_saved"] = True  # [8041]
+                join_state["total_loaded"] += loaded_count  # [8042]
+
+                if pending_filenames and not cancelled:
+                    filename = pending_filenames.pop(0)
+                    # A load that cannot start has already ended the join
+                    # through its on_finished call.
+                    if not self.overlay.load_scene_async(
+                        filename,
+                        join=True,
+                        on_finished=load_next_file,
+                    ):  # [8038]
+                        skipped = len(pending_filenames) + 1
+                        print(
+                            f"Load & Join stopped before {filename}; {skipped} "
+                            "file(s) were not joined."
+                        )
+                    return
+
+                total_loaded = join_state["total_loaded"]
+                if (
+                    total_loaded > 0
+                    and self.overlay.undo_stack
+                    and self.overlay.undo_stack[-1]["action"] == "load_join"
+                ):  # [8043]
+                    self.overlay.undo_stack[-1]["action_data"]["load_join_count"] = (
+                        total_loaded  # [8044]
+                    )
+                    print(
+                        f"Joined a total of {total_loaded} shapes from {len(filenames)} file(s)."
+                    )  # [8045]
+                else:
+                    print(
+                        "No shapes loaded from selected file(s) or undo stack inconsistent."
+                    )  # [8046]
+
+            load_next_file()
         else:
             print("Load & Join cancelled.")  # [8047]
 
@@ -19645,9 +23540,15 @@ class ControlPanel(QDockWidget):
         else:
             print("Background image load cancelled.")  # [8053]
 
-    def toggle_shortcuts_window(self, force_reset=False):  # [8054]
+    def prepare_shortcuts_window(self):
+        """Builds the shortcuts window ahead of its first use."""
         if self.shortcuts_window is None:
             self.shortcuts_window = ShortcutsWindow(self, self.settings)
+
+    def toggle_shortcuts_window(self, force_reset=False):  # [8054]
+        if not self._shortcuts_window_shown:
+            self.prepare_shortcuts_window()
+            self._shortcuts_window_shown = True
             force_reset = True  # [8055]
         if not self.shortcuts_window.isVisible():  # [8056]
             if (
@@ -20184,7 +24085,10 @@ class ControlPanel(QDockWidget):
             ),
         )  # [8288]
         filenames, _ = QFileDialog.getOpenFileNames(
-            self, "Select Scene Files for Animation", last_dir, "JSON Files (*.json)"
+            self,
+            "Select Scene Files for Animation",
+            last_dir,
+            "Scene Files (*.json *.json.gz)",
         )  # [8289]
         if not filenames:
             print("Animation setup cancelled: No files selected.")
@@ -20217,31 +24121,28 @@ class ControlPanel(QDockWidget):
             )
             traceback.print_exc()  # [8301]
 
-    def start_animation_playback(self):  # [8302]
+    def start_animation_playback(self, prerendered=False):  # [8302]
         if not self._animation_scenes:  # [8303]
             QMessageBox.warning(
                 self, "Animation Error", "No scenes selected for animation."
             )  # [8304]
             return  # [8305]
         self.clear_all_previewed_animation_scenes()  # [8306]
+        if self._animation_params.get("prerender") and not prerendered:
+            self._prerender_animation_frames()
+            return
         print("Starting animation playback...")  # [8307]
+        self._animation_show_times = []
+        self._animation_frames_shown = 0
         self._animation_running = True  # [8308]
         self._animation_paused = False  # [8309]
         self._animation_current_index = -1  # [8310]
         self._animation_direction = 1  # [8311]
         self._pingpong_returning = False  # [8312]
 
-        for (
-            timer_start,
-            timer_clear,
-            _,
-            _,
-        ) in self._animation_individual_scene_timers:  # [8313]
-            timer_start.stop()  # [8314]
-            timer_clear.stop()  # [8315]
-            timer_start.deleteLater()  # [8316]
-            timer_clear.deleteLater()  # [8317]
-        self._animation_individual_scene_timers = []  # [8318]
+        self._animation_scheduler.start()  # [8313]
+        self._animation_individual_scene_tags.clear()  # [8318]
+        self._animation_sequence_finished = False
 
         if (
             self._animation_params["play_back"]
@@ -20270,65 +24171,262 @@ class ControlPanel(QDockWidget):
         if self._animation_params.get("time_mode_auto", True):  # [8332]
             self._animation_timer_step.start(start_delay_ms)  # [8333]
         else:  # [8334]
+            # Manual mode: every timed scene and the sequential steps run from
+            # one scheduler, with deadlines counted from the playback start.
+            start_delay = self._animation_params["start_delay"]
             for i, scene_data in enumerate(self._animation_scenes):  # [8335]
                 if (
                     scene_data.get("include_in_animation", True)
                     and scene_data.get("individual_start_time", 0.0) > 0
                 ):  # [8336]
-                    individual_start_delay_ms = (
-                        int(scene_data["individual_start_time"] * 1000) + start_delay_ms
+                    individual_start_delay = (
+                        scene_data["individual_start_time"] + start_delay
                     )  # [8337]
                     tag = f"anim_scene_ind_{i}_{uuid.uuid4().hex[:8]}"  # [8338]
                     print(
-                        f"  Scheduling individual scene '{os.path.basename(scene_data['filepath'])}' in {individual_start_delay_ms}ms (tag: {tag})"
+                        f"  Scheduling individual scene '{os.path.basename(scene_data['filepath'])}' in {int(individual_start_delay * 1000)}ms (tag: {tag})"
                     )  # [8339]
+                    self._animation_scheduler.schedule_at(
+                        individual_start_delay,
+                        self._animation_load_individual_scene,
+                        i,
+                        scene_data,
+                        tag,
+                    )  # [8346]
+                    self._animation_individual_scene_tags.add(tag)  # [8352]
+
+            self._animation_scheduler.schedule_at(
+                start_delay, self._animation_step_manual_mode
+            )  # [8353]
 
-                    start_timer = QTimer(self)  # [8340]
-                    start_timer.setSingleShot(True)  # [8341]
-                    start_timer.setProperty("scene_data", scene_data)  # [8342]
-                    start_timer.setProperty("animation_tag", tag)  # [8343]
-                    start_timer.setProperty("scene_index", i)  # [8344]
-                    start_timer.timeout.connect(
-                        self._animation_load_individual_scene
-                    )  # [8345]
-                    start_timer.start(individual_start_delay_ms)  # [8346]
-
-                    clear_timer = QTimer(self)  # [8347]
-                    clear_timer.setSingleShot(True)  # [8348]
-                    clear_timer.setProperty("animation_tag_to_clear", tag)  # [8349]
-                    clear_timer.setProperty(
-                        "clear_after_flag", scene_data.get("clear_after", False)
-                    )  # [8350]
-                    clear_timer.timeout.connect(
-                        self._animation_clear_individual_scene
-                    )  # [8351]
-
-                    self._animation_individual_scene_timers.append(
-                        (
-                            start_timer,
-                            clear_timer,
-                            tag,
-                            scene_data.get("clear_after", False),
-                        )
-                    )  # [8352]
+    def _animation_frame_geometry(self):
+        return (
+            self.overlay.width(),
+            self.overlay.height(),
+            self.overlay.devicePixelRatioF(),
+        )
 
-            QTimer.singleShot(
-                start_delay_ms, self._animation_step_manual_mode
-            )  # [8353]
+    def _prerender_animation_frames(self):
+        """
+        Renders the included scenes to frames on the render thread, showing
+        progress, then starts playback. Skipping starts playback at once;
+        scenes without a frame are then loaded as shapes.
+        """
+        cache = self.overlay.animation_frame_cache
+        cache.set_max_bytes(
+            self._animation_params.get(
+                "frame_cache_mb", ANIMATION_FRAME_CACHE_DEFAULT_MB
+            )
+            * 1024
+            * 1024
+        )
+        paths = [
+            scene_data["filepath"]
+            for scene_data in self._animation_scenes
+            if scene_data.get("include_in_animation", True)
+        ]
+        queued = cache.request(paths, *self._animation_frame_geometry())
+        if not queued:
+            self.start_animation_playback(prerendered=True)
+            return
+
+        print(f"Pre-rendering {queued} animation frames...")
+        progress = QProgressDialog(
+            "Pre-rendering animation frames...", "Skip", 0, queued, self
+        )
+        progress.setWindowTitle("Animation")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.canceled.connect(self._skip_animation_prerender)
+        self._animation_prerender_job = {
+            "queued": queued,
+            "done": 0,
+            "progress": progress,
+            "started": time.perf_counter(),
+        }
+        self._animation_frame_poll_timer.start()
+
+    def _poll_animation_prerender(self):
+        job = self._animation_prerender_job
+        if job is None:
+            self._animation_frame_poll_timer.stop()
+            return
+        job["done"] += self.overlay.animation_frame_cache.poll()
+        job["progress"].setValue(min(job["done"], job["queued"]))
+        if job["done"] >= job["queued"]:
+            print(
+                f"Pre-rendered {job['queued']} frames in {time.perf_counter() - job['started']:.2f} s."
+            )
+            self._end_animation_prerender()
+
+    @Slot()
+    def _skip_animation_prerender(self):
+        if self._animation_prerender_job is None:
+            return
+        print("Pre-rendering skipped; scenes without a frame are drawn as shapes.")
+        self.overlay.animation_frame_cache.cancel()
+        self.overlay.animation_frame_cache.poll()
+        self._end_animation_prerender()
+
+    def _end_animation_prerender(self):
+        job = self._animation_prerender_job
+        self._animation_prerender_job = None
+        self._animation_frame_poll_timer.stop()
+        progress = job["progress"]
+        progress.canceled.disconnect(self._skip_animation_prerender)
+        progress.close()
+        progress.deleteLater()
+        self.start_animation_playback(prerendered=True)
+
+    def export_animation(self, params, scenes, parent=None):
+        """
+        Exports the configured sequence to a file without playing it, with
+        progress shown in a dialog that can cancel the export.
+        """
+        parent = parent or self
+        if self._animation_export is not None:
+            QMessageBox.information(
+                parent, "Export Animation", "An animation export is already running."
+            )
+            return
+        scene_size = (self.overlay.width(), self.overlay.height())
+        dialog = AnimationExportDialog(scene_size, params["mode"] == "BOARD", parent)
+        if not dialog.exec():
+            return
+        options = dialog.get_options()
+        last_dir = self.settings.value(
+            "paths/lastAnimExportDir",
+            QStandardPaths.writableLocation(
+                QStandardPaths.StandardLocation.DocumentsLocation
+            ),
+        )
+        extension = ".gif" if options["format"] == "gif" else ".png"
+        path, _ = QFileDialog.getSaveFileName(
+            parent,
+            "Export Animation",
+            os.path.join(last_dir, "animation" + extension),
+            options["file_filter"],
+        )
+        if not path:
+            return
+        self.settings.setValue("paths/lastAnimExportDir", os.path.dirname(path))
+        options["path"] = path
+        options["scene_size"] = scene_size
+        options["background"] = (
+            QColor(self.overlay.board_background_color)
+            if options.pop("board_background")
+            else None
+        )
+        exporter = AnimationExporter(
+            self.overlay.render_scene_image, params, scenes, options
+        )
+        if not exporter.runs:
+            QMessageBox.warning(
+                parent, "Export Animation", "No scenes are included in the animation."
+            )
+            return
+
+        print(
+            f"Exporting animation to {path}: {exporter.total_frames} frames "
+            f"({len(exporter.runs)} distinct), {exporter.pixel_width}x{exporter.pixel_height} "
+            f"at {exporter.fps} fps"
+        )
+        progress = QProgressDialog(
+            "Exporting animation...", "Cancel", 0, exporter.total_frames, parent
+        )
+        progress.setWindowTitle("Export Animation")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.canceled.connect(exporter.cancel)
+        self._animation_export = exporter
+        self._animation_export_progress = progress
+        self._animation_export_started = time.perf_counter()
+        exporter.start()
+        self._animation_export_poll_timer.start()
+
+    def _poll_animation_export(self):
+        exporter = self._animation_export
+        if exporter is None:
+            self._animation_export_poll_timer.stop()
+            return
+        finished = exporter.poll()
+        progress = self._animation_export_progress
+        if not finished:
+            progress.setValue(exporter.frames_written)
+            return
+
+        self._animation_export_poll_timer.stop()
+        self._animation_export = None
+        self._animation_export_progress = None
+        progress.canceled.disconnect(exporter.cancel)
+        progress.close()
+        progress.deleteLater()
+        if exporter.error:
+            QMessageBox.critical(
+                self.window(),
+                "Export Animation",
+                f"Could not export the animation:\n{exporter.error}",
+            )
+        elif exporter.cancelled:
+            print("Animation export cancelled.")
+        else:
+            print(
+                f"Exported {exporter.total_frames} frames to {exporter.path} in "
+                f"{time.perf_counter() - self._animation_export_started:.2f} s "
+                f"(encoded on {exporter.pool_kind})."
+            )
+
+    def _animation_show_scene(self, scene_path, animation_tag):
+        """
+        Shows one animation scene: as its pre-rendered frame when there is
+        one, otherwise by loading its shapes. Records how long it took.
+        """
+        start = time.perf_counter()
+        frame = None
+        if self._animation_params.get("prerender"):
+            frame = self.overlay.animation_frame_cache.get(
+                scene_path, *self._animation_frame_geometry()
+            )
+        if frame is not None:
+            self.overlay.show_animation_frame(animation_tag, frame)
+            self._animation_frames_shown += 1
+        else:
+            self.overlay.load_scene(
+                scene_path, join=True, animation_tag=animation_tag
+            )
+        QApplication.processEvents()
+        self._animation_show_times.append(time.perf_counter() - start)
+
+    def _update_animation_report(self):
+        """Summarises timing and frame memory of the playback that just ended."""
+        lines = []
+        show_times = self._animation_show_times
+        if show_times:
+            lines.append(
+                f"{len(show_times)} scenes shown ({self._animation_frames_shown} from frames), "
+                f"show time mean {sum(show_times) / len(show_times) * 1000:.1f} ms, "
+                f"max {max(show_times) * 1000:.1f} ms"
+            )
+        if not self._animation_params.get("time_mode_auto", True):
+            lines.append(f"Scheduler: {self._animation_scheduler.drift_report()}")
+        if self._animation_params.get("prerender"):
+            stats = self.overlay.animation_frame_cache.stats()
+            lines.append(
+                f"Frames: {stats['frames']} cached, {stats['bytes'] / 1048576:.0f} of "
+                f"{stats['max_bytes'] / 1048576:.0f} MB, {stats['evictions']} evicted, "
+                f"render {stats['mean_render_seconds'] * 1000:.0f} ms/frame"
+            )
+        self.animation_report = "\n".join(lines)
+        if self.animation_report:
+            print(f"Animation report:\n{self.animation_report}")
 
-    def _animation_load_individual_scene(self):  # [8354]
+    def _animation_load_individual_scene(
+        self, scene_idx, scene_data, animation_tag
+    ):  # [8354]
         """Loads a single scene with an individual start time."""  # [8355]
         if not self._animation_running or self._animation_paused:  # [8356]
             return  # [8357]
 
-        start_timer = self.sender()  # [8358]
-        if not start_timer:
-            return  # [8359]
-
-        scene_data = start_timer.property("scene_data")  # [8360]
-        animation_tag = start_timer.property("animation_tag")  # [8361]
-        scene_idx = start_timer.property("scene_index")  # [8362]
-
         print(
             f"Animation: Loading individual scene {scene_idx + 1} ('{os.path.basename(scene_data['filepath'])}', tag: {animation_tag})"
         )  # [8363]
@@ -20347,43 +24445,27 @@ class ControlPanel(QDockWidget):
         elif not self.overlay.drawing_mode:  # [8372]
             self.overlay.set_drawing_mode(True)  # [8373]
 
-        self.overlay.load_scene(
-            scene_data["filepath"], join=True, animation_tag=animation_tag
-        )  # [8374]
-        QApplication.processEvents()  # [8375]
+        self._animation_show_scene(scene_data["filepath"], animation_tag)  # [8374]
 
         display_time = (
             scene_data["display_time"]
             if scene_data["display_time"] > 0
             else self._animation_params["default_time"]
         )  # [8376]
-        display_time_ms = int(display_time * 1000)  # [8377]
-
-        clear_timer_for_scene = None  # [8378]
-        for st, ct, tag, caf in self._animation_individual_scene_timers:  # [8379]
-            if tag == animation_tag:  # [8380]
-                clear_timer_for_scene = ct  # [8381]
-                break  # [8382]
-
-        if clear_timer_for_scene:  # [8383]
-            clear_timer_for_scene.start(display_time_ms)  # [8384]
-        else:  # [8385]
-            print(
-                f"Error: Could not find clear timer for individual scene tag {animation_tag}"
-            )  # [8386]
-
-    def _animation_clear_individual_scene(self):  # [8387]
+        self._animation_scheduler.schedule_after(
+            display_time,
+            self._animation_clear_individual_scene,
+            animation_tag,
+            scene_data.get("clear_after", False),
+        )  # [8384]
+
+    def _animation_clear_individual_scene(
+        self, tag_to_clear, clear_after_this_scene
+    ):  # [8387]
         """Clears shapes for a single scene with individual timing."""  # [8388]
         if not self._animation_running or self._animation_paused:  # [8389]
             return  # [8390]
 
-        clear_timer = self.sender()  # [8391]
-        if not clear_timer:
-            return  # [8392]
-
-        tag_to_clear = clear_timer.property("animation_tag_to_clear")  # [8393]
-        clear_after_this_scene = clear_timer.property("clear_after_flag")  # [8394]
-
         if clear_after_this_scene:  # [8395]
             if tag_to_clear:  # [8396]
                 print(
@@ -20392,14 +24474,10 @@ class ControlPanel(QDockWidget):
                 self.overlay.remove_shapes_by_animation_tag(tag_to_clear)  # [8398]
                 QApplication.processEvents()  # [8399]
 
-        for i, (st, ct, tag, _) in enumerate(
-            self._animation_individual_scene_timers
-        ):  # [8400]
-            if tag == tag_to_clear:  # [8401]
-                st.deleteLater()  # [8402]
-                ct.deleteLater()  # [8403]
-                del self._animation_individual_scene_timers[i]  # [8404]
-                break  # [8405]
+        self._animation_individual_scene_tags.discard(tag_to_clear)  # [8404]
+        if self._animation_sequence_finished and not self._animation_individual_scene_tags:
+            print("Animation sequence (manual mode) finished.")
+            self.stop_animation_playback(triggered_by_escape=False)
 
     def _animation_step_manual_mode(self):  # [8406]
         """Handles sequential animation step in manual mode (only scenes with start time = 0)."""  # [8407]
@@ -20517,7 +24595,8 @@ class ControlPanel(QDockWidget):
                 break  # [8463]
 
         if is_finished_sequential or next_sequential_index == -1:  # [8464]
-            if not self._animation_individual_scene_timers:  # [8465]
+            self._animation_sequence_finished = True
+            if not self._animation_individual_scene_tags:  # [8465]
                 print("Animation sequence (manual mode) finished.")  # [8466]
                 self.stop_animation_playback(triggered_by_escape=False)  # [8467]
             return  # [8468]
@@ -20547,26 +24626,35 @@ class ControlPanel(QDockWidget):
             self.overlay.set_drawing_mode(True)  # [8481]
 
         current_animation_tag = f"anim_scene_seq_{self._animation_current_index}_{uuid.uuid4().hex[:8]}"  # [8482]
-        self.overlay.load_scene(
-            scene_path, join=True, animation_tag=current_animation_tag
-        )  # [8483]
-        QApplication.processEvents()  # [8484]
+        self._animation_show_scene(scene_path, current_animation_tag)  # [8483]
 
         display_time = (
             current_scene_data["display_time"]
             if current_scene_data["display_time"] > 0
             else self._animation_params["default_time"]
         )  # [8485]
-        display_time_ms = int(display_time * 1000)  # [8486]
+        self._animation_scheduler.schedule_after(
+            display_time,
+            self._animation_clear_manual_sequential_scene,
+            current_animation_tag,
+            current_scene_data.get("clear_after", False),
+        )  # [8490]
+
+    def _animation_clear_manual_sequential_scene(
+        self, tag_to_clear, clear_after_this_scene
+    ):
+        """Clears a sequential scene in manual mode and moves on to the next one."""
+        if not self._animation_running or self._animation_paused:
+            return
 
-        self._animation_timer_clear.setProperty(
-            "animation_tag_to_clear", current_animation_tag
-        )  # [8487]
-        self._animation_timer_clear.setProperty(
-            "clear_after_flag", current_scene_data.get("clear_after", False)
-        )  # [8488]
-        self._animation_timer_clear.setProperty("is_manual_sequential", True)  # [8489]
-        self._animation_timer_clear.start(display_time_ms)  # [8490]
+        if clear_after_this_scene and tag_to_clear:
+            print(
+                f"Animation: Clearing shapes with tag '{tag_to_clear}' (Clr?={clear_after_this_scene})"
+            )
+            self.overlay.remove_shapes_by_animation_tag(tag_to_clear)
+            QApplication.processEvents()
+
+        self._animation_step_manual_mode()
 
     def _animation_step(self):  # [8491]
         if not self._animation_running or self._animation_paused:  # [8492]
@@ -20686,10 +24774,9 @@ class ControlPanel(QDockWidget):
                         self.overlay.set_drawing_mode(True)  # [8569]
 
                     current_animation_tag = f"anim_scene_{self._animation_current_index}_{uuid.uuid4().hex[:8]}"  # [8570]
-                    self.overlay.load_scene(
-                        scene_path, join=True, animation_tag=current_animation_tag
+                    self._animation_show_scene(
+                        scene_path, current_animation_tag
                     )  # [8571]
-                    QApplication.processEvents()  # [8572]
 
                     display_time = self._animation_params["default_time"]  # [8573]
                     if not self._animation_params.get("time_mode_auto", True):  # [8574]
@@ -20706,9 +24793,6 @@ class ControlPanel(QDockWidget):
                     self._animation_timer_clear.setProperty(
                         "clear_after_flag", current_scene_data.get("clear_after", False)
                     )  # [8578]
-                    self._animation_timer_clear.setProperty(
-                        "is_manual_sequential", False
-                    )  # [8579]
                     self._animation_timer_clear.start(display_time_ms)  # [8580]
             except Exception as e:  # [8581]
                 print(f"Error during animation step: {e}")
@@ -20729,9 +24813,6 @@ class ControlPanel(QDockWidget):
         clear_after_this_scene = self._animation_timer_clear.property(
             "clear_after_flag"
         )  # [8589]
-        is_manual_seq_step = self._animation_timer_clear.property(
-            "is_manual_sequential"
-        )  # [8590]
 
         if clear_after_this_scene:  # [8591]
             if tag_to_clear:  # [8592]
@@ -20741,9 +24822,7 @@ class ControlPanel(QDockWidget):
                 self.overlay.remove_shapes_by_animation_tag(tag_to_clear)  # [8594]
                 QApplication.processEvents()  # [8595]
 
-        if (
-            self._animation_params.get("time_mode_auto", True) or is_manual_seq_step
-        ):  # [8596]
+        if self._animation_params.get("time_mode_auto", True):  # [8596]
             current_scene_data = self._animation_scenes[
                 self._animation_current_index
             ]  # [8597]
@@ -20758,11 +24837,7 @@ class ControlPanel(QDockWidget):
                     )  # [8601]
 
             interval_ms = int(max(1, interval_ms))  # [8602]
-
-            if is_manual_seq_step:  # [8603]
-                self._animation_step_manual_mode()  # [8604]
-            else:  # [8605]
-                self._animation_timer_step.start(interval_ms)  # [8606]
+            self._animation_timer_step.start(interval_ms)  # [8606]
 
     @Slot()  # [8607]
     def _remove_persisted_shapes(self):  # [8608]
@@ -20797,17 +24872,12 @@ class ControlPanel(QDockWidget):
         self._animation_timer_step.stop()
         self._animation_timer_clear.stop()  # [8624]
 
-        for (
-            timer_start,
-            timer_clear,
-            _,
-            _,
-        ) in self._animation_individual_scene_timers:  # [8625]
-            timer_start.stop()
-            timer_start.deleteLater()  # [8626]
-            timer_clear.stop()
-            timer_clear.deleteLater()  # [8627]
-        self._animation_individual_scene_timers = []  # [8628]
+        self._update_animation_report()
+        self._animation_scheduler.clear()  # [8626]
+        self._animation_individual_scene_tags.clear()  # [8628]
+        if self.overlay.animation_frames:
+            self.overlay.animation_frames.clear()
+            self.overlay.update()
 
         if triggered_by_escape:  # [8629]
             print("Clearing last scene due to Esc.")  # [8630]
@@ -20874,6 +24944,7 @@ class ShortcutsWindow(QDialog):  # [8640]
                 ("Alt+Shift+F2", "Toggle Snap to Grid Mode"),  # [8668]
                 ("Alt+Shift+F3", "Toggle Snap to All Shapes Mode"),  # [8669]
                 ("Alt+Shift+F4", "Turn Snap OFF"),  # New hotkey # [8670]
+                ("Ctrl+Alt+1..9", "Switch to Scene Slot 1-9 (Global Hotkey)"),
             ],  # [8671]
             "Tools": [  # [8672]
                 ("A", "Arrow Tool"),  # [8673] # Change 2
@@ -20938,7 +25009,14 @@ class ShortcutsWindow(QDialog):  # [8640]
                     "TEMP Button / Alt+Shift+\\",
                     "Enter Temporary Drawing Mode",
                 ),  # [8716]
-                ("Shift+PrtSc", "Save Screenshot (JPG/PNG) (Global Hotkey)"),  # [8717]
+                (
+                    "Shift+PrtSc",
+                    "Save Screenshot: Region, Screen, All Screens or Selection (Global Hotkey)",
+                ),  # [8717]
+                (
+                    "Ctrl+Shift+PrtSc",
+                    "Burst Screenshot to Last Folder (Global Hotkey)",
+                ),
             ],  # [8718]
             "Edit & Undo": [  # [8719]
                 ("Ctrl+Z", "Undo"),  # [8720]
@@ -21187,7 +25265,7 @@ class ShortcutsWindow(QDialog):  # [8640]
         print_button.setSizePolicy(
             QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Fixed
         )  # [8836]
-        if not _QT_PRINT_SUPPORT_AVAILABLE:
+        if not _qt_print_support.installed():
             print_button.setEnabled(False)
             print_button.setToolTip("Printing requires QtPrintSupport")  # [8837]
         else:
@@ -21284,7 +25362,8 @@ class ShortcutsWindow(QDialog):  # [8640]
 
     @Slot()  # [8879]
     def print_shortcuts(self):  # [8880]
-        if not _QT_PRINT_SUPPORT_AVAILABLE:
+        print_support = _qt_print_support.load()
+        if print_support is None:
             QMessageBox.warning(
                 self, "Printing Unavailable", "QtPrintSupport not found."
             )
@@ -21292,8 +25371,10 @@ class ShortcutsWindow(QDialog):  # [8640]
         html_content = self.get_shortcuts_html()
         doc = QTextDocument()
         doc.setHtml(html_content)  # [8882]
-        printer = QPrinter(QPrinter.PrinterMode.HighResolution)
-        dialog = QPrintDialog(printer, self)
+        printer = print_support.QPrinter(
+            print_support.QPrinter.PrinterMode.HighResolution
+        )
+        dialog = print_support.QPrintDialog(printer, self)
         dialog.setWindowTitle("Print Shortcuts")  # [8883]
         if dialog.exec() == QDialog.DialogCode.Accepted:  # [8884]
             try:  # [8885]
@@ -21307,15 +25388,307 @@ class ShortcutsWindow(QDialog):  # [8640]
             print("Printing cancelled.")  # [8890]
 
 
+class ScriptServer:
+    """
+    Local socket through which other programs drive the overlay.
+
+    Clients send one JSON command per line, with shapes in the Shape.to_dict
+    format:
+        {"cmd": "add", "id": 1, "tag": "probe", "shapes": [{...}, ...]}
+        {"cmd": "remove", "tag": "probe"}
+        {"cmd": "clear", "undo": false}
+        {"cmd": "load", "path": "scene.json", "join": true, "tag": "probe"}
+        {"cmd": "mode", "mode": "draw" | "edit" | "board" | "temp" | "off"}
+        {"cmd": "ping"}
+    A worker thread parses the lines and builds the Shape objects. The GUI
+    thread commits the results in order within a time slice per tick; the
+    shapes of consecutive "add" commands are added in one step and their
+    area is repainted once. Commands with an "id" are answered with a JSON
+    line {"id": ..., "ok": true, ...} once they took effect, errors are
+    always answered. While too many lines wait for the GUI thread, reading
+    from the clients pauses, so a fast sender is slowed down by the socket
+    instead of piling up memory.
+    """
+
+    COMMANDS = ("add", "remove", "clear", "load", "mode", "ping")
+    MODES = ("draw", "edit", "board", "temp", "off")
+
+    def __init__(self, overlay):
+        self.overlay = overlay
+        self.name = None
+        self._server = None
+        self._clients = {}
+        self._client_ids = itertools.count(1)
+        self._pending = 0
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = None
+        self._timer = QTimer()
+        self._timer.setInterval(SCRIPT_POLL_MS)
+        self._timer.timeout.connect(self.poll)
+
+    def start(self, name=SCRIPT_SOCKET_NAME):
+        """Starts listening on the local socket; returns False if it failed."""
+        qt_network = _qt_network.load()
+        if qt_network is None:
+            return False
+        server = qt_network.QLocalServer()
+        server.setSocketOptions(
+            qt_network.QLocalServer.SocketOption.UserAccessOption
+        )
+        if not server.listen(name):
+            # A socket file left behind by a crashed instance blocks listen().
+            qt_network.QLocalServer.removeServer(name)
+            if not server.listen(name):
+                print(f"Scripting socket '{name}' failed: {server.errorString()}")
+                return False
+        server.newConnection.connect(self._accept)
+        self._server = server
+        self.name = name
+        self._thread = threading.Thread(
+            target=self._run, name="ScriptServer", daemon=True
+        )
+        self._thread.start()
+        self._timer.start()
+        print(f"Scripting socket listening on {server.fullServerName()}")
+        return True
+
+    def close(self):
+        """Stops listening, disconnects the clients and ends the worker."""
+        self._timer.stop()
+        if self._server is None:
+            return
+        for client in list(self._clients.values()):
+            client["socket"].abort()
+        self._clients.clear()
+        self._server.close()
+        self._server = None
+        self._jobs.put(None)
+        self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def _accept(self):
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            socket.setReadBufferSize(SCRIPT_READ_BUFFER_BYTES)
+            client = {"id": next(self._client_ids), "socket": socket, "buffer": b""}
+            self._clients[client["id"]] = client
+            socket.readyRead.connect(lambda client=client: self._read(client))
+            socket.disconnected.connect(lambda client=client: self._drop(client))
+
+    def _drop(self, client):
+        if self._clients.pop(client["id"], None) is not None:
+            client["socket"].deleteLater()
+
+    def _read(self, client):
+        """Splits what a client sent into lines and queues them for the worker."""
+        if self._pending >= SCRIPT_MAX_PENDING_LINES:
+            return
+        data = client["buffer"] + client["socket"].readAll().data()
+        lines = data.split(b"\n")
+        client["buffer"] = lines.pop()
+        for line in lines:
+            if line.strip():
+                self._jobs.put((client["id"], line))
+                self._pending += 1
+
+    def _run(self):
+        """Worker thread: parses command lines and builds shapes."""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            client_id, line = job
+            try:
+                command = self._parse(line)
+            except Exception as e:
+                command = {"error": f"{type(e).__name__}: {e}"}
+            self._results.put((client_id, command))
+
+    def _parse(self, line):
+        try:
+            command = json.loads(line)
+        except ValueError as e:
+            return {"error": f"invalid JSON: {e}"}
+        if not isinstance(command, dict):
+            return {"error": "a command must be a JSON object"}
+        name = command.get("cmd")
+        if name not in self.COMMANDS:
+            return {"id": command.get("id"), "error": f"unknown command {name!r}"}
+        if name == "add":
+            shape_dicts = command.pop("shapes", None)
+            if shape_dicts is None and "shape" in command:
+                shape_dicts = [command.pop("shape")]
+            if not isinstance(shape_dicts, list):
+                return {"id": command.get("id"), "error": "add needs a shapes list"}
+            tag = command.get("tag")
+            shapes = []
+            for shape_data in shape_dicts:
+                shape = None
+                if isinstance(shape_data, dict):
+                    shape = Shape.from_dict(shape_data)
+                if shape:
+                    if tag:
+                        shape.animation_tag = tag
+                    shapes.append(shape)
+            command["shapes"] = shapes
+            command["skipped"] = len(shape_dicts) - len(shapes)
+        return command
+
+    def poll(self):
+        """Commits parsed commands in order for at most one time slice."""
+        deadline = time.perf_counter() + SCRIPT_COMMIT_SLICE_SECONDS
+        added = []
+        acks = []
+        while time.perf_counter() < deadline:
+            try:
+                client_id, command = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if command.get("cmd") == "add" and "error" not in command:
+                added.extend(command["shapes"])
+                acks.append((client_id, command))
+                continue
+            if added:
+                self._commit_shapes(added, acks)
+                added = []
+                acks = []
+            if "error" in command:
+                self._reply(client_id, command.get("id"), error=command["error"])
+                continue
+            try:
+                self._execute(client_id, command)
+            except Exception as e:
+                traceback.print_exc()
+                self._reply(
+                    client_id, command.get("id"), error=f"{type(e).__name__}: {e}"
+                )
+        if added:
+            self._commit_shapes(added, acks)
+        if self._pending < SCRIPT_MAX_PENDING_LINES:
+            for client in list(self._clients.values()):
+                if client["socket"].bytesAvailable():
+                    self._read(client)
+
+    def _commit_shapes(self, shapes, acks):
+        """Adds the shapes of several "add" commands with one repaint."""
+        overlay = self.overlay
+        overlay.shapes.extend(shapes)
+        if overlay.temp_mode:
+            for shape in shapes:
+                overlay.schedule_shape_removal(shape)
+        if len(shapes) > SCRIPT_FULL_REPAINT_SHAPES:
+            overlay.update()
+        else:
+            dirty = QRect()
+            for shape in shapes:
+                rect = overlay._get_shape_repaint_rect(shape)
+                if rect is not None:
+                    dirty = dirty.united(rect)
+            if not dirty.isEmpty():
+                overlay.update(dirty)
+        if shapes:
+            overlay._autosave_touch()
+        for client_id, command in acks:
+            self._reply(
+                client_id,
+                command.get("id"),
+                added=len(command["shapes"]),
+                skipped=command["skipped"],
+            )
+
+    def _execute(self, client_id, command):
+        overlay = self.overlay
+        name = command["cmd"]
+        command_id = command.get("id")
+        if name == "remove":
+            tag = command.get("tag")
+            if not tag:
+                self._reply(client_id, command_id, error="remove needs a tag")
+                return
+            count = len(overlay.shapes)
+            overlay.remove_shapes_by_animation_tag(tag)
+            if len(overlay.shapes) != count:
+                overlay._autosave_touch()
+            self._reply(client_id, command_id, removed=count - len(overlay.shapes))
+        elif name == "clear":
+            overlay.clear_scene(save_undo=bool(command.get("undo", True)))
+            self._reply(client_id, command_id)
+        elif name == "load":
+            path = command.get("path")
+            if not path or not os.path.isfile(path):
+                self._reply(client_id, command_id, error=f"no such file: {path}")
+                return
+            if overlay._scene_load_job is not None:
+                self._reply(client_id, command_id, error="a scene is still loading")
+                return
+            overlay.load_scene_async(
+                path,
+                join=bool(command.get("join", False)),
+                animation_tag=command.get("tag"),
+                on_finished=lambda loaded, cancelled: self._reply(
+                    client_id, command_id, loaded=loaded, cancelled=cancelled
+                ),
+            )
+        elif name == "mode":
+            mode = command.get("mode")
+            if mode not in self.MODES:
+                self._reply(client_id, command_id, error=f"unknown mode {mode!r}")
+                return
+            self._set_mode(mode)
+            self._reply(client_id, command_id, mode=mode)
+        else:
+            self._reply(client_id, command_id)
+
+    def _set_mode(self, mode):
+        overlay = self.overlay
+        if mode == "board":
+            overlay.enter_board_mode()
+        elif mode == "edit":
+            overlay.enter_edit_mode()
+        elif mode == "temp":
+            overlay.enter_temp_mode()
+        else:
+            # Scripts never get the "clear the board?" question.
+            overlay.exit_temp_mode(configure=False)
+            overlay.exit_board_mode(
+                ask_save=False, configure=False, skip_shape_clear_question=True
+            )
+            if mode == "off":
+                overlay.set_drawing_mode(False)
+            elif overlay.drawing_mode:
+                overlay._configure_mode()
+                overlay.update()
+            else:
+                overlay.set_drawing_mode(True)
+
+    def _reply(self, client_id, command_id, error=None, **fields):
+        """Writes an answer line; successes only for commands with an id."""
+        if command_id is None and error is None:
+            return
+        client = self._clients.get(client_id)
+        if client is None:
+            return
+        reply = {"id": command_id, "ok": error is None}
+        if error is not None:
+            reply["error"] = error
+            print(f"Scripting socket: {error}")
+        reply.update(fields)
+        client["socket"].write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
 class MainApplication(QApplication):  # [8891]
     def __init__(self, args):  # [8892]
         super().__init__(args)  # [8893]
         self.setOrganizationName("MyCompany")
         self.setApplicationName("DesktopOverlayRGN_Integrated")  # [8894]
         self._is_exiting = False  # NEW ATTRIBUTE
+        _mark_startup("QApplication")
 
         self.overlay = DesktopOverlayRgn()  # First create overlay
         self.overlay.main_app_parent = self  # Set reference for overlay
+        _mark_startup("overlay")
 
         self.control_panel = ControlPanel(
             self.overlay
@@ -21323,25 +25696,46 @@ class MainApplication(QApplication):  # [8891]
         self.control_panel.main_app_parent = (
             self  # Only now set reference for control_panel
         )
+        _mark_startup("control panel")
 
         self.overlay.defaults_changed.connect(
             self.control_panel.update_controls_from_defaults
         )  # [8895]
-        self.control_panel.show()  # [8896]
         self._is_animation_active = False  # [8897]
+        self.script_server = ScriptServer(self.overlay)
+        self._script_socket_name = _script_socket_name(args)
         self.hotkey_filter = GlobalHotkeyFilter(
             lambda hotkey_id: self.handle_global_hotkey(hotkey_id)
         )  # [8898]
         self.installNativeEventFilter(self.hotkey_filter)  # [8899]
 
-        # Initialize Lines App # [8900]
+        # The panel, guide lines, grid and shortcuts window are built one per
+        # event loop turn after the overlay's first frame, or at once when a
+        # hotkey or panel control needs them.
+        self._deferred_startup = deque(
+            [
+                ("control panel shown", self.control_panel.show),
+                ("guide lines", self._init_lines_app),
+                ("grid", self._init_grid),
+                ("shortcuts window", self.control_panel.prepare_shortcuts_window),
+                ("scripting socket", self._init_script_server),
+            ]
+        )
+        self._deferred_startup_started = False
+        self._startup_budget_ms = _startup_budget_ms(args)
+        self.overlay.first_frame_painted.connect(self._on_first_frame_painted)
+        QTimer.singleShot(STARTUP_IDLE_FALLBACK_MS, self._start_deferred_startup)
+        self.aboutToQuit.connect(self.cleanup_resources)  # Connect signal
+
+    def _init_lines_app(self):
         global lines_app_instance  # [8901]
         lines_app_instance = AplikacjaLiniiPomocniczych(self)  # [8902]
         lines_app_instance.lines_visibility_changed_signal.connect(
             self.control_panel.update_lines_toggle_checkbox_state
         )  # [8903]
+        lines_app_instance.uruchom_lines_ui()
 
-        # Initialize Grid Overlay and Settings # [8904]
+    def _init_grid(self):
         global grid_overlay_instance, grid_settings_window_instance  # [8905]
         grid_overlay_instance = GridOverlay()  # [8906]
         grid_settings_window_instance = GridSettingsWindow(
@@ -21353,7 +25747,86 @@ class MainApplication(QApplication):  # [8891]
         grid_overlay_instance.setVisible(grid_overlay_instance.visible)  # [8909]
         if grid_overlay_instance.visible:
             grid_overlay_instance.show()  # [8910]
-        self.aboutToQuit.connect(self.cleanup_resources)  # Connect signal
+
+    def _init_script_server(self):
+        name = self._script_socket_name
+        if name is None and self.overlay.settings.value(
+            "scripting/enabled", False, type=bool
+        ):
+            name = self.overlay.settings.value(
+                "scripting/socketName", SCRIPT_SOCKET_NAME
+            )
+        if name:
+            self.script_server.start(name)
+
+    @Slot()
+    def _on_first_frame_painted(self):
+        _mark_startup("first frame")
+        self._start_deferred_startup()
+
+    @Slot()
+    def _start_deferred_startup(self):
+        if self._deferred_startup_started:
+            return
+        self._deferred_startup_started = True
+        self._run_deferred_startup_step()
+
+    def _run_deferred_startup_step(self):
+        if not self._deferred_startup or self._is_exiting:
+            return
+        phase, build = self._deferred_startup.popleft()
+        build()
+        _mark_startup(phase)
+        if self._deferred_startup:
+            QTimer.singleShot(0, self._run_deferred_startup_step)
+        else:
+            self.print_startup_report()
+            if self._startup_budget_ms is not None:
+                QTimer.singleShot(0, self._check_startup_budget)
+
+    def finish_deferred_startup(self):
+        """Builds everything still waiting for idle time right away."""
+        while self._deferred_startup and not self._is_exiting:
+            self._run_deferred_startup_step()
+
+    @staticmethod
+    def first_frame_ms():
+        for phase, seconds in _STARTUP_TIMINGS:
+            if phase == "first frame":
+                return seconds * 1000
+        return None
+
+    def print_startup_report(self):
+        first_frame_ms = self.first_frame_ms()
+        if not _STARTUP_PROFILE:
+            if first_frame_ms is not None:
+                print(
+                    f"Startup: first frame after {first_frame_ms:.0f} ms "
+                    "(run with --profile-startup for the phases)."
+                )
+            return
+        print("Startup timing (ms since module load, +ms for the phase):")
+        previous = 0.0
+        for phase, seconds in _STARTUP_TIMINGS:
+            print(
+                f"  {phase:<44} {seconds * 1000:8.1f} (+{(seconds - previous) * 1000:.1f})"
+            )
+            previous = seconds
+
+    def _check_startup_budget(self):
+        """Quits with exit code 1 if the first frame came later than the budget."""
+        first_frame_ms = self.first_frame_ms()
+        within_budget = (
+            first_frame_ms is not None and first_frame_ms <= self._startup_budget_ms
+        )
+        if first_frame_ms is None:
+            print("Startup budget check FAILED: no frame was painted.")
+        else:
+            print(
+                f"Startup budget check {'passed' if within_budget else 'FAILED'}: "
+                f"first frame after {first_frame_ms:.0f} ms, budget {self._startup_budget_ms:.0f} ms."
+            )
+        self.exit(0 if within_budget else 1)
 
     def set_animation_active_status(self, is_active):  # [8911]
         self._is_animation_active = is_active
@@ -21374,6 +25847,11 @@ class MainApplication(QApplication):  # [8891]
             self.control_panel.stop_animation_playback(
                 triggered_by_escape=False
             )  # Don't want it to clear scene if exiting
+        if getattr(self, "control_panel", None) and self.control_panel._animation_export:
+            print("MainApplication: Cancelling animation export on exit.")
+            self.control_panel._animation_export.cancel()
+        # No script commands may reach the overlay while it closes.
+        self.script_server.close()
 
         # Save settings if exit was not initiated by _exit_application
         if not self._is_exiting:
@@ -21401,6 +25879,11 @@ class MainApplication(QApplication):  # [8891]
             ):
                 grid_settings_window_instance.saveSettings()
 
+        # A clean exit discards the autosave journal
+        if hasattr(self, "overlay") and self.overlay:
+            self.overlay.stop_autosave()
+            self.overlay.finish_screenshots()
+
         # Remove global event filter
         if hasattr(self, "hotkey_filter") and self.hotkey_filter:
             print("MainApplication: Removing native event filter...")
@@ -21476,6 +25959,9 @@ class MainApplication(QApplication):  # [8891]
         self.processEvents()  # Give Qt a chance to process close events
         self.processEvents()  # Sometimes one is not enough
 
+        # Windows closed above save their settings on close, so the
+        # settings store is flushed last.
+        SettingsStore.flush_all()
         print("MainApplication: cleanup_resources finished.")
 
     def _exit_application(self):
@@ -21516,7 +26002,8 @@ class MainApplication(QApplication):  # [8891]
         print("MainApplication: All settings presumably saved.")
 
         # 2. Terminate py.exe processes (optional, Windows only)
-        if _IS_WINDOWS and _PSUTIL_AVAILABLE:
+        psutil = _psutil.load() if _IS_WINDOWS else None
+        if psutil is not None:
             print("MainApplication: Attempting to kill py.exe processes...")
             try:
                 find_me = "py.exe"
@@ -21555,7 +26042,7 @@ class MainApplication(QApplication):  # [8891]
                 print(
                     f"MainApplication: Error iterating or killing processes with psutil: {e_psutil}"
                 )
-        elif _IS_WINDOWS and not _PSUTIL_AVAILABLE:
+        elif _IS_WINDOWS:
             print(
                 "MainApplication: psutil not available, skipping py.exe process kill."
             )
@@ -21573,6 +26060,7 @@ class MainApplication(QApplication):  # [8891]
         if is_anim_active:  # [8916]
             print(f"Ignoring global hotkey {hotkey_id} during animation.")  # [8917]
             return  # [8918]
+        self.finish_deferred_startup()
         if hotkey_id == HOTKEY_ID_DRAW:  # [8919]
             print("Global Hotkey Ctrl+\\ triggered → toggling drawing mode")  # [8920]
             self.overlay.set_drawing_mode(
@@ -21594,6 +26082,8 @@ class MainApplication(QApplication):  # [8891]
                 "Global Hotkey Shift+PrintScreen triggered → capturing screenshot"
             )  # [8932]
             self.overlay.capture_screenshot()  # [8933]
+        elif hotkey_id == HOTKEY_ID_BURST_SCREENSHOT:
+            self.overlay.capture_burst_screenshot()
         # Lines Hotkeys # [8934]
         elif hotkey_id == HOTKEY_ID_LINES_TOGGLE:  # [8935]
             print(
@@ -21752,6 +26242,16 @@ class MainApplication(QApplication):  # [8891]
             print("Global Hotkey Alt+Shift+F4 triggered → turning Snap OFF")  # [9024]
             if self.control_panel:
                 self.control_panel.snap_off_radio.setChecked(True)  # [9025]
+        elif (
+            HOTKEY_ID_SCENE_SLOT_BASE
+            < hotkey_id
+            <= HOTKEY_ID_SCENE_SLOT_BASE + SCENE_SLOT_COUNT
+        ):
+            slot_index = hotkey_id - HOTKEY_ID_SCENE_SLOT_BASE - 1
+            print(
+                f"Global Hotkey Ctrl+Alt+{slot_index + 1} triggered → switching to scene slot {slot_index + 1}"
+            )
+            self.overlay.switch_to_scene_slot(slot_index)
         else:  # [9026]
             print(f"Unhandled hotkey ID: {hotkey_id}")  # [9027]
 
@@ -21764,7 +26264,11 @@ class MainApplication(QApplication):  # [8891]
         return result
 
 
+_mark_startup("module definitions")
+
+
 if __name__ == "__main__":  # [9028]
+    multiprocessing.freeze_support()
     if hasattr(Qt, "AA_EnableHighDpiScaling"):
         QApplication.setAttribute(
             Qt.ApplicationAttribute.AA_EnableHighDpiScaling, True
@@ -21791,15 +26295,8 @@ if __name__ == "__main__":  # [9028]
             )  # [9038]
     app = MainApplication(sys.argv)  # [9039]
 
-    # Start UI for Lines and Grid after MainApplication and its widgets are created
-    # This UI initialization is important for widgets to be shown correctly
-    if lines_app_instance:
-        lines_app_instance.uruchom_lines_ui()
-    if grid_overlay_instance:
-        # grid_overlay_instance visibility is already set in its constructor and loadSettings
-        # grid_overlay_instance.setVisible(grid_overlay_instance.visible)
-        if grid_overlay_instance.visible:
-            grid_overlay_instance.show()
+    # The Lines and Grid UI is started by MainApplication once the overlay has
+    # painted its first frame (see MainApplication._deferred_startup)
 
     if not _GRID_HAS_KEYBOARD_LIB:  # [9040]
         print(f"\n*** {grid_tr('warning_keyboard_lib')} ***\n")  # [9041]
@@ -0,0 +1,49 @@
+"""
+Frame encoders for the animation exporter.
+
+They run in the exporter's worker processes, which unpickle them by module
+name, so this module imports nothing from Qt and nothing from the GUI.
+"""
+
+import zlib
+
+
+def encode_png_frame(rgba, width, height):
+    """Deflates one RGBA frame into the image data of a PNG or APNG frame."""
+    stride = width * 4
+    raw = bytearray()
+    for offset in range(0, height * stride, stride):
+        raw.append(0)
+        raw += rgba[offset : offset + stride]
+    return zlib.compress(bytes(raw), 6)
+
+
+def encode_gif_frame(rgba, width, height, duration_ms):
+    """
+    Quantizes one RGBA frame to a GIF image block with its own palette.
+    Pixels under half opacity become the transparent colour.
+    """
+    from PIL import Image as PILImage, GifImagePlugin
+
+    image = PILImage.frombytes("RGBA", (width, height), rgba)
+    if image.getchannel("A").getextrema()[0] >= 128:
+        frame = image.convert("RGB").quantize(256)
+        return b"".join(
+            GifImagePlugin.getdata(
+                frame, duration=duration_ms, include_color_table=True
+            )
+        )
+    mask = image.getchannel("A").point(lambda alpha: 255 if alpha < 128 else 0)
+    frame = image.convert("RGB").quantize(255)
+    palette = frame.getpalette()[:765]
+    frame.putpalette(palette + [0] * (768 - len(palette)))
+    frame.paste(255, mask=mask)
+    return b"".join(
+        GifImagePlugin.getdata(
+            frame,
+            duration=duration_ms,
+            include_color_table=True,
+            transparency=255,
+            disposal=2,
+        )
+    )
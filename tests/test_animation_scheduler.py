@@ -0,0 +1,129 @@
+"""
+Tests for the timer-heap scheduler behind manual-mode animation playback.
+
+Run from the repository root with:
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import time
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+)
+
+from PySide6.QtCore import QObject, QStandardPaths  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+QStandardPaths.setTestModeEnabled(True)
+app = QApplication.instance() or QApplication(sys.argv)
+
+import DrawDesktop  # noqa: E402
+
+# How late an event may run on an idle machine; timers have millisecond
+# resolution and the test loop polls for events every millisecond.
+LATENESS_BOUND_S = 0.04
+# Playback spacing and the stall that one event causes in the drift test.
+INTERVAL_S = 0.02
+STALL_S = 0.07
+EVENT_COUNT = 12
+RUN_TIMEOUT_S = 10
+
+
+class AnimationSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.parent = QObject()
+        self.scheduler = DrawDesktop.AnimationScheduler(self.parent)
+        self.events = []
+
+    def tearDown(self):
+        self.scheduler.clear()
+        self.parent.deleteLater()
+        app.processEvents()
+
+    def run_until(self, count):
+        """Runs the event loop until count events were recorded."""
+        deadline = time.monotonic() + RUN_TIMEOUT_S
+        while len(self.events) < count and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.001)
+        self.assertEqual(len(self.events), count, self.events)
+
+    def record(self, name):
+        self.events.append((name, time.monotonic()))
+
+    def test_events_run_in_deadline_order(self):
+        self.scheduler.start()
+        schedule = [(0.05, "c"), (0.01, "a"), (0.03, "b1"), (0.0, "first")]
+        schedule += [(0.03, "b2"), (0.03, "b3"), (0.08, "last")]
+        for seconds, name in schedule:
+            self.scheduler.schedule_at(seconds, self.record, name)
+        self.run_until(len(schedule))
+        # Equal deadlines keep the order they were scheduled in.
+        names = [name for name, _ in self.events]
+        self.assertEqual(names, ["first", "a", "b1", "b2", "b3", "c", "last"])
+        times = [at for _, at in self.events]
+        self.assertEqual(times, sorted(times))
+
+    def test_start_drops_pending_events(self):
+        self.scheduler.start()
+        self.scheduler.schedule_at(0.01, self.record, "dropped")
+        self.scheduler.start()
+        self.scheduler.schedule_at(0.02, self.record, "kept")
+        self.run_until(1)
+        time.sleep(0.03)
+        app.processEvents()
+        self.assertEqual([name for name, _ in self.events], ["kept"])
+
+    def test_chained_events_do_not_drift(self):
+        scheduler = self.scheduler
+        deadlines = []
+
+        def step(index):
+            deadlines.append(scheduler._current_due)
+            self.record(index)
+            if index == 2:
+                # A slow event makes the next ones late, but not later than
+                # the stall itself, and they catch up afterwards.
+                time.sleep(STALL_S)
+            if index + 1 < EVENT_COUNT:
+                scheduler.schedule_after(INTERVAL_S, step, index + 1)
+
+        scheduler.start()
+        origin = scheduler._origin
+        scheduler.schedule_at(0, step, 0)
+        self.run_until(EVENT_COUNT)
+
+        for index, due in enumerate(deadlines):
+            self.assertAlmostEqual(due, origin + index * INTERVAL_S, places=9)
+        for index, ran_at in self.events:
+            lateness = ran_at - deadlines[index]
+            self.assertGreaterEqual(lateness, -0.002, index)
+            if ran_at > deadlines[2] + STALL_S + LATENESS_BOUND_S:
+                self.assertLess(lateness, LATENESS_BOUND_S, index)
+        _, last_ran_at = self.events[-1]
+        self.assertLess(
+            last_ran_at - origin,
+            (EVENT_COUNT - 1) * INTERVAL_S + LATENESS_BOUND_S,
+        )
+        self.assertEqual(scheduler.fired, EVENT_COUNT)
+        self.assertGreaterEqual(scheduler.max_drift, STALL_S - INTERVAL_S)
+        self.assertIn(f"{EVENT_COUNT} events", scheduler.drift_report())
+
+    def test_failing_event_does_not_stop_playback(self):
+        def fail():
+            self.record("fail")
+            raise RuntimeError("scheduled event failed on purpose")
+
+        self.scheduler.start()
+        self.scheduler.schedule_at(0.01, fail)
+        self.scheduler.schedule_at(0.02, self.record, "after")
+        self.run_until(2)
+        self.assertEqual([name for name, _ in self.events], ["fail", "after"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Tests for the nearest-line queries behind grid and guide line snapping.
+
+Run from the repository root with:
+    python -m unittest discover -s tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+)
+
+from PySide6.QtCore import QStandardPaths  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+QStandardPaths.setTestModeEnabled(True)
+app = QApplication.instance() or QApplication(sys.argv)
+
+import DrawDesktop  # noqa: E402
+
+GridOverlay = DrawDesktop.GridOverlay
+
+# Widget sizes, including ones the section counts do not divide evenly.
+SIZES = [(1920, 1080), (1366, 768), (333, 97), (7, 5)]
+# Section counts as (horizontal_sections, vertical_sections). The larger ones
+# put several lines on one pixel of the smaller sizes.
+SECTIONS = [(1, 1), (2, 3), (11, 11), (7, 13), (200, 300)]
+# Cell sizes as (cell_width, cell_height); the spin boxes go from 1 to 5000.
+CELLS = [(1, 1), (3, 7), (50, 50), (97, 41), (5000, 5000)]
+OFFSETS = [(0, 0), (13, -7), (-260, 45), (2500, -2500)]
+SAMPLES_PER_CASE = 60
+
+
+def brute_force_nearest(coords, value):
+    """The nearest line from the full list, preferring the lower one on a tie."""
+    if not coords:
+        return None
+    return min(coords, key=lambda coord: (abs(value - coord), coord))
+
+
+class GridNearestLineTest(unittest.TestCase):
+    def setUp(self):
+        self.grid = GridOverlay()
+        self.random = random.Random(30)
+
+    def tearDown(self):
+        self.grid.deleteLater()
+        app.processEvents()
+
+    def sample_points(self, width, height):
+        """Random points on and around the widget, plus its corners and centre."""
+        points = [(0, 0), (width, height), (width / 2, height / 2), (-50, height + 50)]
+        for _ in range(SAMPLES_PER_CASE):
+            x = self.random.uniform(-0.25 * width, 1.25 * width)
+            y = self.random.uniform(-0.25 * height, 1.25 * height)
+            if self.random.random() < 0.3:
+                x, y = round(x), round(y)
+            points.append((x, y))
+        return points
+
+    def assert_matches_visible_lines(self):
+        grid = self.grid
+        h_lines, v_lines = grid.get_visible_grid_lines()
+        for x, y in self.sample_points(grid.width(), grid.height()):
+            nearest_y, nearest_x = grid.get_nearest_grid_lines(x, y)
+            self.assertEqual(nearest_y, brute_force_nearest(h_lines, y), (x, y))
+            self.assertEqual(nearest_x, brute_force_nearest(v_lines, x), (x, y))
+
+    def test_sections_mode(self):
+        self.grid.grid_mode = GridOverlay.MODE_SECTIONS
+        for width, height in SIZES:
+            self.grid.resize(width, height)
+            for sections in SECTIONS:
+                for offset in OFFSETS:
+                    with self.subTest(
+                        size=(width, height), sections=sections, offset=offset
+                    ):
+                        grid = self.grid
+                        grid.horizontal_sections, grid.vertical_sections = sections
+                        grid.offset_x, grid.offset_y = offset
+                        self.assert_matches_visible_lines()
+
+    def test_cell_size_mode(self):
+        self.grid.grid_mode = GridOverlay.MODE_CELL_SIZE
+        for width, height in SIZES:
+            self.grid.resize(width, height)
+            for cells in CELLS:
+                for offset in OFFSETS:
+                    with self.subTest(
+                        size=(width, height), cells=cells, offset=offset
+                    ):
+                        self.grid.cell_width, self.grid.cell_height = cells
+                        self.grid.offset_x, self.grid.offset_y = offset
+                        self.assert_matches_visible_lines()
+
+    def test_hidden_grid_has_no_lines(self):
+        self.grid.resize(*SIZES[0])
+        self.grid.visible = False
+        self.assertEqual(self.grid.get_nearest_grid_lines(10, 10), (None, None))
+
+
+class GuideLineNearestTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(30)
+        nearest = DrawDesktop.DesktopOverlayRgn._nearest_sorted_coord
+        self.assertIsNone(nearest([], 5))
+        for count in [1, 2, 5, 40]:
+            # Repeated 100s give duplicate coordinates.
+            coords = sorted(
+                rng.choice([rng.randint(0, 500), 100]) for _ in range(count)
+            )
+            for _ in range(SAMPLES_PER_CASE):
+                value = rng.uniform(-100, 600)
+                with self.subTest(coords=coords, value=value):
+                    self.assertEqual(
+                        nearest(coords, value), brute_force_nearest(coords, value)
+                    )
+            # Exact hits and midpoints, where ties are decided.
+            for a, b in zip(coords, coords[1:]):
+                for value in (a, (a + b) / 2):
+                    self.assertEqual(
+                        nearest(coords, value), brute_force_nearest(coords, value)
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Offscreen tests for the built-in magnifier loupe.
+
+Run from the repository root with:
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+)
+
+from PySide6.QtCore import QPoint, QRectF, QStandardPaths  # noqa: E402
+from PySide6.QtGui import QColor, QCursor, QImage, QPainter  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+# Keeps the settings the overlay loads and saves out of the user's profile.
+QStandardPaths.setTestModeEnabled(True)
+app = QApplication.instance() or QApplication(sys.argv)
+
+import DrawDesktop  # noqa: E402
+
+# A cursor move has to reach the screen within one poll interval on average,
+# and no single frame may take longer than three of them.
+MEAN_LATENCY_BOUND_MS = DrawDesktop.MAGNIFIER_POLL_MS
+MAX_LATENCY_BOUND_MS = 3 * DrawDesktop.MAGNIFIER_POLL_MS
+
+SHAPE_COLOR = QColor(0, 255, 0)
+CHANGED_COLOR = QColor(0, 0, 255)
+FOLLOW_OFFSETS = [
+    QPoint(110, 120),
+    QPoint(125, 118),
+    QPoint(140, 135),
+    QPoint(95, 150),
+]
+
+
+def checkered_desktop(capture_rect):
+    """Stands in for the screen grab, which is undefined on the offscreen platform."""
+    image = QImage(capture_rect.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(QColor(0, 0, 0))
+    painter = QPainter(image)
+    for y in range(0, image.height(), 8):
+        for x in range(0, image.width(), 8):
+            if (x + y) // 8 % 2:
+                painter.fillRect(x, y, 8, 8, QColor(x % 256, y % 256, 128))
+    painter.end()
+    return image
+
+
+class MagnifierLoupeTest(unittest.TestCase):
+    def setUp(self):
+        self.overlay = DrawDesktop.DesktopOverlayRgn()
+        self.overlay.grab_desktop_image = checkered_desktop
+        self.shape = DrawDesktop.Shape("rect", QRectF(100, 100, 40, 40), SHAPE_COLOR)
+        self.shape.filled = True
+        self.overlay.shapes.append(self.shape)
+        self.loupe = DrawDesktop.MagnifierLoupe(self.overlay)
+        # Nearest-neighbour scaling by a whole factor keeps every magnified
+        # pixel a copy of one composite pixel.
+        self.loupe.set_zoom(3)
+        self.loupe.set_smoothing(False)
+        self.loupe.start()
+        self.origin = self.overlay.mapToGlobal(QPoint(0, 0))
+
+    def tearDown(self):
+        self.loupe.stop()
+        self.loupe.deleteLater()
+        self.overlay.deleteLater()
+        app.processEvents()
+
+    def follow(self, offset):
+        # The cursor is moved too, so the loupe's own polling agrees.
+        QCursor.setPos(self.origin + offset)
+        self.loupe.follow(self.origin + offset)
+        app.processEvents()
+
+    def assert_magnifies_composite(self):
+        """Compares the lens, away from its rim and crosshair, with _composite."""
+        loupe = self.loupe
+        shown = loupe.grab().toImage()
+        # The lens shows the composite layer over a black fill.
+        dpr = loupe._composite.devicePixelRatio()
+        composite = QImage(
+            loupe._composite.size(), QImage.Format.Format_ARGB32_Premultiplied
+        )
+        composite.setDevicePixelRatio(dpr)
+        composite.fill(QColor(0, 0, 0))
+        painter = QPainter(composite)
+        painter.drawImage(QPoint(0, 0), loupe._composite)
+        painter.end()
+        source = loupe._source
+        radius = loupe.width() / 2
+        colors = set()
+        for y in range(0, loupe.height(), 7):
+            for x in range(0, loupe.width(), 7):
+                dx = x + 0.5 - radius
+                dy = y + 0.5 - radius
+                if dx * dx + dy * dy > (radius * 0.8) ** 2:
+                    continue
+                if abs(dx) < 10 or abs(dy) < 10:
+                    continue
+                expected = composite.pixelColor(
+                    int((source.x() + (x + 0.5) / loupe.zoom) * dpr),
+                    int((source.y() + (y + 0.5) / loupe.zoom) * dpr),
+                )
+                self.assertEqual(shown.pixelColor(x, y), expected, (x, y))
+                colors.add(expected.rgb())
+        return colors
+
+    def test_follow_magnifies_composite(self):
+        for offset in FOLLOW_OFFSETS:
+            self.follow(offset)
+            colors = self.assert_magnifies_composite()
+            self.assertIn(SHAPE_COLOR.rgb(), colors)
+
+    def test_scene_change_reaches_loupe(self):
+        self.follow(FOLLOW_OFFSETS[0])
+        self.shape.color = CHANGED_COLOR
+        changed = self.shape.geometry.toAlignedRect().adjusted(-2, -2, 2, 2)
+        self.loupe.scene_changed(changed)
+        self.follow(FOLLOW_OFFSETS[1])
+        colors = self.assert_magnifies_composite()
+        self.assertIn(CHANGED_COLOR.rgb(), colors)
+        self.assertNotIn(SHAPE_COLOR.rgb(), colors)
+
+    def test_latency_stays_bounded(self):
+        for step in range(30):
+            self.follow(FOLLOW_OFFSETS[step % len(FOLLOW_OFFSETS)] + QPoint(step, 0))
+        stats = self.loupe.latency_stats()
+        self.assertIsNotNone(stats)
+        self.assertGreaterEqual(stats["frames"], 30)
+        self.assertLess(stats["mean_ms"], MEAN_LATENCY_BOUND_MS)
+        self.assertLess(stats["max_ms"], MAX_LATENCY_BOUND_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+"""
+Tests for the autosave journal, including recovery from a torn last record.
+
+Run from the repository root with:
+    python -m unittest discover -s tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+)
+
+from PySide6.QtCore import QStandardPaths  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+QStandardPaths.setTestModeEnabled(True)
+app = QApplication.instance() or QApplication(sys.argv)
+
+import DrawDesktop  # noqa: E402
+
+SceneJournal = DrawDesktop.SceneJournal
+
+
+def shape(n, text="Zażółć ✓"):
+    return {
+        "type": "text",
+        "geometry": [n, n * 2, 40.5, 20],
+        "color": "#ff0000ff",
+        "text_properties": {"text": f"{text} {n}"},
+    }
+
+
+# Records in the order the overlay would submit them, one batch per list.
+BATCHES = [
+    [{"op": "add", "id": 1, "shape": shape(1)}],
+    [
+        {"op": "add", "id": 2, "shape": shape(2)},
+        {"op": "add", "id": 3, "shape": shape(3)},
+    ],
+    [{"op": "modify", "id": 2, "shape": shape(2, "edited")}],
+    # Changes nothing, so it is not written.
+    [{"op": "modify", "id": 2, "shape": shape(2, "edited")}],
+    [{"op": "order", "ids": [3, 1, 2]}],
+    [{"op": "remove", "id": 1}],
+    [{"op": "add", "id": 4, "shape": shape(4, "line\nbreak")}],
+    [{"op": "modify", "id": 4, "shape": shape(4, "last")}],
+]
+
+
+def expected_scene(records):
+    """Replays records with a plain ordered list, independently of SceneJournal."""
+    scene = []
+    for record in records:
+        op = record["op"]
+        if op == "snapshot":
+            scene = [list(entry) for entry in record["shapes"]]
+        elif op == "add":
+            scene.append([record["id"], record["shape"]])
+        elif op == "remove":
+            scene = [entry for entry in scene if entry[0] != record["id"]]
+        elif op == "modify":
+            for entry in scene:
+                if entry[0] == record["id"]:
+                    entry[1] = record["shape"]
+        elif op == "order":
+            by_id = dict(scene)
+            scene = [[jid, by_id[jid]] for jid in record["ids"] if jid in by_id]
+    return [shape_data for _, shape_data in scene]
+
+
+class SceneJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "autosave", "journal.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_journal(self, batches):
+        journal = SceneJournal(self.path)
+        journal.start()
+        for records in batches:
+            journal.submit(records)
+        journal.stop(discard=False)
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def read_truncated(self, data, length):
+        torn_path = os.path.join(self.directory.name, "torn.jsonl")
+        with open(torn_path, "wb") as f:
+            f.write(data[:length])
+        return SceneJournal.read(torn_path)
+
+    def test_replays_complete_journal(self):
+        records = [record for records in BATCHES for record in records]
+        data = self.write_journal(BATCHES)
+        lines = data.decode("utf-8").splitlines()
+        self.assertEqual(json.loads(lines[0]), {"op": "snapshot", "shapes": []})
+        # Everything but the repeated modify record is written.
+        self.assertEqual(len(lines), 1 + len(records) - 1)
+        self.assertEqual(SceneJournal.read(self.path), expected_scene(records))
+
+    def test_torn_last_record_is_ignored(self):
+        data = self.write_journal(BATCHES)
+        line_ends = [i + 1 for i, byte in enumerate(data) if byte == ord("\n")]
+        written = [json.loads(line) for line in data.decode("utf-8").splitlines()]
+        # Every cut inside a record yields the scene before that record. Once
+        # the record is complete it counts, with or without its newline.
+        start = 0
+        for count, end in enumerate(line_ends):
+            before = expected_scene(written[:count])
+            after = expected_scene(written[: count + 1])
+            for length in range(start, end + 1):
+                with self.subTest(record=count, length=length):
+                    scene = self.read_truncated(data, length)
+                    self.assertEqual(scene, before if length < end - 1 else after)
+            start = end
+
+    def test_garbage_tail_is_ignored(self):
+        data = self.write_journal(BATCHES)
+        records = [record for records in BATCHES for record in records]
+        for tail in [b"\x00" * 64, b'{"op":"add","id":9,', b"\n\n"]:
+            with self.subTest(tail=tail):
+                scene = self.read_truncated(data + tail, len(data) + len(tail))
+                self.assertEqual(scene, expected_scene(records))
+
+    def test_compaction_keeps_the_scene(self):
+        batches = [
+            [{"op": "add", "id": jid, "shape": shape(jid)}] for jid in range(1, 40)
+        ]
+        batches += [
+            [{"op": "modify", "id": jid, "shape": shape(jid, "again")}]
+            for jid in range(1, 40, 3)
+        ]
+        batches.append([{"op": "order", "ids": list(range(39, 0, -1))}])
+        records = [record for records in batches for record in records]
+        with mock.patch.object(DrawDesktop, "AUTOSAVE_COMPACT_RECORDS", 10):
+            data = self.write_journal(batches)
+        lines = data.decode("utf-8").splitlines()
+        self.assertLess(len(lines), len(records))
+        self.assertEqual(json.loads(lines[0])["op"], "snapshot")
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        self.assertEqual(SceneJournal.read(self.path), expected_scene(records))
+        # A torn record after a compaction still falls back to the last good state.
+        written = [json.loads(line) for line in lines]
+        scene = self.read_truncated(data, len(data) - 5)
+        self.assertEqual(scene, expected_scene(written[:-1]))
+
+    def test_stop_with_discard_removes_the_journal(self):
+        self.write_journal(BATCHES)
+        journal = SceneJournal(self.path)
+        journal.start()
+        journal.stop()
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
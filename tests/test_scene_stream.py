@@ -0,0 +1,176 @@
+"""
+Tests for the incremental scene file reader.
+
+Run from the repository root with:
+    python -m unittest discover -s tests
+"""
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+)
+
+from PySide6.QtCore import QStandardPaths  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+QStandardPaths.setTestModeEnabled(True)
+app = QApplication.instance() or QApplication(sys.argv)
+
+import DrawDesktop  # noqa: E402
+
+# Small read sizes put chunk boundaries inside keys, numbers, escapes and
+# multi-byte characters; the last one is larger than the whole file.
+CHUNK_SIZES = [1, 2, 3, 7, 64, 1 << 20]
+
+SHAPES = [
+    {
+        "type": "rect",
+        "geometry": [10.5, 20.25, 300, 1e-3],
+        "color": "#ffff0000",
+        "filled": False,
+        "line_thickness": 3,
+    },
+    {
+        "type": "text",
+        "geometry": [0, 0, 120, 40],
+        "color": "#ff0000ff",
+        "text_properties": {"text": 'Größe "α" → 日本語 😀\n\\', "size": 12},
+    },
+    {
+        "type": "polygon",
+        "geometry": [[-1.5, 2], [3, -4.75], [123456789, 0.000001]],
+        "color": "#80008000",
+        "hatch_properties": {"color": "#ff123456", "style": [45], "thickness": 1},
+    },
+]
+SETTINGS_BEFORE = {
+    "mpoint_data": {"counter": 7, "labels": ["A", "B"]},
+    "angle_tool_settings": {"arc_radius": 30.5, "show": True},
+}
+SETTINGS_AFTER = {
+    "hatch_fill_settings": {"spacing": 8, "angles": [0, 90]},
+    "division_point_settings": None,
+}
+
+
+def split_styles(shapes):
+    """Builds a version 2 style table and style-referencing shapes like save_scene."""
+    styles = []
+    shape_dicts = []
+    for shape in shapes:
+        shape = json.loads(json.dumps(shape))
+        style = DrawDesktop.Shape.split_style(shape)
+        if style not in styles:
+            styles.append(style)
+        shape["style"] = styles.index(style)
+        shape_dicts.append(shape)
+    return styles, shape_dicts
+
+
+class SceneStreamReaderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, text, name="scene.json", compress=False):
+        path = os.path.join(self.directory.name, name)
+        data = text.encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(gzip.compress(data) if compress else data)
+        return path
+
+    def read(self, path, chunk_size):
+        reader = DrawDesktop.SceneStreamReader(path)
+        reader.CHUNK_SIZE = chunk_size
+        shapes = list(reader.iter_shape_dicts())
+        return reader, shapes
+
+    def assert_reads(self, path, shapes, settings):
+        for chunk_size in CHUNK_SIZES:
+            with self.subTest(chunk_size=chunk_size):
+                reader, read_shapes = self.read(path, chunk_size)
+                self.assertIsNone(reader.format_error)
+                self.assertEqual(read_shapes, shapes)
+                self.assertEqual(reader.settings, settings)
+                self.assertEqual(reader.bytes_read, reader.file_size)
+
+    def scene_text(self, **document):
+        # Indented, so whitespace also falls on chunk boundaries.
+        return json.dumps(document, indent=1, ensure_ascii=False)
+
+    def test_settings_before_and_after_shapes(self):
+        text = self.scene_text(**SETTINGS_BEFORE, shapes=SHAPES, **SETTINGS_AFTER)
+        path = self.write(text)
+        self.assert_reads(path, SHAPES, {**SETTINGS_BEFORE, **SETTINGS_AFTER})
+
+    def test_gzip_is_detected_by_content(self):
+        text = json.dumps(
+            {**SETTINGS_BEFORE, "shapes": SHAPES, **SETTINGS_AFTER},
+            separators=(",", ":"),
+        )
+        settings = {**SETTINGS_BEFORE, **SETTINGS_AFTER}
+        for name in ["scene.json.gz", "scene.json"]:
+            with self.subTest(name=name):
+                path = self.write(text, name, compress=True)
+                self.assert_reads(path, SHAPES, settings)
+
+    def test_old_bare_list(self):
+        path = self.write(json.dumps(SHAPES, ensure_ascii=False))
+        self.assert_reads(path, SHAPES, {})
+
+    def test_style_table_before_and_after_shapes(self):
+        styles, shape_dicts = split_styles(SHAPES)
+        version = DrawDesktop.SCENE_SCHEMA_VERSION
+        documents = {
+            "before": self.scene_text(
+                schema_version=version, styles=styles, shapes=shape_dicts
+            ),
+            "after": self.scene_text(
+                schema_version=version, shapes=shape_dicts, styles=styles
+            ),
+        }
+        for position, text in documents.items():
+            with self.subTest(styles=position):
+                path = self.write(text)
+                self.assert_reads(path, SHAPES, {})
+
+    def test_unknown_keys_are_skipped(self):
+        # A bare number is only complete once the character after it is read.
+        text = self.scene_text(
+            future={"nested": [1, {"shapes": []}]},
+            shapes=SHAPES,
+            scale=1234.5678e-9,
+            note="ok",
+        )
+        path = self.write(text)
+        self.assert_reads(path, SHAPES, {})
+
+    def test_shapes_not_a_list(self):
+        path = self.write(self.scene_text(shapes={"type": "rect"}))
+        reader, shapes = self.read(path, 3)
+        self.assertEqual(shapes, [])
+        self.assertIsNotNone(reader.format_error)
+
+    def test_truncated_file_raises(self):
+        text = self.scene_text(shapes=SHAPES, **SETTINGS_AFTER)
+        for end in [len(text) // 3, len(text) - 2]:
+            path = self.write(text[:end])
+            for chunk_size in [2, 1 << 20]:
+                with self.subTest(end=end, chunk_size=chunk_size):
+                    reader = DrawDesktop.SceneStreamReader(path)
+                    reader.CHUNK_SIZE = chunk_size
+                    with self.assertRaises(json.JSONDecodeError):
+                        list(reader.iter_shape_dicts())
+
+
+if __name__ == "__main__":
+    unittest.main()
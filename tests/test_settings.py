@@ -0,0 +1,118 @@
+"""
+Tests for the JSON settings store.
+
+Run from the repository root with:
+    python -m unittest discover -s tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+)
+
+from PySide6.QtCore import QStandardPaths  # noqa: E402
+from PySide6.QtGui import QColor  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+QStandardPaths.setTestModeEnabled(True)
+app = QApplication.instance() or QApplication(sys.argv)
+
+import DrawDesktop  # noqa: E402
+
+ORGANIZATION = "DrawDesktopTests"
+APPLICATION = "settings"
+
+VALUES = {
+    "flag": True,
+    "count": 42,
+    "ratio": 0.25,
+    "name": "Arial",
+    "empty": "",
+    "geometry": b"\x01\xd9\xd0\xcb\x00\x03\x00\x00\xff",
+    "recent": ["a.json", "b.json", 3, False],
+    "color": QColor(10, 20, 30, 40),
+    "style": {
+        "font": "Arial",
+        "size": 10,
+        "bold": False,
+        "color": QColor(255, 0, 0),
+        "background_color": None,
+        "margins": [1, 2.5, {"blob": b"\x00\xff"}],
+    },
+}
+
+
+class SettingsStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "settings.json")
+
+    def tearDown(self):
+        DrawDesktop.SettingsStore._stores.pop((ORGANIZATION, APPLICATION), None)
+        self.directory.cleanup()
+
+    def open_settings(self):
+        """Opens the file at self.path the way the application opens its own."""
+        store = DrawDesktop.SettingsStore(ORGANIZATION, APPLICATION, path=self.path)
+        DrawDesktop.SettingsStore._stores[(ORGANIZATION, APPLICATION)] = store
+        return store, DrawDesktop.Settings(ORGANIZATION, APPLICATION)
+
+    def assert_values(self, settings):
+        for key, expected in VALUES.items():
+            with self.subTest(key=key):
+                value = settings.value(key)
+                self.assertEqual(value, expected)
+                self.assertIs(type(value), type(expected))
+        style = settings.value("style")
+        self.assertIs(type(style["color"]), QColor)
+        self.assertIs(type(style["margins"][2]["blob"]), bytes)
+
+    def test_values_round_trip_in_memory(self):
+        store, settings = self.open_settings()
+        for key, value in VALUES.items():
+            settings.setValue(key, value)
+        self.assert_values(settings)
+
+    def test_values_round_trip_through_file(self):
+        store, settings = self.open_settings()
+        for key, value in VALUES.items():
+            settings.setValue(key, value)
+        store.flush()
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual(data["schema_version"], DrawDesktop.SETTINGS_SCHEMA_VERSION)
+        self.assertIsInstance(data["values"]["style"], dict)
+
+        store, settings = self.open_settings()
+        self.assert_values(settings)
+
+    def test_typed_reads(self):
+        store, settings = self.open_settings()
+        settings.beginGroup("grid")
+        settings.setValue("visible", "true")
+        settings.setValue("rows", "12")
+        settings.setValue("color", QColor(1, 2, 3, 4))
+        self.assertIs(settings.value("visible", False, type=bool), True)
+        self.assertEqual(settings.value("rows", 0, type=int), 12)
+        self.assertEqual(settings.value("color", type=str), "#04010203")
+        self.assertEqual(settings.value("missing", 7, type=int), 7)
+        settings.endGroup()
+        self.assertEqual(
+            sorted(settings.allKeys()), ["grid/color", "grid/rows", "grid/visible"]
+        )
+
+    def test_read_value_is_a_copy(self):
+        store, settings = self.open_settings()
+        settings.setValue("style", VALUES["style"])
+        settings.value("style")["size"] = 99
+        self.assertEqual(settings.value("style")["size"], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Offscreen startup-time regression test.
+
+Run from the repository root with:
+    python -m unittest discover -s tests
+
+The time to the first frame is counted from the moment DrawDesktop is
+imported, and there can only be one QApplication per process, so the
+application is started in a fresh interpreter.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "src")
+
+# Time from loading the module to the overlay's first painted frame. The
+# offscreen platform gets there in about 250 ms; the budget leaves room for
+# slower machines while still catching an import or a settings load that
+# moves back in front of the first frame.
+FIRST_FRAME_BUDGET_MS = 1000
+# How long the child may take in total before the test gives up on it.
+CHILD_TIMEOUT_S = 120
+
+CHILD = """
+import sys
+from PySide6.QtCore import QStandardPaths, QTimer
+QStandardPaths.setTestModeEnabled(True)
+import DrawDesktop
+
+app = DrawDesktop.MainApplication(sys.argv)
+
+def report():
+    print("FIRST_FRAME_MS", app.first_frame_ms(), flush=True)
+    app.quit()
+
+app.overlay.first_frame_painted.connect(report)
+QTimer.singleShot(int(sys.argv[1]), app.quit)
+app.exec()
+"""
+
+
+class StartupTest(unittest.TestCase):
+    def first_frame_ms(self):
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        env["PYTHONPATH"] = os.pathsep.join(
+            [SRC] + [p for p in env.get("PYTHONPATH", "").split(os.pathsep) if p]
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD, str(CHILD_TIMEOUT_S * 1000 // 2)],
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=CHILD_TIMEOUT_S,
+        )
+        for line in result.stdout.splitlines():
+            if line.startswith("FIRST_FRAME_MS "):
+                value = line.split(" ", 1)[1]
+                self.assertNotEqual(value, "None", "no first frame was recorded")
+                return float(value)
+        self.fail(f"the application painted no frame:\n{result.stderr[-2000:]}")
+
+    def test_first_frame_within_budget(self):
+        first_frame_ms = self.first_frame_ms()
+        self.assertLess(first_frame_ms, FIRST_FRAME_BUDGET_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()